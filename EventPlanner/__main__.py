@@ -9,7 +9,6 @@ import platform
 import os
 import sys
 import re
-import yaml
 from os import path
 import sqlite3
 import shutil
@@ -17,8 +16,19 @@ import time
 
 from PySide2 import QtWidgets, QtGui, QtCore
 
+from MediaTools.background import BackgroundJobs
+from MediaTools.cache import cache_path
+from MediaTools import filmstrip, loudness, metrics
+from EventPlanner import scaffold
+from GameProducer import standings, verify
+from GameProducer.preflight import LEVEL_ERROR
+from Manifest import layout
+from Manifest.catalog import Catalog
+
 
 class EventPlanner(QtWidgets.QMainWindow):
+    # ScaffoldDiff, emitted by the scaffolding job once applied
+    scaffold_done = QtCore.Signal(object)
 
     def __init__(self, db_file=None, root_folder=None, master=None):
         QtWidgets.QMainWindow.__init__(self, master)
@@ -26,13 +36,24 @@ class EventPlanner(QtWidgets.QMainWindow):
         self.showMaximized()
 
         self.root_folder = None
+        self.catalog = None
+        self.media_jobs = BackgroundJobs()
+        self.scaffold_jobs = BackgroundJobs('scaffold-jobs')
+        self.scaffold_done.connect(self.show_scaffold)
+        self.poster_icons = {}
+        self.poster_requests = set()
+        self.verify_requests = set()
+        self.standings = None
+        # the standings are computed again for all the matches on the next tick
+        self.standings_stale = True
+        self.standings_version = None
         self.create_ui()
 
         if db_file is not None:
             self.read_from_db(db_file)
 
         # TODO validate the root folder
-        self.root_folder = root_folder
+        self.set_root_folder(root_folder)
         self.label_root_folder.setText(self.root_folder)
 
         self.update_ui()
@@ -58,6 +79,8 @@ class EventPlanner(QtWidgets.QMainWindow):
         header.setSectionResizeMode(9, QtWidgets.QHeaderView.ResizeToContents)
         header.setSectionResizeMode(10, QtWidgets.QHeaderView.ResizeToContents)
         header.setSectionResizeMode(11, QtWidgets.QHeaderView.ResizeToContents)
+        self.matchstable.setIconSize(self.POSTER_SIZE)
+        self.matchstable.verticalHeader().setDefaultSectionSize(self.POSTER_SIZE.height() + 6)
 
         self.hbuttonbox = QtWidgets.QHBoxLayout()
         self.generatebutton = QtWidgets.QPushButton("Generate Folder ...")
@@ -74,8 +97,17 @@ class EventPlanner(QtWidgets.QMainWindow):
         self.label_root_folder.setText('Please select a root folder ...')
         self.hrootfolder.addWidget(self.label_root_folder)
 
+        self.rankingstable = QtWidgets.QTableWidget(0, 8)
+        self.rankingstable.setHorizontalHeaderLabels(['Team', 'Ranking Score', 'TBP1', 'TBP2', 'Highest', 'W-L-T', 'Played', 'Ranking Points'])
+        self.rankingstable.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.rankingstable.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+
+        self.tabs = QtWidgets.QTabWidget()
+        self.tabs.addTab(self.matchstable, 'Matches')
+        self.tabs.addTab(self.rankingstable, 'Rankings')
+
         self.vboxlayout = QtWidgets.QVBoxLayout()
-        self.vboxlayout.addWidget(self.matchstable, stretch=10)
+        self.vboxlayout.addWidget(self.tabs, stretch=10)
         self.vboxlayout.addLayout(self.hrootfolder, stretch=1)
         self.vboxlayout.addLayout(self.hbuttonbox, stretch=1)
 
@@ -121,9 +153,9 @@ class EventPlanner(QtWidgets.QMainWindow):
         # getOpenFileName returns a tuple, so use only the actual file name
         self.read_from_db(filename[0])
 
-    FOLDER_TEAM = 'Team Uploads'
-    FOLDER_MATCH = 'Game Matches'
-    FOLDER_PUBLISHED = 'Match Video Published'
+    FOLDER_TEAM = layout.FOLDER_TEAM
+    FOLDER_MATCH = layout.FOLDER_MATCH
+    FOLDER_PUBLISHED = layout.FOLDER_PUBLISHED
 
     def generate(self):
         """Generate skeleton folders
@@ -144,77 +176,51 @@ class EventPlanner(QtWidgets.QMainWindow):
             returnValue = msgBox.exec()
             if returnValue != QtWidgets.QMessageBox.Yes:
                 return
-        self.root_folder = filename
+        self.set_root_folder(filename)
         self.label_root_folder.setText(self.root_folder)
+        try:
+            plan = scaffold.plan_tree(self.quals, {team['number']: team['name'] for team in self.teams})
+        except scaffold.ScaffoldException as ex:
+            self.message_box(f'Cannot generate the folders, {ex}')
+            return
+        # the scan and the file system calls are slow on a synced cloud folder, out of the UI thread
+        self.generatebutton.setEnabled(False)
+        self.scaffold_jobs.submit('scaffold', self.run_scaffold, self.root_folder, plan)
+
+    def run_scaffold(self, root_folder, plan):
+        diff = scaffold.ScaffoldDiff(plan)
+        try:
+            diff = scaffold.diff_tree(root_folder, plan)
+            scaffold.apply_diff(root_folder, diff)
+        except OSError as ex:
+            diff.errors.append(str(ex))
+        except Exception as ex:
+            # the background jobs drop the exceptions, it's shown with the summary instead
+            diff.errors.append(f'unexpected {type(ex).__name__}, {ex}')
+        finally:
+            # always, or the Generate button stays disabled
+            self.scaffold_done.emit(diff)
+
+    def show_scaffold(self, diff):
+        self.generatebutton.setEnabled(True)
+        self.message_box(f'Folders of the schedule generated in [{self.root_folder}] :\n\n{diff.summary()}'
+                         + ('\n\nThe orphan folders are not in the schedule anymore, please check them before removing them.'
+                            if diff.orphans else ''))
+        self.update_ui()
 
-        # generate uploads folder
-        upload_folder = os.path.join(self.root_folder, self.FOLDER_TEAM)
-        self.ensure_folder_exists(upload_folder)
-        self.create_text_file(os.path.join(upload_folder, 'Please share these folders for individual team separately!'))
-        for match in self.quals:
-            self.generate_team_upload_folder(match['red1'], upload_folder, match['match'], 'Red')
-            self.generate_team_upload_folder(match['red2'], upload_folder, match['match'], 'Red')
-            self.generate_team_upload_folder(match['blue1'], upload_folder, match['match'], 'Blue')
-            self.generate_team_upload_folder(match['blue2'], upload_folder, match['match'], 'Blue')
-        # generate match folder
-        matches_folder = os.path.join(self.root_folder, self.FOLDER_MATCH)
-        self.ensure_folder_exists(matches_folder)
-        for match in self.quals:
-            match_folder = os.path.join(matches_folder, f'Match #{match["match"]}')
-            self.ensure_folder_exists(match_folder)
-            self.create_text_file(
-                os.path.join(match_folder, 'Please use MatchVideoProcessor to generate Video Manifest yaml file!'))
-            manifest = self.match_manifest(match)
-            stream = open(os.path.join(match_folder, f'match{match["match"]}.yml'), 'w')
-            yaml.safe_dump(manifest, stream)
-        # generate game video folder
-        output_folder = os.path.join(self.root_folder, self.FOLDER_PUBLISHED)
-        self.ensure_folder_exists(output_folder)
-        self.create_text_file(os.path.join(output_folder, 'Please use GameProducer to generate the Match Videos to here!'))
-        return
-
-    def ensure_folder_exists(self, folder):
-        if not os.path.exists(folder):
-            os.mkdir(folder)
-
-    def create_text_file(self, filename, content=''):
-        if not os.path.exists(filename):
-            f = open(filename, 'a')
-            f.write(content)
-            f.close()
+    def set_root_folder(self, root_folder):
+        """Use the root folder, and the catalog of its manifests to track the review status"""
+        self.root_folder = root_folder
+        if self.catalog is not None:
+            self.catalog.close()
+        self.catalog = Catalog(root_folder) if root_folder is not None else None
+        self.standings_stale = True
 
     def match_upload_folder(self, upload_folder, team_number, team_name, match_number, alliance):
-        team_folder = os.path.join(upload_folder, f'{team_number}-{team_name}')
-        match_folder = os.path.join(team_folder, f'Match #{match_number} {alliance} Alliance')
-        return team_folder, match_folder
-
-    def generate_team_upload_folder(self, team_number, upload_folder, match_number, alliance):
-        team = self.get_team_info(team_number)
-        team_folder, match_folder = self.match_upload_folder(upload_folder, team["number"], team["name"], match_number, alliance)
-        self.ensure_folder_exists(team_folder)
-        self.create_text_file(os.path.join(team_folder, 'Please upload the game video file (mp4, 480p suggested) to corresponding match folder'))
-        self.ensure_folder_exists(match_folder)
-        self.create_text_file(os.path.join(match_folder, f'Please upload the match video file of #{match_number} ({alliance} Alliance) to this folder'))
+        return scaffold.match_upload_folder(upload_folder, team_number, team_name, match_number, alliance)
 
     def match_video_file_prefix(self, alliance, team_number, match_number):
-        return f'match{match_number}-{alliance}-team{team_number}'
-
-    def match_manifest(self, match):
-        match_folder = os.path.join(self.root_folder, self.FOLDER_MATCH, f'Match #{match["match"]}')
-        teams = []
-        team = self.get_team_info(match['red1'])
-        match_file_prefix = self.match_video_file_prefix('red', team['number'], match['match'])
-        teams.append({'TeamName': team['name'], 'TeamNumber': team['number'], 'Alliance': 'Red', 'GameVideo': {'Location': f'{match_file_prefix}.mp4', 'VideoManifest': f'{match_file_prefix}.yml'}})
-        team = self.get_team_info(match['red2'])
-        match_file_prefix = self.match_video_file_prefix('red', team['number'], match['match'])
-        teams.append({'TeamName': team['name'], 'TeamNumber': team['number'], 'Alliance': 'Red', 'GameVideo': {'Location': f'{match_file_prefix}.mp4', 'VideoManifest': f'{match_file_prefix}.yml'}})
-        team = self.get_team_info(match['blue1'])
-        match_file_prefix = self.match_video_file_prefix('blue', team['number'], match['match'])
-        teams.append({'TeamName': team['name'], 'TeamNumber': team['number'], 'Alliance': 'Blue', 'GameVideo': {'Location': f'{match_file_prefix}.mp4', 'VideoManifest': f'{match_file_prefix}.yml'}})
-        team = self.get_team_info(match['blue2'])
-        match_file_prefix = self.match_video_file_prefix('blue', team['number'], match['match'])
-        teams.append({'TeamName': team['name'], 'TeamNumber': team['number'], 'Alliance': 'Blue', 'GameVideo': {'Location': f'{match_file_prefix}.mp4', 'VideoManifest': f'{match_file_prefix}.yml'}})
-        return {'VirtualGame': {'Name': f'Match #{match["match"]}', 'Teams': teams}}
+        return scaffold.match_video_file_prefix(alliance, team_number, match_number)
 
     def get_team_info(self, team_number):
         for row in self.teams:
@@ -224,15 +230,19 @@ class EventPlanner(QtWidgets.QMainWindow):
 
     def read_from_db(self, filename):
         self.db_file = filename
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
-        self.reset()
-        cur = conn.cursor()
-        result = cur.execute("SELECT * FROM quals")
-        self.quals = result.fetchall()
-        result = cur.execute("SELECT * FROM teamInfo")
-        self.teams = result.fetchall()
-        conn.close()
+        with metrics.span('scorekeeper.read', db=filename):
+            conn = sqlite3.connect(self.db_file)
+            conn.row_factory = sqlite3.Row
+            self.reset()
+            cur = conn.cursor()
+            result = cur.execute("SELECT * FROM quals")
+            self.quals = result.fetchall()
+            result = cur.execute("SELECT * FROM teamInfo")
+            self.teams = result.fetchall()
+            conn.close()
+        quals, surrogates = standings.schedule_from_rows(self.quals)
+        self.standings = standings.Standings(quals, {team['number']: team['name'] for team in self.teams}, surrogates)
+        self.standings_stale = True
         row_no = 0
         for match in self.quals:
             self.matchstable.insertRow(row_no)
@@ -296,9 +306,14 @@ class EventPlanner(QtWidgets.QMainWindow):
 
             row_no += 1
 
+    @metrics.traced('event_planner.update_ui', 'manifest.parse', 'catalog.indexed')
     def update_ui(self):
         """Check folder structure and updates the user interface"""
-        if self.root_folder is not None:
+        # the folders may not all exist yet while they are generated
+        if self.root_folder is not None and not self.scaffold_jobs.is_pending('scaffold'):
+            # only the manifests changed since the last tick are parsed again
+            updated = self.catalog.refresh()
+            self.update_standings(updated)
             upload_folder = os.path.join(self.root_folder, self.FOLDER_TEAM)
             row_no = 0
             for match in self.quals:
@@ -306,12 +321,11 @@ class EventPlanner(QtWidgets.QMainWindow):
                 status, red2_score = self.video_status(upload_folder, match['match'], match['red2'], 'Red', row_no, 2)
                 status, blue1_score = self.video_status(upload_folder, match['match'], match['blue1'], 'Blue', row_no, 5)
                 status, blue2_score = self.video_status(upload_folder, match['match'], match['blue2'], 'Blue', row_no, 7)
-                if red1_score and red2_score:
-                    item = self.matchstable.item(row_no, 4)
-                    item.setText(str(red1_score + red2_score))
-                if blue1_score and blue2_score:
-                    item = self.matchstable.item(row_no, 9)
-                    item.setText(str(blue1_score + blue2_score))
+                # the alliance scores of the standings, with the penalty points of the other alliance
+                results = self.standings.results.get(match['match']) if self.standings is not None else None
+                if results is not None:
+                    self.matchstable.item(row_no, 4).setText(str(results['Red'].score))
+                    self.matchstable.item(row_no, 9).setText(str(results['Blue'].score))
                 # update video button
                 button_video = self.matchstable.cellWidget(row_no, 10)
                 button_ftc = self.matchstable.cellWidget(row_no, 11)
@@ -326,7 +340,13 @@ class EventPlanner(QtWidgets.QMainWindow):
                     button_video.setProperty('match_manifest', match_manifest)
 
                     if os.path.exists(publish_video):
-                        button_video.setText(self.STATUS_PUBLISHED)
+                        issues = self.published_issues(publish_video, match["match"], match_manifest)
+                        button_video.setProperty('verify_issues', issues)
+                        button_video.setText(self.STATUS_BROKEN if issues else self.STATUS_PUBLISHED)
+                        icon = self.poster_icon(publish_video)
+                        if icon is not None:
+                            button_video.setIconSize(self.POSTER_SIZE)
+                            button_video.setIcon(icon)
                     else:
                         button_video.setText(self.STATUS_REVIEWED)
                     button_ftc.setProperty('match_number', match["match"])
@@ -340,6 +360,33 @@ class EventPlanner(QtWidgets.QMainWindow):
                     button_ftc.setText('-')
                 row_no += 1
 
+    def update_standings(self, updated_manifests):
+        """Compute the standings again for the matches of the updated manifests, redraw the rankings if they changed"""
+        if self.standings is None:
+            return
+        matches = None if self.standings_stale else standings.changed_matches(updated_manifests)
+        if matches is not None and not matches:
+            return
+        self.standings_stale = False
+        self.standings.refresh(self.catalog, matches)
+        if self.standings.version == self.standings_version:
+            return
+        self.standings_version = self.standings.version
+        ranking = [team for team in self.standings.ranking if team.played]
+        self.rankingstable.setRowCount(len(ranking))
+        for row_no, team in enumerate(ranking):
+            self.rankingstable.setVerticalHeaderItem(row_no, QtWidgets.QTableWidgetItem(f'{team.rank}'))
+            values = [f'{team.number} : {team.name}', f'{team.ranking_score:.2f}', f'{team.average(2):.1f}',
+                      f'{team.average(3):.1f}', str(team.highest),
+                      f'{team.count(standings.RESULT_WIN)}-{team.count(standings.RESULT_LOSS)}-{team.count(standings.RESULT_TIE)}',
+                      str(team.played), str(team.ranking_points)]
+            for column_no, value in enumerate(values):
+                self.rankingstable.setItem(row_no, column_no, QtWidgets.QTableWidgetItem(value))
+        try:
+            standings.write_standings(self.root_folder, self.standings)
+        except OSError as ex:
+            print(f'WARNING : cannot write the standings, {ex}')
+
     def video_status(self, upload_folder, match_number, team_number, alliance, table_row_no, table_column_no):
         team = self.get_team_info(team_number)
         team_folder, team_match_folder = self.match_upload_folder(upload_folder, team["number"], team["name"], match_number, alliance)
@@ -351,7 +398,6 @@ class EventPlanner(QtWidgets.QMainWindow):
         match_folder = os.path.join(self.root_folder, self.FOLDER_MATCH, f'Match #{match_number}')
         match_file_prefix = self.match_video_file_prefix(alliance, team_number, match_number)
         match_video_filename = os.path.join(match_folder, f'{match_file_prefix}.mp4')
-        video_manifest_filename = os.path.join(match_folder, f'{match_file_prefix}.yml')
         score = None
         textfield = self.matchstable.item(table_row_no, table_column_no)
         button = self.matchstable.cellWidget(table_row_no, table_column_no + 1)
@@ -361,14 +407,11 @@ class EventPlanner(QtWidgets.QMainWindow):
         button.setProperty('match_video_filename', os.path.normpath(match_video_filename))
         button.setProperty('upload_video', upload_video)
         button.setProperty('team_folder', os.path.normpath(team_folder))
-        if os.path.exists(video_manifest_filename):
-            with open(video_manifest_filename) as file:
-                video_manifest = yaml.load(file, Loader=yaml.SafeLoader)
-                score = 0
-                for item in video_manifest['GameEvents']:
-                    score += item['Point']
-                status = self.STATUS_REVIEWED
-                textfield.setBackgroundColor(QtGui.QColor(QtCore.Qt.green))
+        reviewed_video = self.catalog.video(match_number, alliance, team_number)
+        if reviewed_video is not None:
+            score = reviewed_video['score']
+            status = self.STATUS_REVIEWED
+            textfield.setBackgroundColor(QtGui.QColor(QtCore.Qt.green))
         elif os.path.exists(match_video_filename):
             status = self.STATUS_COPIED
             textfield.setBackgroundColor(QtGui.QColor(QtCore.Qt.yellow))
@@ -378,14 +421,59 @@ class EventPlanner(QtWidgets.QMainWindow):
         else:
             status = self.STATUS_NO_VIDEO
             textfield.setBackgroundColor(QtGui.QColor(QtCore.Qt.white))
+        if status in [self.STATUS_REVIEWED, self.STATUS_COPIED] and os.path.exists(match_video_filename):
+            icon = self.poster_icon(match_video_filename)
+            if icon is not None:
+                textfield.setIcon(icon)
         button.setText(status)
         return status, score
 
+    POSTER_SIZE = QtCore.QSize(48, 27)
+    POSTER_SECONDS = 10
+
+    def poster_icon(self, video_filename):
+        """Poster frame from the cached filmstrip of the video, the filmstrip is extracted in background if needed"""
+        filmstrip_filename = cache_path(video_filename, filmstrip.CACHE_SUFFIX)
+        if not os.path.exists(filmstrip_filename):
+            self.request_filmstrip(video_filename)
+            return None
+        key = (video_filename, os.path.getmtime(filmstrip_filename))
+        if key not in self.poster_icons:
+            thumbnail = filmstrip.poster_frame(video_filename, self.POSTER_SECONDS)
+            if thumbnail is None:
+                # the video has changed since the filmstrip was extracted
+                self.request_filmstrip(video_filename)
+                self.poster_icons[key] = None
+            else:
+                pixmap = QtGui.QPixmap()
+                pixmap.loadFromData(thumbnail, 'JPG')
+                self.poster_icons[key] = QtGui.QIcon(pixmap)
+        return self.poster_icons[key]
+
+    def request_filmstrip(self, video_filename):
+        # only once per version of the video, so a broken video isn't decoded again on every tick
+        request = (video_filename, os.path.getmtime(video_filename))
+        if request not in self.poster_requests:
+            self.poster_requests.add(request)
+            self.media_jobs.submit(('filmstrip', video_filename), filmstrip.extract_filmstrip, video_filename)
+
+    def published_issues(self, publish_video, match_number, match_manifest):
+        """Errors of the cached verification of the published video, it's verified in background if needed"""
+        issues = verify.cached_issues(publish_video)
+        if issues is None:
+            request = (publish_video, os.path.getmtime(publish_video))
+            if request not in self.verify_requests:
+                self.verify_requests.add(request)
+                self.media_jobs.submit(('verify', publish_video), verify.verify_published, publish_video, match_number, match_manifest)
+            return []
+        return [issue['message'] for issue in issues if issue['level'] == LEVEL_ERROR]
+
     STATUS_NO_VIDEO = 'No Video'
     STATUS_UPLOADED = 'Uploaded'
     STATUS_COPIED = 'Copied'
     STATUS_REVIEWED = 'Reviewed'
     STATUS_PUBLISHED = 'Published'
+    STATUS_BROKEN = 'Broken'
     STATUS_SAVE = 'ScoreKeeper'
 
     def button_click(self):
@@ -402,7 +490,13 @@ class EventPlanner(QtWidgets.QMainWindow):
             msg_box.setStandardButtons(QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
             return_value = msg_box.exec()
             if return_value == QtWidgets.QMessageBox.Yes:
-                shutil.copy2(self.sender().property("upload_video"), self.sender().property("match_video_filename"))
+                # a copy, not a link : the team can still write into its upload, the reviewed video must not change.
+                # MediaTools.store links them once the match is published
+                with metrics.span('upload.copy', video=self.sender().property("upload_video")):
+                    shutil.copy2(self.sender().property("upload_video"), self.sender().property("match_video_filename"))
+                # measured once at ingest, so the render only applies the gain
+                match_video_filename = self.sender().property("match_video_filename")
+                self.media_jobs.submit(('loudness', match_video_filename), loudness.load_loudness, match_video_filename)
                 self.update_ui()
         elif status == self.STATUS_NO_VIDEO:
             self.message_box(f'Please share the folder "{self.sender().property("team_folder")}" to team #{self.sender().property("team_number")} {self.sender().property("team_name")} and ask them to upload game video for match #{self.sender().property("match_number")}')
@@ -414,6 +508,11 @@ class EventPlanner(QtWidgets.QMainWindow):
             command = f'.\\game-producer "{self.sender().property("match_manifest")}" "{self.sender().property("publish_video_filename")}"'
             self.message_box(
                 f'The match has been reviewed by referee, and it\'s ready to be published. Please run following command:\n\n> {command}\n\n The command has been copied to your clipboard.')
+        elif status == self.STATUS_BROKEN:
+            command = f'.\\game-producer "{self.sender().property("match_manifest")}" "{self.sender().property("publish_video_filename")}"'
+            issues = '\n'.join(f' - {issue}' for issue in self.sender().property("verify_issues"))
+            self.message_box(
+                f'The published match video is broken:\n\n{issues}\n\nPlease generate it again by following command:\n\n> {command}\n\n The command has been copied to your clipboard.')
         elif status == self.STATUS_PUBLISHED:
             command = f'.\\game-producer "{self.sender().property("match_manifest")}" "{self.sender().property("publish_video_filename")}"'
             self.message_box(
@@ -445,18 +544,20 @@ class EventPlanner(QtWidgets.QMainWindow):
                 blue1 = button_ftc.property('blue1')
                 blue2 = button_ftc.property('blue2')
 
+                self.catalog.refresh()
                 game_events_red1 = self.read_game_events(match_number, 'Red', red1)
                 game_events_red2 = self.read_game_events(match_number, 'Red', red2)
                 game_events_blue1 = self.read_game_events(match_number, 'Blue', blue1)
                 game_events_blue2 = self.read_game_events(match_number, 'Blue', blue2)
 
-                result = cur.execute(self.generate_sql_points(match_number, ts, 'Red', game_events_red1, game_events_red2))
-                result = cur.execute(self.generate_sql_points(match_number, ts, 'Blue', game_events_blue1, game_events_blue2))
-                result = cur.execute(self.generate_sql_penalty(match_number, ts, 'Red', game_events_red1, game_events_red2))
-                result = cur.execute(self.generate_sql_penalty(match_number, ts, 'Blue', game_events_blue1, game_events_blue2))
-                result = cur.execute(self.generate_sql_commit(match_number, ts))
-                conn.commit()
-                conn.close()
+                with metrics.span('scorekeeper.write', match=match_number):
+                    result = cur.execute(self.generate_sql_points(match_number, ts, 'Red', game_events_red1, game_events_red2))
+                    result = cur.execute(self.generate_sql_points(match_number, ts, 'Blue', game_events_blue1, game_events_blue2))
+                    result = cur.execute(self.generate_sql_penalty(match_number, ts, 'Red', game_events_red1, game_events_red2))
+                    result = cur.execute(self.generate_sql_penalty(match_number, ts, 'Blue', game_events_blue1, game_events_blue2))
+                    result = cur.execute(self.generate_sql_commit(match_number, ts))
+                    conn.commit()
+                    conn.close()
                 self.message_box(
                     f'The score of match #{match_number} has been saved back to FTC Score Keeper as a "Scorekeeper Edit"'
                     f' in this match\'s history. please: \n'
@@ -469,12 +570,7 @@ class EventPlanner(QtWidgets.QMainWindow):
                     f' - Review and adjust before "Commit"\n')
 
     def read_game_events(self, match_number, alliance, team_number):
-        match_folder = os.path.join(self.root_folder, self.FOLDER_MATCH, f'Match #{match_number}')
-        match_file_prefix = self.match_video_file_prefix(alliance, team_number, match_number)
-        video_manifest_filename = os.path.join(match_folder, f'{match_file_prefix}.yml')
-        with open(video_manifest_filename) as file:
-            video_manifest = yaml.load(file, Loader=yaml.SafeLoader)
-            return video_manifest['GameEvents']
+        return self.catalog.game_events(match_number, alliance, team_number)
 
     PATTERN_HIGH_GOAL = re.compile(r'.* high \(([0-9]+)\).*')
     PATTERN_MID_GOAL = re.compile(r'.* mid \(([0-9]+)\).*')
@@ -595,4 +691,4 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    main()
+    metrics.run('event-planner', main)
@@ -0,0 +1,201 @@
+"""
+Benchmark of EventPlanner on a synthetic event (see EventPlanner.fixtures), without a display
+
+The window runs on the "offscreen" Qt platform, and each operation is timed a few times :
+
+ - read_from_db : load the schedule and fill the table
+ - generate : the folder scaffolding into an empty root folder, then again over the existing tree
+ - update_ui (cold) : the first tick, every manifest of the catalog is parsed
+ - update_ui : the next ticks, nothing changed
+ - update_ui (1 manifest) : a tick after a referee saved one video manifest
+
+The poster frames and the verifications of the dummy videos are not extracted, only the scan and the table code of
+EventPlanner are timed.
+
+Usage: python -m EventPlanner.benchmark [--matches 300] [--teams 80] [--runs 5] [--json benchmark.json]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import statistics
+
+# before Qt is loaded, the window is never shown
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide2 import QtWidgets
+
+from EventPlanner import fixtures
+from EventPlanner.__main__ import EventPlanner
+from Manifest import layout
+from Manifest.catalog import default_catalog_file
+from MediaTools import metrics
+
+RUNS = 5
+
+
+class Measure:
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = []
+        self.parsed = 0
+
+    def time(self, function, *args):
+        parsed = metrics.metrics.counter('manifest.parse')
+        started = time.perf_counter()
+        function(*args)
+        self.seconds.append(time.perf_counter() - started)
+        self.parsed += metrics.metrics.counter('manifest.parse') - parsed
+
+    def to_dict(self):
+        return {'name': self.name, 'runs': len(self.seconds), 'min': min(self.seconds),
+                'median': statistics.median(self.seconds), 'max': max(self.seconds),
+                'manifests_parsed': self.parsed / len(self.seconds)}
+
+
+def new_planner(db_file=None, root_folder=None):
+    planner = EventPlanner(db_file=db_file, root_folder=root_folder)
+    # the ticks are called by the benchmark only
+    planner.timer.stop()
+    planner.media_jobs.submit = lambda *args, **kwargs: None
+    planner.message_box = lambda message: None
+    return planner
+
+
+def generate(planner):
+    """Generate the folders and wait for the background scaffolding"""
+    planner.generate()
+    while not planner.generatebutton.isEnabled():
+        QtWidgets.QApplication.processEvents()
+        time.sleep(0.001)
+
+
+def close_planner(planner):
+    planner.timer.stop()
+    if planner.catalog is not None:
+        planner.catalog.close()
+    planner.close()
+    planner.deleteLater()
+    QtWidgets.QApplication.processEvents()
+
+
+def benchmark_generate(db_file, work_folder, runs):
+    """Measures of the scaffolding into an empty folder, and over the folder already generated"""
+    fresh = Measure('generate')
+    again = Measure('generate (existing tree)')
+    get_existing_directory = QtWidgets.QFileDialog.getExistingDirectory
+    message_box_exec = QtWidgets.QMessageBox.exec
+    QtWidgets.QMessageBox.exec = lambda self: QtWidgets.QMessageBox.Yes
+    try:
+        for run in range(runs):
+            root_folder = os.path.join(work_folder, f'generate{run}')
+            os.mkdir(root_folder)
+            QtWidgets.QFileDialog.getExistingDirectory = lambda *args: root_folder
+            planner = new_planner(db_file)
+            fresh.time(generate, planner)
+            again.time(generate, planner)
+            close_planner(planner)
+    finally:
+        QtWidgets.QFileDialog.getExistingDirectory = get_existing_directory
+        QtWidgets.QMessageBox.exec = message_box_exec
+    return [fresh, again]
+
+
+def touch_video_manifest(root_folder):
+    """Save a video manifest again, as a referee changing a review, return its path"""
+    matches_folder = os.path.join(root_folder, layout.FOLDER_MATCH)
+    for match_folder in sorted(os.listdir(matches_folder)):
+        for name in sorted(os.listdir(os.path.join(matches_folder, match_folder))):
+            if name.endswith('.yml') and '-team' in name:
+                manifest = os.path.join(matches_folder, match_folder, name)
+                with open(manifest, 'a') as file:
+                    file.write('\n')
+                return manifest
+    return None
+
+
+def run_benchmark(db_file, root_folder, work_folder, runs=RUNS):
+    """[Measure] of the EventPlanner operations"""
+    measures = []
+    measure = Measure('read_from_db')
+    for _ in range(runs):
+        planner = new_planner()
+        measure.time(planner.read_from_db, db_file)
+        close_planner(planner)
+    measures.append(measure)
+    measures += benchmark_generate(db_file, work_folder, runs)
+
+    cold = Measure('update_ui (cold)')
+    warm = Measure('update_ui')
+    incremental = Measure('update_ui (1 manifest)')
+    catalog_file = default_catalog_file(root_folder)
+    for _ in range(runs):
+        # a new catalog each run, so the first tick parses everything
+        if os.path.exists(catalog_file):
+            os.remove(catalog_file)
+        planner = new_planner(db_file)
+        planner.set_root_folder(root_folder)
+        cold.time(planner.update_ui)
+        for _ in range(runs):
+            warm.time(planner.update_ui)
+        touch_video_manifest(root_folder)
+        incremental.time(planner.update_ui)
+        close_planner(planner)
+    return measures + [cold, warm, incremental]
+
+
+def print_measures(measures):
+    print(f'{"operation":<28}{"runs":>6}{"min ms":>10}{"median ms":>11}{"max ms":>10}{"parsed":>8}')
+    for measure in measures:
+        result = measure.to_dict()
+        print(f'{result["name"]:<28}{result["runs"]:>6}{result["min"] * 1000:>10.1f}{result["median"] * 1000:>11.1f}'
+              f'{result["max"] * 1000:>10.1f}{result["manifests_parsed"]:>8.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the EventPlanner operations on a synthetic event, without a display')
+    parser.add_argument('--matches', type=int, default=fixtures.MATCH_COUNT, help=f'Number of qualification matches, default to {fixtures.MATCH_COUNT}')
+    parser.add_argument('--teams', type=int, default=fixtures.TEAM_COUNT, help=f'Number of teams, default to {fixtures.TEAM_COUNT}')
+    parser.add_argument('--runs', type=int, default=RUNS, help=f'Number of runs of each operation, default to {RUNS}')
+    parser.add_argument('--fixture', type=str, default=None,
+                        help='Folder of a fixture created by EventPlanner.fixtures, a new one is created otherwise')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the fixture')
+    parser.add_argument('--json', type=str, default=None, help='Also write the results to this json file')
+    args = parser.parse_args()
+    app = QtWidgets.QApplication(sys.argv)
+    work_folder = tempfile.mkdtemp(prefix='event-planner-benchmark-')
+    try:
+        if args.fixture is not None:
+            db_file = os.path.join(args.fixture, fixtures.DB_FILENAME)
+            root_folder = os.path.join(args.fixture, fixtures.ROOT_FOLDERNAME)
+            if not os.path.isfile(db_file) or not os.path.isdir(root_folder):
+                print(f'ERROR : Fixture folder passed in [{args.fixture}] has no score keeper database or event tree')
+                sys.exit(1)
+            # the benchmark changes a video manifest, the fixture is used from a copy
+            shutil.copytree(root_folder, os.path.join(work_folder, fixtures.ROOT_FOLDERNAME))
+            root_folder = os.path.join(work_folder, fixtures.ROOT_FOLDERNAME)
+        else:
+            db_file, root_folder, counts = fixtures.create_fixture(
+                os.path.join(work_folder, 'fixture'), args.matches, args.teams, seed=args.seed)
+            print(f'Fixture of {args.matches} matches and {args.teams} teams : '
+                  + ', '.join(f'{count} {state}' for state, count in counts.items()))
+        measures = run_benchmark(db_file, root_folder, work_folder, args.runs)
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+    print_measures(measures)
+    if args.json is not None:
+        with open(args.json, 'w') as file:
+            json.dump([measure.to_dict() for measure in measures], file, indent=2)
+    app.quit()
+
+
+if __name__ == '__main__':
+    metrics.run('event-planner-benchmark', main)
@@ -0,0 +1,226 @@
+"""
+Synthetic FTC score keeper database and event folder tree, to try and measure EventPlanner at the scale of a big event
+
+The database has the tables read by EventPlanner ("quals", "teamInfo") and the history tables it writes the scores
+back to, the schedule is built in rounds like the score keeper does : every team plays once per round, with
+surrogate matches to fill the last match of a round.
+
+The folder tree is generated as EventPlanner does (see EventPlanner.scaffold), with each team video in a state of the review, the earlier
+matches being further along :
+
+ - No Video : nothing uploaded yet
+ - Uploaded : a video in the team upload folder
+ - Copied : the video copied to the match folder
+ - Reviewed : the video manifest saved by MatchVideoProcesser
+ - Published : the four videos reviewed and the match video published
+
+The videos are small dummy files, or hard links to a sample video given with --video.
+
+Usage: python -m EventPlanner.fixtures path/to/fixture [--matches 300] [--teams 80] [--video sample.mp4]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import random
+import shutil
+import sqlite3
+import argparse
+
+from Manifest import files, layout
+from EventPlanner import scaffold
+from Manifest.model import GameEvent, GameVideo
+from MediaTools import metrics, store
+
+DB_FILENAME = 'scorekeeper.db'
+ROOT_FOLDERNAME = 'event'
+
+STATE_NO_VIDEO = 'No Video'
+STATE_UPLOADED = 'Uploaded'
+STATE_COPIED = 'Copied'
+STATE_REVIEWED = 'Reviewed'
+STATE_PUBLISHED = 'Published'
+STATES = [STATE_NO_VIDEO, STATE_UPLOADED, STATE_COPIED, STATE_REVIEWED, STATE_PUBLISHED]
+
+MATCH_COUNT = 300
+TEAM_COUNT = 80
+FIRST_TEAM_NUMBER = 10000
+DUMMY_VIDEO_BYTES = 4096
+GAME_START_OFFSETS = (3, 40)
+# events of a reviewed video, as recorded by MatchVideoProcesser
+GAME_EVENTS = [
+    (0, 30, 'Power Shot Target Knocked(auton)', 15),
+    (0, 30, 'Wobble Goal Delivered to Target Zone', 15),
+    (0, 30, 'Launched Rings into Goals(auton), high (1)', 12),
+    (25, 30, 'Robot Parked', 5),
+    (38, 120, 'Launched Rings into Goals(teleop), high (3)', 18),
+    (38, 120, 'Launched Rings into Goals(teleop), mid (2)', 8),
+    (38, 120, 'Launched Rings into Goals(teleop), low (3)', 6),
+    (120, 150, 'Power Shot Target Knocked(endgame)', 15),
+    (120, 150, 'Wobble Goal Delivered to Drop Zone', 20),
+    (120, 150, 'Wobble Goal Delivered to Start Line', 5),
+    (0, 150, 'Minor Penalty, robot outside the field', -10),
+    (0, 150, 'Major Penalty, pinning', -30),
+]
+EVENTS_PER_VIDEO = (3, 12)
+NAME_WORDS = ['Iron', 'Quantum', 'Robo', 'Gear', 'Circuit', 'Titan', 'Nova', 'Pixel', 'Atomic', 'Cyber', 'Bolt',
+              'Falcon', 'Phoenix', 'Vortex', 'Spark', 'Orbit', 'Comet', 'Raptor', 'Hydra', 'Nexus']
+
+SCHEMA = '''
+CREATE TABLE quals (match INTEGER PRIMARY KEY, red1 INTEGER, red1S INTEGER, red2 INTEGER, red2S INTEGER,
+    blue1 INTEGER, blue1S INTEGER, blue2 INTEGER, blue2S INTEGER);
+CREATE TABLE teamInfo (number INTEGER PRIMARY KEY, name TEXT, school TEXT, city TEXT, state TEXT, country TEXT,
+    rookie INTEGER);
+CREATE TABLE qualsGameSpecificHistory (match INTEGER, ts INTEGER, alliance INTEGER, navigated1 INTEGER,
+    navigated2 INTEGER, wobbleDelivered1 INTEGER, wobbleDelivered2 INTEGER, autoTowerLow INTEGER, autoTowerMid INTEGER,
+    autoTowerHigh INTEGER, teleopTowerLow INTEGER, teleopTowerMid INTEGER, teleopTowerHigh INTEGER, wobbleEnd1 INTEGER,
+    wobbleEnd2 INTEGER, wobbleRings1 INTEGER, wobbleRings2 INTEGER, autoPowerShotLeft INTEGER,
+    autoPowerShotCenter INTEGER, autoPowerShotRight INTEGER, endPowerShotLeft INTEGER, endPowerShotCenter INTEGER,
+    endPowerShotRight INTEGER);
+CREATE TABLE qualsScoresHistory (match INTEGER, ts INTEGER, alliance INTEGER, card1 INTEGER, card2 INTEGER,
+    dq1 INTEGER, dq2 INTEGER, noshow1 INTEGER, noshow2 INTEGER, major INTEGER, minor INTEGER, adjust INTEGER);
+CREATE TABLE qualsCommitHistory (match INTEGER, ts INTEGER, start INTEGER, random INTEGER, type INTEGER);
+'''
+
+
+def synthetic_teams(count, rng):
+    """[(number, name)] of made-up teams, the names are safe as folder names"""
+    numbers = sorted(rng.sample(range(FIRST_TEAM_NUMBER, FIRST_TEAM_NUMBER + count * 10), count))
+    return [(number, f'{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)}bots') for number in numbers]
+
+
+def synthetic_schedule(team_numbers, match_count, rng):
+    """[(match, [(team, surrogate)] * 4)] in rounds, every team plays once per round
+
+    The last match of a round is filled with teams of the next round's order, which play it as surrogates.
+    """
+    schedule = []
+    order = []
+    while len(schedule) < match_count:
+        if not order:
+            order = rng.sample(team_numbers, len(team_numbers))
+        positions = [(team, 0) for team in order[:4]]
+        order = order[4:]
+        if len(positions) < 4:
+            playing = {team for team, _ in positions}
+            fill = [team for team in rng.sample(team_numbers, len(team_numbers)) if team not in playing]
+            positions += [(team, 1) for team in fill[:4 - len(positions)]]
+        schedule.append((len(schedule) + 1, positions))
+    return schedule
+
+
+def create_scorekeeper_db(filename, match_count=MATCH_COUNT, team_count=TEAM_COUNT, seed=0):
+    """Create the score keeper database, return (quals, teams) as lists of dict"""
+    rng = random.Random(seed)
+    if os.path.exists(filename):
+        os.remove(filename)
+    teams = synthetic_teams(team_count, rng)
+    schedule = synthetic_schedule([number for number, _ in teams], match_count, rng)
+    conn = sqlite3.connect(filename)
+    with conn:
+        conn.executescript(SCHEMA)
+        conn.executemany('INSERT INTO teamInfo VALUES (?, ?, ?, ?, ?, ?, ?)', [
+            (number, name, f'{name} High School', 'Seattle', 'WA', 'USA', int(rng.random() < 0.2))
+            for number, name in teams])
+        conn.executemany('INSERT INTO quals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+            (match, *[value for team in positions for value in team]) for match, positions in schedule])
+    conn.close()
+    quals = [dict(match=match, **{position: team for (position, _), (team, _) in zip(layout.POSITIONS, positions)})
+             for match, positions in schedule]
+    return quals, [{'number': number, 'name': name} for number, name in teams]
+
+
+def match_state(match, match_count, rng):
+    """State of the furthest video of a match, the earlier matches of the schedule are further along"""
+    progress = 1 - (match - 1) / max(1, match_count - 1)
+    return STATES[min(len(STATES) - 1, int(progress * len(STATES) + rng.uniform(-0.5, 0.5)))]
+
+
+def synthetic_video_manifest(rng):
+    start = rng.randint(*GAME_START_OFFSETS)
+    events = [GameEvent(start + rng.randint(earliest, latest), description, point)
+              for earliest, latest, description, point in rng.sample(GAME_EVENTS, rng.randint(*EVENTS_PER_VIDEO))]
+    return GameVideo(game_start_offset=start, events=sorted(events, key=lambda event: event.time)).video_manifest_dict()
+
+
+def write_video(filename, sample_video):
+    if sample_video is not None:
+        store.link_or_copy(sample_video, filename)
+    else:
+        with open(filename, 'wb') as file:
+            file.write(b'\0' * DUMMY_VIDEO_BYTES)
+
+
+def create_event_tree(root_folder, quals, teams, sample_video=None, seed=0):
+    """Generate the folders and manifests as EventPlanner does, and the videos in their states, return {state: videos}"""
+    rng = random.Random(seed)
+    names = {team['number']: team['name'] for team in teams}
+    os.makedirs(root_folder, exist_ok=True)
+    scaffold.scaffold(root_folder, quals, names)
+    upload_folder = os.path.join(root_folder, layout.FOLDER_TEAM)
+    published_folder = os.path.join(root_folder, layout.FOLDER_PUBLISHED)
+    counts = {state: 0 for state in STATES}
+    for match in quals:
+        number = match['match']
+        match_folder = os.path.join(root_folder, layout.FOLDER_MATCH, f'Match #{number}')
+        furthest = STATES.index(match_state(number, len(quals), rng))
+        states = [STATES[furthest]] * 4 if furthest == len(STATES) - 1 else \
+            [STATES[rng.randint(max(0, furthest - 1), furthest)] for _ in range(4)]
+        for (position, alliance), state in zip(layout.POSITIONS, states):
+            counts[state] += 1
+            team = match[position]
+            _, team_match_folder = scaffold.match_upload_folder(upload_folder, team, names[team], number, alliance)
+            if state == STATE_NO_VIDEO:
+                continue
+            upload = os.path.join(team_match_folder, f'{team} match {number}.mp4')
+            write_video(upload, sample_video)
+            if state == STATE_UPLOADED:
+                continue
+            # the name EventPlanner copies the upload to
+            shutil.copy2(upload, os.path.join(match_folder, f'{scaffold.match_video_file_prefix(alliance, team, number)}.mp4'))
+            if state == STATE_COPIED:
+                continue
+            files.safe_dump(synthetic_video_manifest(rng), os.path.join(
+                match_folder, f'{scaffold.match_video_file_prefix(alliance, team, number)}.yml'))
+        if STATES[furthest] == STATE_PUBLISHED:
+            write_video(os.path.join(published_folder, f'match{number}.mp4'), sample_video)
+    return counts
+
+
+def create_fixture(folder, match_count=MATCH_COUNT, team_count=TEAM_COUNT, sample_video=None, seed=0):
+    """Create the score keeper database and the event tree in the folder, return (db file, root folder, counts)"""
+    os.makedirs(folder, exist_ok=True)
+    db_file = os.path.join(folder, DB_FILENAME)
+    root_folder = os.path.join(folder, ROOT_FOLDERNAME)
+    quals, teams = create_scorekeeper_db(db_file, match_count, team_count, seed)
+    counts = create_event_tree(root_folder, quals, teams, sample_video, seed)
+    return db_file, root_folder, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create a synthetic score keeper database and event folder tree')
+    parser.add_argument('folder', type=str, help=f'The folder of the fixture, with "{DB_FILENAME}" and the "{ROOT_FOLDERNAME}" root folder')
+    parser.add_argument('--matches', type=int, default=MATCH_COUNT, help=f'Number of qualification matches, default to {MATCH_COUNT}')
+    parser.add_argument('--teams', type=int, default=TEAM_COUNT, help=f'Number of teams, default to {TEAM_COUNT}')
+    parser.add_argument('--video', type=str, default=None, help='Sample video linked as every video, small dummy files otherwise')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the random schedule, names and states')
+    args = parser.parse_args()
+    if args.teams < 4:
+        print('ERROR : At least 4 teams are needed')
+        sys.exit(1)
+    if os.path.exists(os.path.join(args.folder, ROOT_FOLDERNAME)):
+        print(f'ERROR : The fixture folder [{args.folder}] already has an event tree')
+        sys.exit(1)
+    if args.video is not None and not os.path.isfile(args.video):
+        print(f'ERROR : Sample video passed in [{args.video}] not exists')
+        sys.exit(1)
+    db_file, root_folder, counts = create_fixture(args.folder, args.matches, args.teams, args.video, args.seed)
+    print(f'Score keeper database [{db_file}] with {args.matches} matches and {args.teams} teams')
+    print(f'Event tree [{root_folder}] : ' + ', '.join(f'{count} {state}' for state, count in counts.items()))
+    print(f'Try it : python event-planner.py "{db_file}" "{root_folder}"')
+
+
+if __name__ == '__main__':
+    metrics.run('fixtures', main)
@@ -0,0 +1,360 @@
+"""
+Folder scaffolding of an event, planned from the schedule, compared with the existing tree and applied in parallel
+
+Generating the folders one call after the other is slow on a synced cloud folder, and generating them again after
+the schedule changed used to leave the folders of the old schedule behind. Instead :
+
+ - plan : the folders, placeholder text files and match manifests the schedule needs
+ - diff : one scan of the existing tree, what is missing, what is renamed (a team renamed in the score keeper, a
+   team moved to the other alliance of a match, with its copied video and video manifest), which match manifests
+   changed, and the orphan folders of matches and teams no longer in the schedule
+ - apply : the renames first, then the folders level by level and the files, on a pool of threads
+
+The orphan folders are only reported, they may hold uploaded videos.
+
+Usage: python -m EventPlanner.scaffold path/to/event/root path/to/scorekeeper.db [--dry-run] [--jobs 16]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from Manifest import files
+from Manifest.layout import FOLDER_MATCH, FOLDER_PUBLISHED, FOLDER_TEAM, PATTERN_MATCH_FOLDER, PATTERN_TEAM_FOLDER, \
+    PATTERN_UPLOAD_MATCH_FOLDER, POSITIONS
+from Manifest.model import GameVideo, Team, VirtualGame
+from MediaTools import metrics
+
+NOTE_UPLOADS = 'Please share these folders for individual team separately!'
+NOTE_TEAM = 'Please upload the game video file (mp4, 480p suggested) to corresponding match folder'
+NOTE_MATCH = 'Please use MatchVideoProcessor to generate Video Manifest yaml file!'
+NOTE_PUBLISHED = 'Please use GameProducer to generate the Match Videos to here!'
+# the calls wait on the drive, mostly a synced cloud folder
+JOBS = 16
+
+
+class ScaffoldException(Exception):
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+def match_upload_folder(upload_folder, team_number, team_name, match_number, alliance):
+    team_folder = os.path.join(upload_folder, f'{team_number}-{team_name}')
+    match_folder = os.path.join(team_folder, f'Match #{match_number} {alliance} Alliance')
+    return team_folder, match_folder
+
+
+def match_video_file_prefix(alliance, team_number, match_number):
+    """Name of the copied video and its video manifest without extension, the alliance in lower case like the match
+    manifest names them, so the tools find them on the case sensitive drives
+    """
+    return f'match{match_number}-{alliance.lower()}-team{team_number}'
+
+
+def upload_note(match_number, alliance):
+    return f'Please upload the match video file of #{match_number} ({alliance} Alliance) to this folder'
+
+
+def other_alliance(alliance):
+    return 'Blue' if alliance == 'Red' else 'Red'
+
+
+def match_manifest(match, teams):
+    """Content of the match manifest of a row of the schedule, teams is {team number: team name}"""
+    game_teams = []
+    for position, alliance in POSITIONS:
+        team_number = match[position]
+        if team_number not in teams:
+            raise ScaffoldException(f'Team {team_number} not found')
+        match_file_prefix = match_video_file_prefix(alliance, team_number, match['match'])
+        game_teams.append(Team(teams[team_number], team_number, alliance,
+                               GameVideo(f'{match_file_prefix}.mp4', f'{match_file_prefix}.yml')))
+    return VirtualGame(f'Match #{match["match"]}', game_teams).to_dict()
+
+
+class ScaffoldPlan:
+    """The tree the schedule needs, the paths are relative to the root folder"""
+
+    def __init__(self):
+        self.folders = []
+        # path -> content
+        self.text_files = {}
+        self.manifests = {}
+        # (match number, team number) -> alliance
+        self.alliances = {}
+
+    def folder(self, folder, note=None):
+        if folder not in self.folders:
+            self.folders.append(folder)
+        if note is not None:
+            self.text_files.setdefault(os.path.join(folder, note), '')
+
+
+def plan_tree(quals, teams):
+    """ScaffoldPlan of the rows of the schedule ("quals"), teams is {team number: team name}"""
+    plan = ScaffoldPlan()
+    plan.folder(FOLDER_TEAM, NOTE_UPLOADS)
+    for match in quals:
+        for position, alliance in POSITIONS:
+            team_number = match[position]
+            if team_number not in teams:
+                raise ScaffoldException(f'Team {team_number} not found')
+            team_folder, team_match_folder = match_upload_folder(FOLDER_TEAM, team_number, teams[team_number], match['match'], alliance)
+            plan.folder(team_folder, NOTE_TEAM)
+            plan.folder(team_match_folder, upload_note(match['match'], alliance))
+            plan.alliances[(match['match'], team_number)] = alliance
+    plan.folder(FOLDER_MATCH)
+    for match in quals:
+        match_folder = os.path.join(FOLDER_MATCH, f'Match #{match["match"]}')
+        plan.folder(match_folder, NOTE_MATCH)
+        plan.manifests[os.path.join(match_folder, f'match{match["match"]}.yml')] = match_manifest(match, teams)
+    plan.folder(FOLDER_PUBLISHED, NOTE_PUBLISHED)
+    return plan
+
+
+def scan_tree(root_folder):
+    """(folders, files) of the existing tree relative to the root folder, down to the team upload match folders"""
+    folders = set()
+    found_files = set()
+
+    def scan(folder, depth):
+        try:
+            with os.scandir(os.path.join(root_folder, folder)) as it:
+                entries = [(entry.name, entry.is_dir()) for entry in it]
+        except FileNotFoundError:
+            return
+        for name, is_dir in entries:
+            path = os.path.join(folder, name)
+            if is_dir:
+                folders.add(path)
+                if depth > 1:
+                    scan(path, depth - 1)
+            else:
+                found_files.add(path)
+
+    with metrics.span('scaffold.scan', root=root_folder):
+        scan(FOLDER_TEAM, 3)
+        scan(FOLDER_MATCH, 2)
+        scan(FOLDER_PUBLISHED, 1)
+        for name in (FOLDER_TEAM, FOLDER_MATCH, FOLDER_PUBLISHED):
+            if os.path.isdir(os.path.join(root_folder, name)):
+                folders.add(name)
+    return folders, found_files
+
+
+def renamed(path, renames):
+    """The path after the renames of its parent folders"""
+    for old, new in renames:
+        if path == old or path.startswith(old + os.sep):
+            path = new + path[len(old):]
+    return path
+
+
+class ScaffoldDiff:
+
+    def __init__(self, plan):
+        self.plan = plan
+        # (old, new) relative paths of the folders and files, applied in this order
+        self.renames = []
+        self.folders = []
+        self.text_files = []
+        self.manifests = []
+        # placeholder text files of the old schedule
+        self.stale_files = []
+        self.orphans = []
+        # files not renamed as the file of the new name exists already
+        self.conflicts = []
+        self.errors = []
+
+    @property
+    def empty(self):
+        return not (self.renames or self.folders or self.text_files or self.manifests or self.stale_files)
+
+    def summary(self):
+        lines = [f'{len(self.folders)} folders, {len(self.text_files)} text files and {len(self.manifests)} match manifests to write, '
+                 f'{len(self.renames)} folders and files to rename, {len(self.stale_files)} text files to remove']
+        lines += [f'  rename [{old}] to [{new}]' for old, new in self.renames]
+        lines += [f'  orphan [{orphan}], not in the schedule' for orphan in self.orphans]
+        lines += [f'  conflict [{old}] not renamed, [{new}] exists' for old, new in self.conflicts]
+        lines += [f'  ERROR : {error}' for error in self.errors]
+        return '\n'.join(lines)
+
+
+def load_manifest(filename):
+    try:
+        with open(filename) as file:
+            return yaml.safe_load(file)
+    except (OSError, yaml.YAMLError):
+        return None
+
+
+def diff_tree(root_folder, plan, jobs=JOBS):
+    """ScaffoldDiff of the plan against the existing tree"""
+    folders, found_files = scan_tree(root_folder)
+    diff = ScaffoldDiff(plan)
+    planned = set(plan.folders)
+    # a team renamed in the score keeper keeps its uploads
+    team_folders = {}
+    for folder in folders:
+        parts = PATTERN_TEAM_FOLDER.match(os.path.basename(folder))
+        if os.path.dirname(folder) == FOLDER_TEAM and parts and folder not in planned:
+            team_folders.setdefault(int(parts.group(1)), folder)
+    for folder in plan.folders:
+        parts = PATTERN_TEAM_FOLDER.match(os.path.basename(folder))
+        if os.path.dirname(folder) == FOLDER_TEAM and parts and folder not in folders:
+            old = team_folders.pop(int(parts.group(1)), None)
+            if old is not None:
+                diff.renames.append((old, folder))
+    folders = {renamed(folder, diff.renames) for folder in folders}
+    found_files = {renamed(filename, diff.renames) for filename in found_files}
+    # a team moved to the other alliance of a match keeps its upload
+    for folder in plan.folders:
+        parts = PATTERN_UPLOAD_MATCH_FOLDER.match(os.path.basename(folder))
+        if parts and folder not in folders:
+            other = other_alliance(parts.group(2))
+            old = os.path.join(os.path.dirname(folder), f'Match #{parts.group(1)} {other} Alliance')
+            if old in folders and old not in planned:
+                diff.renames.append((old, folder))
+                folders = {renamed(path, [(old, folder)]) for path in folders}
+                found_files = {renamed(path, [(old, folder)]) for path in found_files}
+                stale_file = os.path.join(folder, upload_note(parts.group(1), other))
+                if stale_file in found_files:
+                    diff.stale_files.append(stale_file)
+                    found_files.remove(stale_file)
+    # and its copied video, video manifest and their caches in the match folder, or its review is lost. The copies
+    # of the older versions named "Red" / "Blue" are renamed to the lower case names of the match manifest as well
+    match_files = {}
+    for filename in found_files:
+        match_files.setdefault(os.path.dirname(filename), []).append(filename)
+    for (match_number, team_number), alliance in plan.alliances.items():
+        match_folder = os.path.join(FOLDER_MATCH, f'Match #{match_number}')
+        prefix = match_video_file_prefix(alliance, team_number, match_number)
+        old_prefixes = [prefix, match_video_file_prefix(other_alliance(alliance), team_number, match_number)]
+        for filename in sorted(match_files.get(match_folder, [])):
+            name = os.path.basename(filename)
+            old_prefix = next((old_prefix for old_prefix in old_prefixes if name.lower().startswith(old_prefix + '.')), None)
+            if old_prefix is None or name.startswith(prefix + '.'):
+                continue
+            new = os.path.join(match_folder, prefix + name[len(old_prefix):])
+            if new in found_files:
+                diff.conflicts.append((filename, new))
+            else:
+                diff.renames.append((filename, new))
+                found_files.remove(filename)
+                found_files.add(new)
+    diff.folders = [folder for folder in plan.folders if folder not in folders]
+    diff.text_files = [filename for filename in plan.text_files if filename not in found_files]
+    existing = [filename for filename in plan.manifests if filename in found_files]
+    diff.manifests = [filename for filename in plan.manifests if filename not in found_files]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        contents = executor.map(load_manifest, [os.path.join(root_folder, filename) for filename in existing])
+        diff.manifests += [filename for filename, content in zip(existing, contents) if content != plan.manifests[filename]]
+    diff.orphans = sorted(folder for folder in folders if folder not in planned and (
+        PATTERN_MATCH_FOLDER.match(os.path.basename(folder)) and os.path.dirname(folder) == FOLDER_MATCH
+        or PATTERN_TEAM_FOLDER.match(os.path.basename(folder)) and os.path.dirname(folder) == FOLDER_TEAM
+        # the match folders of an orphan team folder are not listed again
+        or PATTERN_UPLOAD_MATCH_FOLDER.match(os.path.basename(folder)) and os.path.dirname(folder) in planned))
+    return diff
+
+
+def create_folder(folder):
+    try:
+        os.mkdir(folder)
+    except FileExistsError:
+        pass
+
+
+def create_text_file(filename, content=''):
+    try:
+        with open(filename, 'x') as file:
+            file.write(content)
+    except FileExistsError:
+        pass
+
+
+def apply_diff(root_folder, diff, jobs=JOBS):
+    """Apply the diff, the errors are recorded in diff.errors"""
+    with metrics.span('scaffold.apply', root=root_folder, folders=len(diff.folders), renames=len(diff.renames)):
+        for old, new in diff.renames:
+            try:
+                os.rename(os.path.join(root_folder, old), os.path.join(root_folder, new))
+            except OSError as ex:
+                diff.errors.append(f'cannot rename [{old}], {ex}')
+        for filename in diff.stale_files:
+            try:
+                os.remove(os.path.join(root_folder, filename))
+            except FileNotFoundError:
+                pass
+            except OSError as ex:
+                diff.errors.append(f'cannot remove [{filename}], {ex}')
+        levels = {}
+        for folder in diff.folders:
+            levels.setdefault(folder.count(os.sep), []).append(folder)
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # the parent folders first
+            for level in sorted(levels):
+                run_all(executor, diff, [(create_folder, os.path.join(root_folder, folder)) for folder in levels[level]])
+            run_all(executor, diff, [(create_text_file, os.path.join(root_folder, filename), diff.plan.text_files[filename])
+                                     for filename in diff.text_files]
+                    + [(files.safe_dump, diff.plan.manifests[filename], os.path.join(root_folder, filename))
+                       for filename in diff.manifests])
+    return diff
+
+
+def run_all(executor, diff, calls):
+    futures = [executor.submit(*call) for call in calls]
+    for future in futures:
+        try:
+            future.result()
+        except OSError as ex:
+            diff.errors.append(str(ex))
+
+
+def scaffold(root_folder, quals, teams, dry_run=False, jobs=JOBS):
+    """Plan, diff and apply the scaffolding of the schedule, return the ScaffoldDiff"""
+    diff = diff_tree(root_folder, plan_tree(quals, teams), jobs)
+    if not dry_run:
+        apply_diff(root_folder, diff, jobs)
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the folders and match manifests of the schedule, only what changed')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('db', type=str, help='The FTC score keeper database')
+    parser.add_argument('--dry-run', action='store_true', help='Only print what would be done')
+    parser.add_argument('--jobs', type=int, default=JOBS, help=f'Number of parallel file system calls, default to {JOBS}')
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        print(f'ERROR : Root folder passed in [{args.root}] not exists')
+        sys.exit(1)
+    if not os.path.isfile(args.db):
+        print(f'ERROR : DB file passed in [{args.db}] not exists')
+        sys.exit(1)
+    conn = sqlite3.connect(args.db)
+    conn.row_factory = sqlite3.Row
+    quals = conn.execute('SELECT * FROM quals').fetchall()
+    teams = {row['number']: row['name'] for row in conn.execute('SELECT * FROM teamInfo')}
+    conn.close()
+    try:
+        diff = scaffold(args.root, quals, teams, args.dry_run, args.jobs)
+    except ScaffoldException as ex:
+        print(f'ERROR : {ex}')
+        sys.exit(1)
+    print(diff.summary())
+    if diff.errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    metrics.run('scaffold', main)
@@ -1,39 +1,35 @@
 #!/usr/bin/env python3
 import argparse
+import sys
+import math
 import json
-import yaml
 import tempfile
 import os
 from os import path
 from datetime import datetime
-import re
+
+from GameProducer.overlay import drawtext_filters, sendcmd_filter, write_sendcmd_file
+from GameProducer.profiles import DEFAULT_PROFILE, PROFILES, encoder_profile
+from Manifest.loader import ManifestException, load_match_manifest
+from MediaTools import metrics
+from MediaTools.ffmpeg import FFmpegException
+from MediaTools.keyframes import load_keyframe_index, plan_seek
+from MediaTools.loudness import TARGET_LOUDNESS, linear_gain, load_loudness
 
 # Read a game manifest file and construct ffmpeg command to produce the game video
 #
 
-
-parser = argparse.ArgumentParser(description='Read a game manifest file and construct ffmpeg command to produce the game video')
-parser.add_argument('manifest', type=str, help='The manifest file name')
-parser.add_argument('output', type=str, help='Output file name, "-" is supported to pipe to preview (such as "| ffplay -"')
-args = parser.parse_args()
-
-offset_pattern = re.compile(r'^([0-9]+):([0-9]+)$')
 MAX_OFFSET = 3600
-
-def mmss_to_seconds(mmss):
-    if type(mmss) == str:
-        offset_parts = offset_pattern.match(mmss)
-        assert offset_parts is not None, 'Game event offset must be in "MM:SS" format'
-        return int(offset_parts.group(1)) * 60 + int(offset_parts.group(2))
-    else:
-        # yaml automatically parse the MM:SS to seconds, but not all the time.
-        return mmss
+# -1 dBFS
+MIX_PEAK_LIMIT = 0.891
 
 
 def seconds_to_hhmmss(seconds):
+    milliseconds = int(round(seconds * 1000))
+    seconds, milliseconds = divmod(milliseconds, 1000)
     minutes, seconds = divmod(seconds, 60)
     hours, minutes = divmod(minutes, 60)
-    return f'{hours:02}:{minutes:02}:{seconds:02}.000'
+    return f'{hours:02}:{minutes:02}:{seconds:02}.{milliseconds:03}'
 
 
 class EventSrt:
@@ -96,101 +92,220 @@ class EventSrt:
         self.sequence += 1
 
 
-with open(args.manifest) as file:
-    game = yaml.load(file, Loader=yaml.SafeLoader)
-    project_name = path.splitext(path.basename(args.manifest))[0]
-    manifest_folder = path.dirname(args.manifest)
-    # validations
-    assert 'VirtualGame' in game
-    assert 'Name' in game['VirtualGame']
-    assert 'Teams' in game['VirtualGame']
-    assert 4 == len(game['VirtualGame']['Teams'])
-    # iterate all teams
-    start_offset = MAX_OFFSET
-    alliance = {'Red': [], 'Blue': []}
-    for team in game['VirtualGame']['Teams']:
-        assert 'TeamName' in team
-        assert 'TeamNumber' in team
-        assert 'Alliance' in team
-        assert team['Alliance'] in ['Red', 'Blue']
-        assert 'GameVideo' in team
-        assert 'Location' in team['GameVideo']
-        # Tricky : try absolute path first, then fall back to relative path
-        if not path.isfile(team['GameVideo']['Location']):
-            assert path.isfile(path.join(manifest_folder, team['GameVideo']['Location']))
-            team['GameVideo']['Location'] = path.join(manifest_folder, team['GameVideo']['Location'])
-        assert 'VideoManifest' in team['GameVideo']
-        if not path.isfile(team['GameVideo']['VideoManifest']):
-            assert path.isfile(path.join(manifest_folder, team['GameVideo']['VideoManifest']))
-            team['GameVideo']['VideoManifest'] = path.join(manifest_folder, team['GameVideo']['VideoManifest'])
-        with open(team['GameVideo']['VideoManifest']) as video_manifest_file:
-            team['GameVideo']['VideoManifest'] = yaml.load(video_manifest_file, Loader=yaml.SafeLoader)
-        assert 'GameStartOffset' in team['GameVideo']['VideoManifest']
-        offset_seconds = mmss_to_seconds(team['GameVideo']['VideoManifest']['GameStartOffset'])
-        start_offset = min(start_offset, offset_seconds)
-        team['GameVideo']['GameStartOffsetInSecond'] = offset_seconds
-        assert 'GameEvents' in team['GameVideo']['VideoManifest']
-        previous_event_time = 0
-        for event in team['GameVideo']['VideoManifest']['GameEvents']:
-            assert 'Time' in event
-            event['TimeInSeconds'] = mmss_to_seconds(event['Time'])
-            # assure the events are in order
-            assert previous_event_time <= event['TimeInSeconds']
-            previous_event_time = event['TimeInSeconds']
-            assert 'Description' in event
-            assert 'Point' in event
-            event['Point'] = int(event['Point'])
-        alliance[team['Alliance']].append(team)
-    assert start_offset < 1000
-    assert len(alliance['Blue']) == 2
-    assert len(alliance['Red']) == 2
-    # generate subtitles
+
+
+def load_game(manifest):
+    """Load and validate the match manifest and the video manifests of the four teams
+
+    Raise Manifest.loader.ManifestException with all the problems found in the manifests.
+    :return: (project name, teams by alliance)
+    """
+    game = load_match_manifest(manifest)
+    project_name = path.splitext(path.basename(manifest))[0]
+    alliance = {'Red': game.alliance('Red'), 'Blue': game.alliance('Blue')}
+    return project_name, alliance
+
+
+def game_start_offset(alliance):
+    """The earliest game start of the four videos, all the videos are played from there"""
+    start_offset = min(team.video.game_start_offset for team in alliance['Blue'] + alliance['Red'])
+    for team in alliance['Blue'] + alliance['Red']:
+        team.video.play_start_offset = team.video.game_start_offset - start_offset
+    return start_offset
+
+
+def generate_subtitles(project_name, alliance, start_offset):
     file_no = 0
     for team in alliance['Blue'] + alliance['Red']:
-        video_start_offset = team["GameVideo"]["GameStartOffsetInSecond"] - start_offset
-        team['GameVideo']['PlayStartOffset'] = video_start_offset
+        video_start_offset = team.video.play_start_offset
         srt = EventSrt(project_name, file_no)
         srt.one_event(start_offset, 'Game Start!', None)
-        for event in team['GameVideo']['VideoManifest']['GameEvents']:
-            srt.one_event(event["TimeInSeconds"] - video_start_offset, event["Description"], event["Point"])
+        for event in team.video.events:
+            srt.one_event(event.time - video_start_offset, event.description, event.point)
         srt.flush_event()
-        team['GameVideo']['GameScoreSubtitle'] = srt.srt_path
-        print(f"Generated subtitles {srt.srt_path} for [#{team['TeamNumber']}, {team['TeamName']}] from game manifest")
+        team.video.subtitle_file = srt.srt_path
+        print(f"Generated subtitles {srt.srt_path} for [#{team.number}, {team.name}] from game manifest")
         file_no += 1
 
-    # generate ffmpeg command
-    ffmpeg_command = 'ffmpeg'
+
+def overlay_events(alliance, start_offset):
+    """{team number: [(seconds, description, point)]} of the overlay, in the time of the seeked inputs"""
+    return {team.number: [(start_offset, 'Game Start!', None)] +
+            [(event.time - team.video.play_start_offset, event.description, event.point) for event in team.video.events]
+            for team in alliance['Blue'] + alliance['Red']}
+
+
+def generate_overlay_commands(project_name, alliance, start_offset):
+    """sendcmd file of the score overlay of each team, see GameProducer.overlay"""
+    events = overlay_events(alliance, start_offset)
+    for input_no, team in enumerate(alliance['Blue'] + alliance['Red']):
+        # TRICKY : same as the subtitles, a file related to cwd is easier to escape in the filter graph
+        team.video.overlay_file = write_sendcmd_file(f'{project_name}_{input_no}.cmd', input_no, events[team.number])
+        print(f"Generated overlay commands {team.video.overlay_file} for [#{team.number}, {team.name}] from game manifest")
+
+
+def remove_overlay_commands(alliance):
+    for team in alliance['Blue'] + alliance['Red']:
+        os.remove(team.video.overlay_file)
+
+
+def remove_subtitles(alliance):
+    # remove the temporary srt files
+    for team in alliance['Blue']:
+        os.remove(team.video.subtitle_file)
+    for team in alliance['Red']:
+        os.remove(team.video.subtitle_file)
+
+
+def plan_seeks(alliance):
+    """Choose how to seek into each input from its keyframe index"""
+    for team in alliance['Blue'] + alliance['Red']:
+        try:
+            index = load_keyframe_index(team.video.location)
+        except FFmpegException as ex:
+            print(f"WARNING : cannot index the keyframes of [#{team.number}, {team.name}], {ex}")
+            index = None
+        team.video.seek_plan = plan_seek(index, team.video.play_start_offset)
+        print(f"Planned {team.video.seek_plan} for [#{team.number}, {team.name}]")
+
+
+def plan_gains(alliance):
+    """Linear gain of each input from its cached loudness, so the four tracks are mixed at the same loudness"""
+    # four uncorrelated tracks of the same loudness mix 6 dB louder than each of them
+    track_loudness = TARGET_LOUDNESS - 10 * math.log10(4)
+    for team in alliance['Blue'] + alliance['Red']:
+        try:
+            team.video.audio_gain = linear_gain(load_loudness(team.video.location), track_loudness)
+        except FFmpegException as ex:
+            print(f"WARNING : cannot measure the loudness of [#{team.number}, {team.name}], {ex}")
+            continue
+        print(f"Audio gain of [#{team.number}, {team.name}] is {team.video.audio_gain:+.1f} dB")
+
+
+def audio_mix_filter(gains):
+    """Stereo mix of the four inputs, the Blue alliance a little on the left and the Red alliance on the right like
+    the video, each input with its gain in dB (None to keep its level)
+    """
+    graph = ''
+    for i, gain in enumerate(gains):
+        # constant power pan, 0.8^2 + 0.6^2 = 1
+        left, right = (0.8, 0.6) if i < 2 else (0.6, 0.8)
+        volume = f'volume={gain:.2f}dB,' if gain is not None else ''
+        graph += f'[{i}:a]aformat=channel_layouts=mono,{volume}pan=stereo|c0={left}*c0|c1={right}*c0[a{i}]; '
+    # not normalized by amix, the gains are already right, the limiter only catches the peaks of the sum, without
+    # its auto level which scales the output up by 1 / limit
+    return graph + f'[a0][a1][a2][a3]amix=inputs=4:duration=longest:normalize=0,' \
+                   f'alimiter=limit={MIX_PEAK_LIMIT}:level=disabled[a]'
+
+
+def input_seek_args(team):
+    if team.video.seek_plan is not None:
+        return team.video.seek_plan.input_args()
+    return f'-ss {team.video.play_start_offset:.3f}'
+
+
+def subtitles_filter(input_no, team):
+    return f"subtitles=filename={team.video.subtitle_file.__repr__()}:force_style='Fontsize=16'"
+
+
+def overlay_filter(input_no, team):
+    return f'{sendcmd_filter(team.video.overlay_file)},{drawtext_filters(input_no)}'
+
+
+def composite_filter(alliance, score_filter=overlay_filter, input_filter=''):
+    """filter_complex of the four inputs side by side, in the order of the Blue then Red alliance teams
+
+    score_filter(input no, team) returns the filter drawing the events and score of a team, input_filter is put
+    before the scaling of each input.
+    """
     filter_subtitles = ''
     i = 0
     for team in alliance['Blue']:
-        ffmpeg_command += f' -ss {team["GameVideo"]["GameStartOffsetInSecond"] - start_offset} -i "{team["GameVideo"]["Location"]}"'
-        filter_subtitles +=f'[{i}:v]scale=640:480[v{i}n]; '
-        filter_subtitles +=f'[v{i}n]subtitles=filename={team["GameVideo"]["GameScoreSubtitle"].__repr__()}:force_style=\'Fontsize=16\'[v{i}s]; '
-        filter_subtitles +=f'[v{i}s]drawtext=text=\'FTC #{team["TeamNumber"]}\':fontcolor=white:fontsize=18:box=1: boxcolor=black@0.5:boxborderw=5:x=20:y=10[v{i}s]; '
-        filter_subtitles +=f'[v{i}s]drawtext=text=\'{team["TeamName"]}\':fontcolor=white:fontsize=18:box=1: boxcolor=black@0.5:boxborderw=5:x=20:y=40[v{i}s]; '
+        filter_subtitles +=f'[{i}:v]{input_filter}scale=640:480[v{i}n]; '
+        filter_subtitles +=f'[v{i}n]{score_filter(i, team)}[v{i}s]; '
+        filter_subtitles +=f'[v{i}s]drawtext=text=\'FTC #{team.number}\':fontcolor=white:fontsize=18:box=1: boxcolor=black@0.5:boxborderw=5:x=20:y=10[v{i}s]; '
+        filter_subtitles +=f'[v{i}s]drawtext=text=\'{team.name}\':fontcolor=white:fontsize=18:box=1: boxcolor=black@0.5:boxborderw=5:x=20:y=40[v{i}s]; '
         i += 1
     for team in alliance['Red']:
-        ffmpeg_command += f' -ss {team["GameVideo"]["GameStartOffsetInSecond"] - start_offset} -i "{team["GameVideo"]["Location"]}"'
-        filter_subtitles +=f'[{i}:v]scale=640:480[v{i}n]; '
-        filter_subtitles +=f'[v{i}n]subtitles=filename={team["GameVideo"]["GameScoreSubtitle"].__repr__()}:force_style=\'Fontsize=16\'[v{i}s]; '
-        filter_subtitles +=f'[v{i}s]drawtext=text=\'FTC #{team["TeamNumber"]}\':fontcolor=white:fontsize=18:box=1: boxcolor=black@0.5:boxborderw=5:x=(w-text_w)-20:y=10[v{i}s]; '
-        filter_subtitles +=f'[v{i}s]drawtext=text=\'{team["TeamName"]}\':fontcolor=white:fontsize=18:box=1: boxcolor=black@0.5:boxborderw=5:x=(w-text_w)-20:y=40[v{i}s]; '
+        filter_subtitles +=f'[{i}:v]{input_filter}scale=640:480[v{i}n]; '
+        filter_subtitles +=f'[v{i}n]{score_filter(i, team)}[v{i}s]; '
+        filter_subtitles +=f'[v{i}s]drawtext=text=\'FTC #{team.number}\':fontcolor=white:fontsize=18:box=1: boxcolor=black@0.5:boxborderw=5:x=(w-text_w)-20:y=10[v{i}s]; '
+        filter_subtitles +=f'[v{i}s]drawtext=text=\'{team.name}\':fontcolor=white:fontsize=18:box=1: boxcolor=black@0.5:boxborderw=5:x=(w-text_w)-20:y=40[v{i}s]; '
         i += 1
-    ffmpeg_command +=f' -filter_complex "{filter_subtitles} ' \
-                     f'[v0s][v1s]vstack[left]; [v2s][v3s]vstack[right]; ' \
-                     f'[left]pad=iw+10:ih+10:5:5:color=blue[left]; [right]pad=iw+10:ih+10:5:5:color=red[right]; ' \
-                     f"[left]drawtext=text='Blue Alliance':fontcolor=blue:fontsize=24:box=1: boxcolor=orange@0.9:boxborderw=5:x=(w-text_w)-20:y=h/2-10[left]; " \
-                     f"[right]drawtext=text='Red Alliance':fontcolor=red:fontsize=24:box=1: boxcolor=orange@0.9:boxborderw=5:x=20:y=h/2-10[right]; " \
-                     f'[left][right]hstack[v]; ' \
-                     f'[0:a][1:a]amerge[a]; [a][2:a]amerge[a]; [a][3:a]amerge[a]"' \
-                     f' -map "[v]" -map "[a]" -f matroska' \
-                     f' "{args.output}"'
-    print(ffmpeg_command)
-    os.system(ffmpeg_command)
+    return f'{filter_subtitles} ' \
+           f'[v0s][v1s]vstack[left]; [v2s][v3s]vstack[right]; ' \
+           f'[left]pad=iw+10:ih+10:5:5:color=blue[left]; [right]pad=iw+10:ih+10:5:5:color=red[right]; ' \
+           f"[left]drawtext=text='Blue Alliance':fontcolor=blue:fontsize=24:box=1: boxcolor=orange@0.9:boxborderw=5:x=(w-text_w)-20:y=h/2-10[left]; " \
+           f"[right]drawtext=text='Red Alliance':fontcolor=red:fontsize=24:box=1: boxcolor=orange@0.9:boxborderw=5:x=20:y=h/2-10[right]; " \
+           f'[left][right]hstack[v]; ' \
+           f'{audio_mix_filter([team.video.audio_gain for team in alliance["Blue"] + alliance["Red"]])}'
+
+
+def ffmpeg_command(alliance, output, score_filter=overlay_filter, profile=DEFAULT_PROFILE):
+    ffmpeg_command = 'ffmpeg'
+    for team in alliance['Blue'] + alliance['Red']:
+        ffmpeg_command += f' {input_seek_args(team)} -i "{team.video.location}"'
+    ffmpeg_command +=f' -filter_complex "{composite_filter(alliance, score_filter)}"' \
+                     f' -map "[v]" -map "[a]" {encoder_profile(profile).output_args()} -f matroska' \
+                     f' "{output}"'
+    return ffmpeg_command
+
+
+def produce(manifest, output, align=True, subtitles=False, profile=DEFAULT_PROFILE):
+    """Render the match video, return the exit status of ffmpeg"""
+    with metrics.span('produce.load', manifest=manifest):
+        project_name, alliance = load_game(manifest)
+    if align:
+        # imported here, so numpy is only needed when the audio alignment is used
+        from GameProducer.alignment import align_teams
+        with metrics.span('produce.align'):
+            align_teams(alliance['Blue'] + alliance['Red'])
+    start_offset = game_start_offset(alliance)
+    with metrics.span('produce.seeks'):
+        plan_seeks(alliance)
+    with metrics.span('produce.gains'):
+        plan_gains(alliance)
+    with metrics.span('produce.scores', subtitles=subtitles):
+        if subtitles:
+            generate_subtitles(project_name, alliance, start_offset)
+            command = ffmpeg_command(alliance, output, subtitles_filter, profile)
+        else:
+            generate_overlay_commands(project_name, alliance, start_offset)
+            command = ffmpeg_command(alliance, output, profile=profile)
+    print(command)
+    with metrics.span('produce.encode', profile=profile) as fields:
+        status = os.system(command)
+        fields['status'] = status
+    if subtitles:
+        remove_subtitles(alliance)
+    else:
+        remove_overlay_commands(alliance)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Read a game manifest file and construct ffmpeg command to produce the game video')
+    parser.add_argument('manifest', type=str, help='The manifest file name')
+    parser.add_argument('output', type=str, help='Output file name, "-" is supported to pipe to preview (such as "| ffplay -"')
+    parser.add_argument('--subtitles', action='store_true', help='Draw the scores with libass subtitles instead of the overlay commands')
+    parser.add_argument('--no-align', dest='align', action='store_false', help='Use the hand-entered game start offsets as they are, skip the audio fingerprint alignment')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE, help=f'Encoder profile, calibrated with "python -m GameProducer.profiles calibrate", default to {DEFAULT_PROFILE}')
+    args = parser.parse_args()
+    try:
+        status = produce(args.manifest, args.output, align=args.align, subtitles=args.subtitles, profile=args.profile)
+    except ManifestException as ex:
+        print(f'ERROR : invalid manifest\n{ex}')
+        sys.exit(1)
+    if status == 0 and args.output != '-':
+        # imported here, the same as the alignment
+        from GameProducer.verify import verify_published
+        with metrics.span('produce.verify'):
+            report = verify_published(args.output, manifest=args.manifest)
+        for issue in report.issues:
+            print(issue)
+        if not report.ok:
+            sys.exit(1)
 
-    # remove the temporary srt files
-    for team in alliance['Blue']:
-        os.remove(team["GameVideo"]["GameScoreSubtitle"])
-    for team in alliance['Red']:
-        os.remove(team["GameVideo"]["GameScoreSubtitle"])
 
+if __name__ == "__main__":
+    metrics.run('game-producer', main)
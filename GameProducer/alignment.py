@@ -0,0 +1,111 @@
+"""
+Refine the hand-entered game start offsets of the four team videos with their audio fingerprints
+
+The videos of the same match often record the same field announcer or the same start cue, so the relative
+offset between two videos can be found by correlating their onset envelopes around the game start.
+Referees still decide where the game starts, the alignment only makes the four videos agree with each other.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import numpy as np
+
+from MediaTools.ffmpeg import FFmpegException
+from MediaTools.fingerprint import FRAME_RATE, load_fingerprint, onset_envelope
+
+# correlate the audio from a few seconds before the game start until the end of autonomous
+WINDOW_BEFORE = 5
+WINDOW_AFTER = 35
+# search the offset around the one entered by referees
+SEARCH_RANGE = 3
+# below this normalized correlation, the hand-entered offset is kept
+MIN_CONFIDENCE = 0.3
+
+
+def segment(envelope, start, length):
+    """Slice the envelope, padding with zeros outside of the video"""
+    result = np.zeros(length, dtype=np.float32)
+    source_from = max(start, 0)
+    source_to = min(start + length, len(envelope))
+    if source_to > source_from:
+        result[source_from - start:source_to - start] = envelope[source_from:source_to]
+    return result
+
+
+def normalized_cross_correlation(template, signal):
+    """Normalized correlation of the template at every valid position of the signal"""
+    n = len(template)
+    template = template - template.mean()
+    template_norm = np.sqrt(np.dot(template, template))
+    size = 1 << int(np.ceil(np.log2(len(signal) + n)))
+    correlation = np.fft.irfft(np.fft.rfft(signal, size) * np.conj(np.fft.rfft(template, size)), size)
+    correlation = correlation[:len(signal) - n + 1]
+    # sliding mean and energy of the signal
+    cumsum = np.concatenate(([0.0], np.cumsum(signal, dtype=np.float64)))
+    cumsum2 = np.concatenate(([0.0], np.cumsum(np.square(signal, dtype=np.float64))))
+    sums = cumsum[n:] - cumsum[:-n]
+    variances = (cumsum2[n:] - cumsum2[:-n]) - sums * sums / n
+    denominator = template_norm * np.sqrt(np.maximum(variances, 0))
+    return np.divide(correlation, denominator, out=np.zeros_like(correlation), where=denominator > 1e-6)
+
+
+def estimate_lag(reference, other, reference_start, expected_lag):
+    """Estimate how many seconds later the same moment happens in the other envelope than in the reference
+
+    :return: (lag in seconds, confidence between -1 and 1)
+    """
+    start = int(round((reference_start - WINDOW_BEFORE) * FRAME_RATE))
+    length = int(round((WINDOW_BEFORE + WINDOW_AFTER) * FRAME_RATE))
+    search = int(round(SEARCH_RANGE * FRAME_RATE))
+    expected = int(round(expected_lag * FRAME_RATE))
+    template = segment(reference, start, length)
+    signal = segment(other, start + expected - search, length + 2 * search)
+    correlation = normalized_cross_correlation(template, signal)
+    peak = int(np.argmax(correlation))
+    # parabolic interpolation around the peak for a sub-frame estimation
+    fraction = 0.0
+    if 0 < peak < len(correlation) - 1:
+        left, center, right = correlation[peak - 1:peak + 2]
+        curvature = left - 2 * center + right
+        if curvature < 0:
+            fraction = 0.5 * (left - right) / curvature
+    lag_frames = expected - search + peak + fraction
+    return float(lag_frames / FRAME_RATE), float(correlation[peak])
+
+
+def align_teams(teams):
+    """Refine team.video.game_start_offset of the Manifest.model teams in place
+
+    The first team with a usable audio track is the reference, every other team is correlated against it.
+    The absolute game start is the median of what the referees entered once the relative offsets are applied.
+    """
+    envelopes = []
+    for team in teams:
+        try:
+            envelopes.append(onset_envelope(load_fingerprint(team.video.location)))
+        except FFmpegException as ex:
+            print(f"WARNING : cannot fingerprint the audio of [#{team.number}, {team.name}], {ex}")
+            envelopes.append(None)
+    reference_no = next((i for i, envelope in enumerate(envelopes) if envelope is not None and len(envelope) > 0), None)
+    if reference_no is None:
+        return
+    reference_offset = teams[reference_no].video.game_start_offset
+    lags = {reference_no: 0.0}
+    for team_no, team in enumerate(teams):
+        if team_no == reference_no or envelopes[team_no] is None:
+            continue
+        expected_lag = team.video.game_start_offset - reference_offset
+        lag, confidence = estimate_lag(envelopes[reference_no], envelopes[team_no], reference_offset, expected_lag)
+        if confidence >= MIN_CONFIDENCE:
+            lags[team_no] = lag
+        else:
+            print(f"WARNING : audio of [#{team.number}, {team.name}] doesn't match (confidence {confidence:.2f}), keep the hand-entered offset")
+    if len(lags) < 2:
+        return
+    reference_start = float(np.median([teams[team_no].video.game_start_offset - lag for team_no, lag in lags.items()]))
+    for team_no, lag in lags.items():
+        team = teams[team_no]
+        refined = round(reference_start + lag, 3)
+        print(f"Aligned [#{team.number}, {team.name}] game start from {team.video.game_start_offset}s to {refined}s")
+        team.video.game_start_offset = refined
@@ -0,0 +1,147 @@
+"""
+Auto-publish daemon, render a match as soon as the video manifests of its four teams are saved
+
+The daemon keeps its own catalog of the manifests up to date (see Manifest.catalog), a match is reviewed when the
+four videos have a video manifest, the same condition as the Reviewed status of EventPlanner. A match is only
+rendered once its manifests are left unchanged for the debounce delay, so a referee fixing an event right after
+saving doesn't trigger two renders. The matches never published go first, then the ones to render again because a
+manifest changed after they were published, the oldest change first.
+
+The render and publish steps, and the lease on the match, are the same as GameProducer.worker, so the daemon can run
+together with render workers.
+
+Usage: python -m GameProducer.autopublish path/to/event/root [--debounce 30]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import time
+import heapq
+import argparse
+import functools
+
+from GameProducer.lease import Lease, default_owner, lease_filename
+from GameProducer.preflight import FOLDER_MATCH
+from GameProducer.profiles import DEFAULT_PROFILE, PROFILES
+from GameProducer.worker import FOLDER_PUBLISHED, POLL_SECONDS, fake_render, published_filename, render_and_publish, \
+    render_match
+from Manifest.catalog import Catalog, match_of_manifest
+from MediaTools import metrics
+
+DEBOUNCE_SECONDS = 30
+PRIORITY_NEW = 0
+PRIORITY_UPDATE = 1
+
+
+def daemon_catalog_file(root_folder):
+    # not the catalog of EventPlanner, so the two don't wait on each other's database lock
+    return f'{os.path.normpath(os.path.abspath(root_folder))}.autopublish.db'
+
+
+class AutoPublisher:
+
+    def __init__(self, root_folder, debounce_seconds=DEBOUNCE_SECONDS, render=render_match, name=None):
+        self.root_folder = os.path.abspath(root_folder)
+        self.debounce_seconds = debounce_seconds
+        self.render = render
+        self.name = name if name is not None else default_owner()
+        self.catalog = Catalog(self.root_folder, daemon_catalog_file(self.root_folder))
+        # match -> time the daemon saw a manifest of the match change
+        self.changed_at = {}
+        # match -> manifests stamp the published video was rendered from
+        self.rendered = {}
+        # match -> manifests stamp of a failed render, not tried again until a manifest changes
+        self.failed = {}
+        # matches leased by another worker, reported once
+        self.busy = set()
+
+    def match_manifest(self, match):
+        return os.path.join(self.root_folder, FOLDER_MATCH, f'Match #{match}', f'match{match}.yml')
+
+    def poll(self):
+        now = time.time()
+        for manifest in self.catalog.refresh():
+            match = match_of_manifest(manifest)
+            if match is not None:
+                self.changed_at[match] = now
+
+    def priority(self, match, stamp):
+        """Render priority of a reviewed match, None if its published video is up to date"""
+        published = published_filename(self.root_folder, match)
+        if not os.path.exists(published):
+            return PRIORITY_NEW
+        # after a restart, the published video is compared with the manifests by modification time
+        rendered = self.rendered.get(match)
+        if rendered is None:
+            rendered = os.stat(published).st_mtime_ns
+        return PRIORITY_UPDATE if stamp > rendered else None
+
+    def render_queue(self):
+        """Heap of (priority, changed at, match, stamp) of the reviewed matches to render, past the debounce delay"""
+        now = time.time()
+        queue = []
+        for match in self.catalog.reviewed_matches():
+            if not os.path.isfile(self.match_manifest(match)):
+                continue
+            stamp = self.catalog.manifests_stamp(match)
+            if stamp is None or self.failed.get(match) == stamp:
+                continue
+            priority = self.priority(match, stamp)
+            changed_at = self.changed_at.get(match, 0)
+            if priority is None or now - changed_at < self.debounce_seconds:
+                continue
+            heapq.heappush(queue, (priority, changed_at, match, stamp))
+        return queue
+
+    def render_one(self, match, stamp):
+        manifest = self.match_manifest(match)
+        lease = Lease(lease_filename(manifest), self.name)
+        if not lease.acquire():
+            if match not in self.busy:
+                print(f'Match #{match} is being rendered by another worker')
+                self.busy.add(match)
+            return False
+        self.busy.discard(match)
+        try:
+            if not render_and_publish(self.render, match, manifest, published_filename(self.root_folder, match), lease):
+                # not tried again until a manifest of the match changes
+                self.failed[match] = stamp
+                return False
+        finally:
+            lease.release()
+        # the manifests may have changed while rendering, keep the stamp from before the render
+        self.rendered[match] = stamp
+        return True
+
+    def run(self, poll_seconds=POLL_SECONDS):
+        while True:
+            self.poll()
+            queue = self.render_queue()
+            rendered = False
+            while queue and not rendered:
+                priority, changed_at, match, stamp = heapq.heappop(queue)
+                rendered = self.render_one(match, stamp)
+            if not rendered:
+                time.sleep(poll_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render and publish the matches as soon as all their videos are reviewed')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS, help='Seconds without manifest change before a match is rendered')
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help='Seconds between two scans of the match folders')
+    parser.add_argument('--fake-render', type=float, default=None, help='Replace the render by a wait of this number of seconds, for simulation')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE, help=f'Encoder profile of the renders, default to {DEFAULT_PROFILE}')
+    args = parser.parse_args()
+    if not os.path.isdir(os.path.join(args.root, FOLDER_PUBLISHED)):
+        print(f'ERROR : Folder [{FOLDER_PUBLISHED}] not exists in root folder [{args.root}]')
+        sys.exit(1)
+    render = fake_render(args.fake_render) if args.fake_render is not None else functools.partial(render_match, profile=args.profile)
+    AutoPublisher(args.root, args.debounce, render).run(args.poll)
+
+
+if __name__ == '__main__':
+    metrics.run('autopublish', main)
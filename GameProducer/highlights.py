@@ -0,0 +1,187 @@
+"""
+Highlights of the event, the best scoring moments of every match cut into short clips and joined into one video
+
+The events of all the video manifests are ranked by points (or filtered by type, such as "Power Shot"), and a clip
+is cut around each of them from the published match video, or from the game video of the team when the match is
+not published yet. The clips are cut in parallel :
+
+ - when a keyframe is close enough to the clip start (see MediaTools.keyframes.plan_seek), the clip is copied from
+   there without encoding anything, the clip starts a little earlier or later
+ - otherwise, or when the source doesn't have the stream parameters of the highlights, only that clip is encoded
+
+The clips are then joined by stream copy, the same as the event replay (see GameProducer.reel).
+
+Usage: python -m GameProducer.highlights path/to/event/root highlights.mp4 [--top 20] [--type "Power Shot"]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from GameProducer.preflight import find_match_manifests
+from GameProducer.profiles import DEFAULT_PROFILE, PROFILES
+from GameProducer.reel import ReelException, encode_args, join_parts, parameter_drift, stream_parameters
+from GameProducer.worker import FOLDER_PUBLISHED, published_filename
+from Manifest.loader import ManifestException, load_match_manifest
+from Manifest.timecode import seconds_to_mmss
+from MediaTools import metrics
+from MediaTools.ffmpeg import FFmpegException, run_ffmpeg
+from MediaTools.keyframes import SEEK_COPY, load_keyframe_index, plan_seek
+
+# seconds of the clip before and after the event
+BEFORE_SECONDS = 4
+AFTER_SECONDS = 3
+# how far the clip start may move to start on a keyframe and be copied
+SNAP_SECONDS = 1.5
+TOP_COUNT = 20
+
+
+class Highlight:
+    __slots__ = ('match', 'team', 'event', 'source', 'seconds')
+
+    def __init__(self, match, team, event, source, seconds):
+        self.match = match
+        self.team = team
+        self.event = event
+        # the video to cut the clip from, and the time of the event in it
+        self.source = source
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f'Highlight(match #{self.match}, #{self.team.number}, {self.event!r})'
+
+
+def match_highlights(root_folder, match, manifest):
+    """[Highlight] of the events of a match, in its published video when there is one"""
+    game = load_match_manifest(manifest, load_videos=True, check_files=False)
+    # during the event, some teams of a match don't have their video manifest yet
+    reviewed = [team for team in game.teams if team.video.game_start_offset is not None]
+    published = published_filename(root_folder, match)
+    composite = os.path.isfile(published) and len(reviewed) == len(game.teams)
+    # the composite starts at the earliest game start of the four videos, see GameProducer.__main__.game_start_offset
+    start_offset = min(team.video.game_start_offset for team in reviewed) if composite else None
+    highlights = []
+    for team in reviewed:
+        for event in team.video.events:
+            if composite:
+                play_start_offset = team.video.game_start_offset - start_offset
+                highlights.append(Highlight(match, team, event, published, event.time - play_start_offset))
+            elif os.path.isfile(team.video.location):
+                highlights.append(Highlight(match, team, event, team.video.location, event.time))
+    return highlights
+
+
+def collect_highlights(root_folder):
+    highlights = []
+    for match, manifest in sorted(find_match_manifests(root_folder).items()):
+        if not os.path.isfile(manifest):
+            continue
+        try:
+            highlights += match_highlights(root_folder, match, manifest)
+        except ManifestException as ex:
+            print(f'WARNING : match #{match} skipped, invalid manifest\n{ex}')
+    return highlights
+
+
+def rank_highlights(highlights, types=None, top=TOP_COUNT):
+    """The top highlights by points, only the events whose description contains one of the types if given
+
+    The penalties (negative points) are only kept when asked by type.
+    """
+    if types:
+        types = [kind.lower() for kind in types]
+        highlights = [highlight for highlight in highlights
+                      if any(kind in highlight.event.description.lower() for kind in types)]
+        # a penalty is a highlight too when asked for, the biggest first
+        key = lambda highlight: -abs(highlight.event.point)
+    else:
+        highlights = [highlight for highlight in highlights if highlight.event.point > 0]
+        key = lambda highlight: -highlight.event.point
+    # stable sort, the same points stay in match order
+    return sorted(highlights, key=key)[:top]
+
+
+def cut_clip(highlight, reference, output, profile=DEFAULT_PROFILE):
+    """Cut the clip of the highlight, by stream copy when possible, return (output, copied)"""
+    start = max(0.0, highlight.seconds - BEFORE_SECONDS)
+    duration = highlight.seconds + AFTER_SECONDS - start
+    copy = not parameter_drift(reference, stream_parameters(highlight.source))
+    if copy:
+        try:
+            seek = plan_seek(load_keyframe_index(highlight.source), start, SNAP_SECONDS, allow_copy=True)
+        except FFmpegException:
+            seek = None
+        copy = seek is not None and seek.method == SEEK_COPY
+    if copy:
+        # keep the event at the same place in the clip when the start moved to the keyframe
+        duration += start - seek.seek
+        run_ffmpeg(['-ss', f'{seek.seek:.3f}', '-i', highlight.source, '-t', f'{duration:.3f}',
+                    '-map', '0:v:0', '-map', '0:a:0', '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+                    '-f', 'mpegts', '-y', output])
+    else:
+        video = reference['video']
+        run_ffmpeg(['-ss', f'{start:.3f}', '-i', highlight.source, '-t', f'{duration:.3f}',
+                    '-map', '0:v:0', '-map', '0:a:0',
+                    '-vf', f'scale={video["width"]}:{video["height"]},setsar={video["sample_aspect_ratio"].replace(":", "/")}']
+                   + encode_args(reference, profile) + ['-f', 'mpegts', '-y', output])
+    return output, copy
+
+
+def build_highlights(highlights, output, profile=DEFAULT_PROFILE, jobs=None):
+    """Cut the clips in parallel and join them into the output, return the number of clips copied without encoding"""
+    if not highlights:
+        raise ReelException('No highlight to cut')
+    # the clips have the stream parameters of the first source, a published video when there is one
+    reference = stream_parameters(next((highlight.source for highlight in highlights
+                                        if os.path.basename(os.path.dirname(highlight.source)) == FOLDER_PUBLISHED),
+                                       highlights[0].source))
+    work_folder = tempfile.mkdtemp(prefix='highlights-', dir=os.path.dirname(os.path.abspath(output)))
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(cut_clip, highlight, reference, os.path.join(work_folder, f'clip{no}.ts'), profile)
+                       for no, highlight in enumerate(highlights)]
+            clips = [future.result() for future in futures]
+        join_parts([clip for clip, _ in clips], output, work_folder)
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+    return sum(1 for _, copied in clips if copied)
+
+
+def print_highlights(highlights):
+    for no, highlight in enumerate(highlights, 1):
+        event = highlight.event
+        print(f'{no:3}. match #{highlight.match} [#{highlight.team.number}, {highlight.team.name}] '
+              f'{seconds_to_mmss(event.time)} {event.description}: {event.point} points')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cut the best scoring moments of the event into a highlights video')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('output', type=str, help='The highlights video file')
+    parser.add_argument('--top', type=int, default=TOP_COUNT, help=f'Number of highlights, default to {TOP_COUNT}')
+    parser.add_argument('--type', type=str, action='append', default=None,
+                        help='Only the events whose description contains this text, such as "Power Shot", can be repeated')
+    parser.add_argument('--list', action='store_true', help='Only list the highlights, cut nothing')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE, help='Encoder profile of the clips which cannot be copied')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of clips cut in parallel')
+    args = parser.parse_args()
+    highlights = rank_highlights(collect_highlights(args.root), args.type, args.top)
+    print_highlights(highlights)
+    if args.list:
+        return
+    try:
+        copied = build_highlights(highlights, args.output, args.profile, args.jobs)
+    except (ReelException, FFmpegException) as ex:
+        print(f'ERROR : {ex}')
+        sys.exit(1)
+    print(f'Highlights [{args.output}] with {len(highlights)} clips, {copied} copied without encoding')
+
+
+if __name__ == '__main__':
+    metrics.run('highlights', main)
@@ -0,0 +1,159 @@
+"""
+Lease files to claim a match in the shared event folder, so only one render worker renders it
+
+A lease is a small json file "matchN.lease" in the match folder, with the owner and the time it expires at. The
+owner renews it with a heartbeat while it works, a lease not renewed in time is expired and can be reclaimed by
+another worker, so the matches of a crashed worker are not lost.
+
+TRICKY : a synced folder (see docs/ShareFolder.md) has no atomic create across machines, two workers may both
+believe they created the lease. The claim waits for the sync to settle and reads the lease again, the worker whose
+token is not in the file backs off. The expiry relies on the clocks of the machines, keep them in sync.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+
+from Manifest import files
+
+LEASE_SUFFIX = 'lease'
+LEASE_SECONDS = 90
+HEARTBEAT_SECONDS = 20
+SETTLE_SECONDS = 2
+
+
+def default_owner():
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+def lease_filename(manifest):
+    pre, _ = os.path.splitext(manifest)
+    return f'{pre}.{LEASE_SUFFIX}'
+
+
+class Lease:
+
+    def __init__(self, filename, owner=None, lease_seconds=LEASE_SECONDS, settle_seconds=SETTLE_SECONDS):
+        self.filename = filename
+        self.owner = owner if owner is not None else default_owner()
+        self.lease_seconds = lease_seconds
+        self.settle_seconds = settle_seconds
+        self.token = None
+        self.heartbeat_thread = None
+        self.heartbeat_stop = threading.Event()
+
+    def read(self):
+        """Content of the lease file, None if there is no lease"""
+        try:
+            with open(self.filename) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # being synced or written by a foreign tool, it's held until it expires by its modification time
+            try:
+                return {'owner': None, 'token': None, 'expires': os.path.getmtime(self.filename) + self.lease_seconds}
+            except OSError:
+                return None
+
+    def content(self):
+        now = time.time()
+        return {'owner': self.owner, 'token': self.token, 'heartbeat': now, 'expires': now + self.lease_seconds}
+
+    def is_held(self, lease=None):
+        lease = lease if lease is not None else self.read()
+        return lease is not None and self.token is not None and lease.get('token') == self.token
+
+    def acquire(self):
+        """Claim the lease, return False if another owner holds it"""
+        lease = self.read()
+        self.token = uuid.uuid4().hex
+        if lease is None:
+            if not self.create():
+                self.token = None
+                return False
+        elif lease.get('expires', 0) < time.time():
+            print(f'WARNING : lease [{self.filename}] of [{lease.get("owner")}] expired, reclaimed by [{self.owner}]')
+            self.write()
+        else:
+            self.token = None
+            return False
+        time.sleep(self.settle_seconds)
+        if not self.is_held():
+            self.token = None
+            return False
+        return True
+
+    def create(self):
+        """Create the lease file, return False if it exists already"""
+        # write aside then hard link, so the lease appears complete and a concurrent creation fails
+        fd, temp_filename = files.mkstemp(self.filename)
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(self.content(), file)
+            try:
+                os.link(temp_filename, self.filename)
+                return True
+            except FileExistsError:
+                return False
+            except OSError:
+                # the drive doesn't support hard links (exFAT, SMB, cloud sync), created exclusively below instead
+                pass
+        finally:
+            os.remove(temp_filename)
+        try:
+            fd = os.open(self.filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+        except FileExistsError:
+            return False
+        # a lease read while it's written is held until it expires, see read()
+        with os.fdopen(fd, 'w') as file:
+            json.dump(self.content(), file)
+        return True
+
+    def write(self):
+        with files.atomic_open(self.filename) as file:
+            json.dump(self.content(), file)
+
+    def renew(self):
+        """Push the expiry back, return False if the lease was reclaimed by another owner meanwhile"""
+        if not self.is_held():
+            return False
+        self.write()
+        return True
+
+    def release(self):
+        self.stop_heartbeat()
+        if self.is_held():
+            os.remove(self.filename)
+        self.token = None
+
+    def start_heartbeat(self, interval=None):
+        if interval is None:
+            # a few beats per lease, so one missed beat doesn't expire it
+            interval = min(HEARTBEAT_SECONDS, self.lease_seconds / 3)
+        self.heartbeat_stop.clear()
+        self.heartbeat_thread = threading.Thread(target=self.heartbeat, args=(interval,), daemon=True,
+                                                 name=f'lease-{os.path.basename(self.filename)}')
+        self.heartbeat_thread.start()
+
+    def heartbeat(self, interval):
+        while not self.heartbeat_stop.wait(interval):
+            try:
+                if not self.renew():
+                    print(f'WARNING : lease [{self.filename}] was taken over, [{self.owner}] stops renewing it')
+                    return
+            except OSError as ex:
+                # the shared folder may be unavailable for a moment, try again on the next beat
+                print(f'WARNING : cannot renew lease [{self.filename}], {ex}')
+
+    def stop_heartbeat(self):
+        if self.heartbeat_thread is not None:
+            self.heartbeat_stop.set()
+            self.heartbeat_thread.join()
+            self.heartbeat_thread = None
@@ -0,0 +1,247 @@
+"""
+Live compositing of the four team streams of a hybrid event, with the scores updated while the game is played
+
+The four inputs are network streams (udp://, srt://, rtmp:// ...) or pipes, composited in realtime with the same
+filter graph as the offline render (see GameProducer.__main__.composite_filter) and sent to a local streaming sink.
+Without --input, the game videos of the match manifest are played in realtime as stand-ins for the live streams.
+
+Each input has a bounded queue, and the output has a constant frame rate, so a late frame is dropped instead of
+delaying the whole composite. ffmpeg reports its progress on a pipe : the latency and lag (see LiveStats) and
+the dropped / duplicated frames are printed while streaming, and summarized at the end.
+
+The scores come from the standard input, one event per line : "<team number> <points> <description>", such as
+"16031 10 Robot Parked". They are sent to the overlay of ffmpeg as filter commands, see GameProducer.overlay.
+
+Usage: python -m GameProducer.live match1.yml [--input udp://0.0.0.0:5001 ...x4] [--sink udp://127.0.0.1:23000]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import sys
+import time
+import argparse
+import threading
+import subprocess
+
+from GameProducer.__main__ import composite_filter
+from GameProducer.overlay import EVENT_SECONDS, OverlayException, OverlayPublisher, drawtext_filters, event_text, \
+    score_text, zmq_filter
+from Manifest.loader import ManifestException, load_match_manifest
+from MediaTools import metrics
+from MediaTools.ffmpeg import FFMPEG
+
+FRAME_RATE = 30
+# packets buffered per input before ffmpeg blocks its reader, small enough to bound the latency
+INPUT_QUEUE = 64
+DEFAULT_SINK = 'udp://127.0.0.1:23000?pkt_size=1316'
+REPORT_SECONDS = 5
+
+
+class LiveScoreboard:
+    """Score and recent events of each team, sent to the overlay of the running ffmpeg as they come"""
+
+    def __init__(self, teams, publisher):
+        self.publisher = publisher
+        # team number -> input number of the team in the filter graph
+        self.inputs = {team.number: input_no for input_no, team in enumerate(teams)}
+        self.teams = {team.number: team for team in teams}
+        self.scores = {team.number: 0 for team in teams}
+        # team number -> [(time, event text)] of the events shown
+        self.shown = {team.number: [] for team in teams}
+        # teams whose overlay is not updated yet, ffmpeg may not listen yet
+        self.dirty = set(self.teams)
+        self.lock = threading.Lock()
+
+    def add_event(self, team_number, point, description):
+        if team_number not in self.teams:
+            print(f'WARNING : team #{team_number} is not in this match, event [{description}] ignored')
+            return
+        now = time.time()
+        with self.lock:
+            self.scores[team_number] += point
+            self.shown[team_number] = [(shown_at, text) for shown_at, text in self.shown[team_number]
+                                       if now - shown_at <= EVENT_SECONDS] + [(now, event_text(description, point))]
+            self.dirty.add(team_number)
+        print(f'[#{team_number}, {self.teams[team_number].name}] {description}: {point} points, score {self.scores[team_number]}')
+        self.publish()
+
+    def tick(self):
+        """Clear the events shown long enough, and send the overlay updates not sent yet"""
+        now = time.time()
+        with self.lock:
+            for team_number, shown in self.shown.items():
+                if shown and now - shown[-1][0] > EVENT_SECONDS:
+                    self.shown[team_number] = []
+                    self.dirty.add(team_number)
+        self.publish()
+
+    def publish(self):
+        with self.lock:
+            for team_number in sorted(self.dirty):
+                event = ' / '.join(text for _, text in self.shown[team_number])
+                if not self.publisher.update(self.inputs[team_number], event, score_text(self.scores[team_number])):
+                    return
+                self.dirty.discard(team_number)
+
+    def read_events(self, stream):
+        for line in stream:
+            parts = line.strip().split(maxsplit=2)
+            if not parts:
+                continue
+            try:
+                self.add_event(int(parts[0]), int(parts[1]), parts[2] if len(parts) > 2 else '')
+            except (ValueError, IndexError):
+                print(f'WARNING : score event must be "<team number> <points> <description>", got [{line.strip()}]')
+
+
+class LiveStats:
+    """Progress of ffmpeg, from the key=value blocks of -progress
+
+    The startup latency is the time to the first output frame since ffmpeg started, the glass-to-glass latency of the
+    stand-ins. The lag is then how far the output falls behind the wall clock, it grows when the composite can't keep
+    up with realtime, and it's slightly negative while ffmpeg reads the beginning of the inputs faster than realtime.
+    """
+
+    def __init__(self, started):
+        # wall clock time ffmpeg started reading the inputs
+        self.started = started
+        self.values = {}
+        # (wall clock time, media time) of the first output
+        self.first_output = None
+        self.lags = []
+
+    def update(self, key, value):
+        self.values[key] = value
+        if key == 'progress':
+            self.sample()
+
+    def sample(self):
+        out_time = self.values.get('out_time_us', 'N/A')
+        if out_time == 'N/A' or int(out_time) <= 0:
+            # nothing produced yet, the inputs are still connecting
+            return
+        now, out_time = time.time(), int(out_time) / 1000000
+        if self.first_output is None:
+            self.first_output = (now, out_time)
+        self.lags.append((now - self.first_output[0]) - (out_time - self.first_output[1]))
+
+    @property
+    def startup(self):
+        return self.first_output[0] - self.started if self.first_output is not None else None
+
+    @property
+    def dropped(self):
+        return int(self.values.get('drop_frames', 0))
+
+    @property
+    def duplicated(self):
+        return int(self.values.get('dup_frames', 0))
+
+    def report(self):
+        if self.first_output is None:
+            return 'waiting for the inputs'
+        return f'frame {self.values.get("frame")}, {self.values.get("fps")} fps, startup latency {self.startup * 1000:.0f}ms, ' \
+               f'lag {self.lags[-1] * 1000:.0f}ms (max {max(self.lags) * 1000:.0f}ms), ' \
+               f'dropped {self.dropped}, duplicated {self.duplicated}'
+
+
+def live_input_args(source, stand_in, start_offset=None):
+    args = ['-thread_queue_size', str(INPUT_QUEUE)]
+    if stand_in:
+        # play the file in realtime, from the game start, and loop it as a stream never ends
+        args += ['-re', '-stream_loop', '-1']
+        if start_offset:
+            args += ['-ss', f'{start_offset:.3f}']
+    else:
+        args += ['-fflags', 'nobuffer+discardcorrupt', '-flags', 'low_delay']
+    return args + ['-i', source]
+
+
+def live_overlay_filter(input_no, team):
+    # one zmq filter receives the commands of the whole graph
+    overlay = drawtext_filters(input_no)
+    return f'{zmq_filter()},{overlay}' if input_no == 0 else overlay
+
+
+def output_args(sink):
+    if sink.startswith('rtmp'):
+        container = 'flv'
+    else:
+        container = 'mpegts'
+    return ['-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'zerolatency', '-g', str(FRAME_RATE * 2),
+            '-b:v', '3M', '-c:a', 'aac', '-b:a', '128k', '-ac', '2',
+            # constant output rate, the frames arriving too late are dropped and counted
+            '-r', str(FRAME_RATE), '-vsync', 'cfr', '-f', container, sink]
+
+
+def live_command(alliance, sources, stand_in, sink):
+    command = [FFMPEG, '-hide_banner', '-nostdin', '-v', 'warning', '-nostats', '-progress', 'pipe:1']
+    for team, source in zip(alliance['Blue'] + alliance['Red'], sources):
+        command += live_input_args(source, stand_in, team.video.game_start_offset if stand_in else None)
+    # each stream starts at its own time, they are aligned on their first frame
+    graph = composite_filter(alliance, live_overlay_filter, input_filter='setpts=PTS-STARTPTS,')
+    command += ['-filter_complex', graph, '-map', '[v]', '-map', '[a]']
+    return command + output_args(sink)
+
+
+def stream(manifest, sources=None, sink=DEFAULT_SINK, duration=None):
+    """Composite the four streams to the sink until ffmpeg stops (or the duration), return the LiveStats"""
+    game = load_match_manifest(manifest, load_videos=True, check_files=sources is None)
+    alliance = {'Red': game.alliance('Red'), 'Blue': game.alliance('Blue')}
+    stand_in = sources is None
+    if stand_in:
+        sources = [team.video.location for team in alliance['Blue'] + alliance['Red']]
+    # in the order of the inputs
+    scoreboard = LiveScoreboard(alliance['Blue'] + alliance['Red'], OverlayPublisher())
+    command = live_command(alliance, sources, stand_in, sink)
+    if duration is not None:
+        command[-1:-1] = ['-t', str(duration)]
+    print(' '.join(command))
+    threading.Thread(target=scoreboard.read_events, args=(sys.stdin,), daemon=True, name='live-scores').start()
+    stats = LiveStats(time.time())
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+    next_report = time.time() + REPORT_SECONDS
+    try:
+        for line in process.stdout:
+            key, _, value = line.strip().partition('=')
+            stats.update(key, value)
+            if key == 'progress':
+                scoreboard.tick()
+                if time.time() >= next_report:
+                    print(f'Live : {stats.report()}')
+                    next_report = time.time() + REPORT_SECONDS
+    except KeyboardInterrupt:
+        process.terminate()
+    process.wait()
+    scoreboard.publisher.close()
+    if stats.first_output is not None:
+        print(f'Live summary : startup latency {stats.startup * 1000:.0f}ms, lag average '
+              f'{sum(stats.lags) / len(stats.lags) * 1000:.0f}ms, max {max(stats.lags) * 1000:.0f}ms, '
+              f'dropped {stats.dropped} frames, duplicated {stats.duplicated} frames')
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Composite the four live streams of a match, with live scores read from the standard input')
+    parser.add_argument('manifest', type=str, help='The match manifest file, for the teams of the match')
+    parser.add_argument('--input', type=str, action='append', default=None,
+                        help='Stream of a team, 4 times in the order of the manifest: Blue, Blue, Red, Red. Default to the game videos played as stand-ins')
+    parser.add_argument('--sink', type=str, default=DEFAULT_SINK, help=f'Where to stream the composite, default to {DEFAULT_SINK}')
+    parser.add_argument('--duration', type=float, default=None, help='Stop after this number of seconds')
+    args = parser.parse_args()
+    if args.input is not None and len(args.input) != 4:
+        print(f'ERROR : 4 inputs are needed, got {len(args.input)}')
+        sys.exit(1)
+    try:
+        stream(args.manifest, args.input, args.sink, args.duration)
+    except ManifestException as ex:
+        print(f'ERROR : invalid manifest\n{ex}')
+        sys.exit(1)
+    except OverlayException as ex:
+        print(f'ERROR : {ex}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    metrics.run('live', main)
@@ -0,0 +1,143 @@
+"""
+Score and event overlay of a team, drawn by two drawtext filters updated at runtime through filter commands
+
+Instead of subtitles rendered up front, each team has a "drawtext@event<N>" and a "drawtext@score<N>" filter, and
+their text is changed with the "reinit" command only when the score changes. Drawing an unchanged text costs almost
+nothing per frame.
+
+ - Offline, the commands of the whole game are computed from the video manifest into a sendcmd file per team, a
+   corrected manifest only needs a new file.
+ - Live, the commands are sent while the game is played to the zmq filter of the graph by OverlayPublisher
+   (this needs pyzmq, and an ffmpeg build with libzmq).
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+
+# seconds an event is shown, the same as the subtitles of EventSrt
+EVENT_SECONDS = 10
+ZMQ_ADDRESS = 'tcp://127.0.0.1:5555'
+ZMQ_TIMEOUT_MS = 1000
+
+
+def event_text(description, point):
+    if point is None:
+        return f'{description}'
+    return f'{description}: {point} points'
+
+
+def score_text(total):
+    return f'Score: {total}'
+
+
+def overlay_timeline(events):
+    """[(seconds, event text, score text)] of the overlay changes, from the [(seconds, description, point)] events
+
+    The events shown together are the ones of the last EVENT_SECONDS, an event without point (such as the game start)
+    is only shown until the next event, the same as EventSrt.
+    """
+    changes = [(0, '', score_text(0))]
+    total = 0
+    shown = []
+    for no, (seconds, description, point) in enumerate(events):
+        if point is not None:
+            total += point
+        shown = [(time, text, kept) for time, text, kept in shown if kept and seconds - time <= EVENT_SECONDS]
+        shown.append((seconds, event_text(description, point), point is not None))
+        changes.append((seconds, ' / '.join(text for _, text, _ in shown), score_text(total)))
+        next_seconds = events[no + 1][0] if no + 1 < len(events) else None
+        if next_seconds is None or next_seconds - seconds > EVENT_SECONDS:
+            changes.append((seconds + EVENT_SECONDS, '', score_text(total)))
+            shown = []
+    return changes
+
+
+def option_value(text):
+    """Escape a text for the value of a filter option, quotes are replaced so the value can be quoted as a whole"""
+    return text.replace('\\', '/').replace("'", '’').replace(':', '\\:')
+
+
+def drawtext_filters(input_no):
+    """The two drawtext filters of a team at the bottom of its video, where the subtitles were, their text is set by commands"""
+    style = 'expansion=none:fontcolor=white:fontsize=16:box=1:boxcolor=black@0.5:boxborderw=5:x=(w-text_w)/2'
+    return f"drawtext@event{input_no}=text=' ':{style}:y=h-text_h-50," \
+           f"drawtext@score{input_no}=text=' ':{style}:y=h-text_h-20"
+
+
+def reinit_commands(input_no, event, score):
+    return [(f'drawtext@event{input_no}', 'reinit', f'text={option_value(event or " ")}'),
+            (f'drawtext@score{input_no}', 'reinit', f'text={option_value(score)}')]
+
+
+def write_sendcmd_file(filename, input_no, events):
+    """sendcmd file with the overlay changes of a team, see overlay_timeline for the events"""
+    with open(filename, 'w') as file:
+        for seconds, event, score in overlay_timeline(events):
+            commands = ', '.join(f"{target} {command} '{arg}'" for target, command, arg in reinit_commands(input_no, event, score))
+            file.write(f'{seconds:.3f} {commands};\n')
+    return filename
+
+
+def sendcmd_filter(filename):
+    return f"sendcmd=f={filename.replace(os.sep, '/').__repr__()}"
+
+
+def zmq_filter(address=ZMQ_ADDRESS):
+    return f"zmq=bind_address='{option_value(address)}'"
+
+
+class OverlayException(Exception):
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class OverlayPublisher:
+    """Send the overlay commands to the zmq filter of a running ffmpeg"""
+
+    def __init__(self, address=ZMQ_ADDRESS):
+        try:
+            import zmq
+        except ImportError:
+            raise OverlayException('The live overlay needs pyzmq, please run "pipenv install pyzmq"')
+        self.zmq = zmq
+        self.address = address
+        self.context = zmq.Context.instance()
+        self.socket = None
+
+    def connect(self):
+        self.socket = self.context.socket(self.zmq.REQ)
+        self.socket.setsockopt(self.zmq.RCVTIMEO, ZMQ_TIMEOUT_MS)
+        self.socket.setsockopt(self.zmq.LINGER, 0)
+        self.socket.connect(self.address)
+
+    def send(self, target, command, arg):
+        """Send one command, return False if ffmpeg didn't answer (not started yet or stopped)"""
+        if self.socket is None:
+            self.connect()
+        self.socket.send_string(f'{target} {command} {arg}')
+        try:
+            reply = self.socket.recv_string()
+        except self.zmq.Again:
+            # a REQ socket without reply can't send again, start over with a new one
+            self.socket.close()
+            self.socket = None
+            return False
+        if not reply.startswith('0 '):
+            print(f'WARNING : overlay command [{target} {command}] failed, {reply}')
+        return True
+
+    def update(self, input_no, event, score):
+        for target, command, arg in reinit_commands(input_no, event, score):
+            if not self.send(target, command, arg):
+                return False
+        return True
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
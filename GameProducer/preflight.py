@@ -0,0 +1,201 @@
+"""
+Preflight validation of every match of an event before a render batch is queued
+
+All the matches are checked in parallel : the manifests, the video files, the media sanity (decodable, has audio,
+long enough for the game) and the teams against the score keeper database. The problems of all the matches are
+reported at once, before any encoding starts. The media probes are cached beside the videos, see MediaTools.probe.
+
+Usage: python -m GameProducer.preflight path/to/event/root [--db scorekeeper.db] [--match 3] [--json report.json]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from Manifest.layout import FOLDER_MATCH, PATTERN_MATCH_FOLDER
+from Manifest.loader import load_match_manifest
+from Manifest.model import ALLIANCES
+from Manifest.timecode import GAME_SECONDS, seconds_to_mmss
+from MediaTools import metrics
+from MediaTools.ffmpeg import FFmpegException
+from MediaTools.probe import probe_media
+
+LEVEL_ERROR = 'ERROR'
+LEVEL_WARNING = 'WARNING'
+
+
+class Issue:
+
+    def __init__(self, level, message):
+        self.level = level
+        self.message = message
+
+    def __str__(self):
+        return f'{self.level} : {self.message}'
+
+
+class MatchReport:
+
+    def __init__(self, match, manifest):
+        self.match = match
+        self.manifest = manifest
+        self.issues = []
+
+    def error(self, message):
+        self.issues.append(Issue(LEVEL_ERROR, message))
+
+    def warning(self, message):
+        self.issues.append(Issue(LEVEL_WARNING, message))
+
+    def count(self, level):
+        return sum(1 for issue in self.issues if issue.level == level)
+
+    @property
+    def ok(self):
+        return self.count(LEVEL_ERROR) == 0
+
+    def to_dict(self):
+        return {'match': self.match, 'manifest': self.manifest,
+                'issues': [{'level': issue.level, 'message': issue.message} for issue in self.issues]}
+
+
+def find_match_manifests(root_folder):
+    """{match number: match manifest file} of the match folders, the file may not exist"""
+    manifests = {}
+    matches_folder = os.path.join(root_folder, FOLDER_MATCH)
+    if not os.path.isdir(matches_folder):
+        return manifests
+    with os.scandir(matches_folder) as it:
+        for entry in it:
+            parts = PATTERN_MATCH_FOLDER.match(entry.name)
+            if entry.is_dir() and parts:
+                match = int(parts.group(1))
+                manifests[match] = os.path.join(entry.path, f'match{match}.yml')
+    return manifests
+
+
+def read_score_keeper(db_file):
+    """({match: {alliance: [team numbers]}}, {team number: team name}) from the score keeper database"""
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    quals = {row['match']: {'Red': [row['red1'], row['red2']], 'Blue': [row['blue1'], row['blue2']]}
+             for row in conn.execute('SELECT * FROM quals')}
+    teams = {row['number']: row['name'] for row in conn.execute('SELECT * FROM teamInfo')}
+    conn.close()
+    return quals, teams
+
+
+def check_video(report, team, probe):
+    where = f'[#{team.number}, {team.name}] video [{os.path.basename(team.video.location)}]'
+    if probe['video'] is None:
+        report.error(f'{where} has no video stream')
+    if probe['audio'] is None:
+        report.error(f'{where} has no audio stream')
+    if probe['decode_error'] is not None:
+        report.error(f'{where} cannot be decoded, {probe["decode_error"]}')
+    offset = team.video.game_start_offset
+    if probe['duration'] is None:
+        report.warning(f'{where} has an unknown duration')
+    elif offset is not None and probe['duration'] < offset + GAME_SECONDS:
+        report.error(f'{where} lasts {seconds_to_mmss(probe["duration"])}, shorter than the game start '
+                     f'{seconds_to_mmss(offset)} plus the {GAME_SECONDS}s of the game')
+
+
+def check_match(match, manifest, quals=None, teams=None):
+    report = MatchReport(match, manifest)
+    if not os.path.isfile(manifest):
+        report.error(f'Match manifest [{manifest}] not exists, the match is not scaffolded')
+        return report
+    errors = []
+    game = load_match_manifest(manifest, errors=errors)
+    for error in errors:
+        report.error(str(error))
+    if game is None:
+        return report
+    for team in game.teams:
+        video = team.video
+        if video.manifest_file is not None and not os.path.isfile(video.manifest_file):
+            # reported by the loader already, say what it means
+            report.error(f'[#{team.number}, {team.name}] video is not reviewed yet')
+        if video.game_start_offset is not None and video.events and video.events[-1].time is not None \
+                and video.events[-1].time > video.game_start_offset + GAME_SECONDS:
+            report.warning(f'[#{team.number}, {team.name}] game event [{video.events[-1].description}] is after the game end')
+        if video.location is None or not os.path.isfile(video.location):
+            continue
+        try:
+            check_video(report, team, probe_media(video.location))
+        except FFmpegException as ex:
+            report.error(f'[#{team.number}, {team.name}] cannot probe video [{video.location}], {ex}')
+    if quals is not None:
+        if match not in quals:
+            report.error(f'Match #{match} is not in the score keeper database')
+        else:
+            for alliance in ALLIANCES:
+                expected = sorted(quals[match][alliance])
+                actual = sorted(team.number for team in game.alliance(alliance) if team.number is not None)
+                if expected != actual:
+                    report.error(f'{alliance} alliance is {actual}, the score keeper database says {expected}')
+    if teams is not None:
+        for team in game.teams:
+            if team.number in teams and teams[team.number] != team.name:
+                report.warning(f'Team #{team.number} is [{team.name}], the score keeper database says [{teams[team.number]}]')
+    return report
+
+
+def preflight(root_folder, db_file=None, matches=None, jobs=None):
+    """Reports of the matches of the event, sorted by match number"""
+    manifests = find_match_manifests(root_folder)
+    quals, teams = read_score_keeper(db_file) if db_file is not None else (None, None)
+    if quals is not None and matches is None:
+        # matches of the database without a folder are not scaffolded
+        for match in quals:
+            manifests.setdefault(match, os.path.join(root_folder, FOLDER_MATCH, f'Match #{match}', f'match{match}.yml'))
+    if matches is not None:
+        manifests = {match: manifests.get(match, os.path.join(root_folder, FOLDER_MATCH, f'Match #{match}', f'match{match}.yml'))
+                     for match in matches}
+    # the checks wait on ffprobe / ffmpeg processes and the disk, threads are enough
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = [executor.submit(check_match, match, manifest, quals, teams) for match, manifest in sorted(manifests.items())]
+        return [future.result() for future in futures]
+
+
+def print_report(reports):
+    for report in reports:
+        if not report.issues:
+            print(f'Match #{report.match} : OK')
+            continue
+        print(f'Match #{report.match} : {report.count(LEVEL_ERROR)} errors, {report.count(LEVEL_WARNING)} warnings')
+        for issue in report.issues:
+            print(f'  {issue}')
+    failed = [report.match for report in reports if not report.ok]
+    print(f'{len(reports) - len(failed)} of {len(reports)} matches ready to render'
+          + (f', fix matches {failed} first' if failed else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check every match of the event before queueing the renders')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('--db', type=str, default=None, help='The score keeper database to check the teams against')
+    parser.add_argument('--match', type=int, action='append', default=None, help='Only check this match, can be repeated')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of matches checked in parallel, default to the number of CPUs')
+    parser.add_argument('--json', type=str, default=None, help='Also write the report to this json file')
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        print(f'ERROR : Root folder passed in [{args.root}] not exists')
+        sys.exit(1)
+    reports = preflight(args.root, args.db, args.match, args.jobs)
+    print_report(reports)
+    if args.json is not None:
+        with open(args.json, 'w') as file:
+            json.dump([report.to_dict() for report in reports], file, indent=2)
+    sys.exit(0 if all(report.ok for report in reports) else 1)
+
+
+if __name__ == '__main__':
+    metrics.run('preflight', main)
@@ -0,0 +1,147 @@
+"""
+Encoder profiles of the match videos, with the x264 preset of each profile calibrated for the current machine
+
+ - archive : best quality kept after the event, may render slower than realtime
+ - web : the published match videos, rendered about as fast as the game is played
+ - fast-turnaround : the quickest render, when the audience is waiting for the result
+
+The calibration renders a few seconds of a synthetic composite of four 720p inputs with each x264 preset, and keeps
+for each profile the best quality preset which still renders at the realtime factor the profile targets. The result
+is saved per machine in the home folder, and the renders use it automatically.
+
+Usage: python -m GameProducer.profiles calibrate [--seconds 10]
+       python -m GameProducer.profiles show
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+
+from Manifest import files
+from MediaTools import metrics
+from MediaTools.ffmpeg import FFmpegException, run_ffmpeg
+
+# from the best quality to the fastest
+PRESETS = ['slower', 'slow', 'medium', 'fast', 'faster', 'veryfast', 'superfast', 'ultrafast']
+CALIBRATION_SECONDS = 10
+DEFAULT_PROFILE = 'web'
+
+
+class EncoderProfile:
+
+    def __init__(self, name, crf, audio_bitrate, target_speed, preset):
+        self.name = name
+        self.crf = crf
+        self.audio_bitrate = audio_bitrate
+        # seconds of video rendered per second, the realtime factor the calibration aims for
+        self.target_speed = target_speed
+        # default preset until the machine is calibrated
+        self.preset = preset
+
+    def output_args(self):
+        return f'-c:v libx264 -preset {self.preset} -crf {self.crf} -pix_fmt yuv420p -c:a aac -b:a {self.audio_bitrate}'
+
+    def __repr__(self):
+        return f'EncoderProfile({self.name}, preset {self.preset}, crf {self.crf}, target {self.target_speed}x)'
+
+
+PROFILES = {
+    'archive': EncoderProfile('archive', 18, '192k', 0.5, 'slow'),
+    'web': EncoderProfile('web', 23, '160k', 1.0, 'medium'),
+    'fast-turnaround': EncoderProfile('fast-turnaround', 27, '128k', 2.5, 'veryfast'),
+}
+
+
+def calibration_file():
+    # named after the host, so a home folder shared between machines keeps one calibration per machine
+    return os.path.join(os.path.expanduser('~'), '.virtualgameevent', f'encoder-{socket.gethostname()}.json')
+
+
+def load_calibration():
+    """{profile name: preset} calibrated for this machine, empty if not calibrated"""
+    try:
+        with open(calibration_file()) as file:
+            return json.load(file).get('presets', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def encoder_profile(name=DEFAULT_PROFILE):
+    """The profile with the preset calibrated for this machine"""
+    if name not in PROFILES:
+        raise ValueError(f'Unknown encoder profile [{name}], use one of {list(PROFILES)}')
+    profile = PROFILES[name]
+    preset = load_calibration().get(name)
+    if preset is None:
+        return profile
+    return EncoderProfile(profile.name, profile.crf, profile.audio_bitrate, profile.target_speed, preset)
+
+
+def synthetic_composite_args(seconds):
+    """Four synthetic 720p game videos with audio, composited like a match"""
+    args = []
+    for i in range(4):
+        args += ['-f', 'lavfi', '-i', f'testsrc2=size=1280x720:rate=30:duration={seconds}',
+                 '-f', 'lavfi', '-i', f'sine=frequency={220 * (i + 1)}:duration={seconds}']
+    graph = ''.join(f'[{2 * i}:v]scale=640:480[v{i}]; ' for i in range(4))
+    graph += '[v0][v1]vstack[left]; [v2][v3]vstack[right]; ' \
+             '[left]pad=iw+10:ih+10:5:5:color=blue[left]; [right]pad=iw+10:ih+10:5:5:color=red[right]; ' \
+             '[left][right]hstack[v]; [1:a][3:a][5:a][7:a]amix=inputs=4[a]'
+    return args + ['-filter_complex', graph, '-map', '[v]', '-map', '[a]']
+
+
+def measure_speed(profile, preset, seconds=CALIBRATION_SECONDS):
+    """Realtime factor of the synthetic composite encoded with the preset and the quality of the profile"""
+    calibrated = EncoderProfile(profile.name, profile.crf, profile.audio_bitrate, profile.target_speed, preset)
+    started = time.perf_counter()
+    run_ffmpeg(synthetic_composite_args(seconds) + calibrated.output_args().split() + ['-f', 'null', '-'])
+    return seconds / (time.perf_counter() - started)
+
+
+def calibrate(seconds=CALIBRATION_SECONDS):
+    """Pick the preset of each profile, save and return {profile name: (preset, speed)}"""
+    results = {}
+    for profile in PROFILES.values():
+        chosen = None
+        for preset in PRESETS:
+            speed = measure_speed(profile, preset, seconds)
+            print(f'{profile.name} : preset {preset} renders at {speed:.2f}x realtime')
+            chosen = (preset, speed)
+            if speed >= profile.target_speed:
+                break
+        else:
+            print(f'WARNING : {profile.name} : no preset reaches {profile.target_speed}x realtime, using {chosen[0]}')
+        results[profile.name] = chosen
+    filename = calibration_file()
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with files.atomic_open(filename) as file:
+        json.dump({'host': socket.gethostname(), 'calibrated': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'presets': {name: preset for name, (preset, speed) in results.items()},
+                   'speeds': {name: round(speed, 2) for name, (preset, speed) in results.items()}}, file, indent=2)
+    print(f'Saved calibration {filename}')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibrate the encoder profiles of the match videos for this machine')
+    parser.add_argument('action', choices=['calibrate', 'show'], help='Calibrate this machine, or show the profiles')
+    parser.add_argument('--seconds', type=float, default=CALIBRATION_SECONDS, help='Seconds of synthetic video rendered per preset')
+    args = parser.parse_args()
+    if args.action == 'calibrate':
+        try:
+            calibrate(args.seconds)
+        except FFmpegException as ex:
+            print(f'ERROR : calibration failed, {ex}')
+            sys.exit(1)
+    for name in PROFILES:
+        print(encoder_profile(name))
+
+
+if __name__ == '__main__':
+    metrics.run('profiles', main)
@@ -0,0 +1,269 @@
+"""
+Event replay reel, the published match videos joined in the qualification order with a title card before each match
+
+Nothing of the published videos is encoded again : the title cards are rendered with exactly the stream parameters
+of the published videos (codec, profile, size, pixel format, frame rate, audio), every part is remuxed to MPEG-TS
+so each one carries its own codec headers, and the parts are joined by the concat demuxer with stream copy. The
+whole event is assembled in about the time of copying it twice on disk.
+
+A published video whose parameters drifted from the others (rendered with another encoder or version) is the only
+part encoded again, to the parameters of the first match, with a warning. The reel is H.264 or HEVC with AAC, the
+codecs MPEG-TS and the stream copy concat handle : the videos published before with the matroska defaults (Vorbis
+audio) are encoded again as well, only their audio when their video can be copied.
+
+Usage: python -m GameProducer.reel path/to/event/root path/to/scorekeeper.db event-replay.mp4 [--title-seconds 3]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from GameProducer.overlay import option_value
+from GameProducer.preflight import read_score_keeper
+from GameProducer.profiles import DEFAULT_PROFILE, PROFILES, encoder_profile
+from GameProducer.worker import FOLDER_PUBLISHED, published_filename
+from MediaTools import metrics
+from MediaTools.cache import load_json_cache, save_json_cache, source_stamp
+from MediaTools.ffmpeg import FFmpegException, run_ffmpeg, run_ffprobe
+
+CACHE_SUFFIX = 'streams.json'
+TITLE_SECONDS = 3
+# encoders of the title cards, by codec of the published videos, any other codec is encoded again
+ENCODERS = {'h264': 'libx264', 'hevc': 'libx265'}
+AUDIO_ENCODERS = {'aac': 'aac'}
+DEFAULT_CODEC = 'h264'
+DEFAULT_AUDIO_CODEC = 'aac'
+# stream parameters which must be the same for a stream copy concat
+VIDEO_KEYS = ['codec', 'profile', 'width', 'height', 'pix_fmt', 'frame_rate', 'sample_aspect_ratio']
+AUDIO_KEYS = ['codec', 'sample_rate', 'channels', 'channel_layout']
+
+
+class ReelException(Exception):
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+def build_stream_parameters(media_file):
+    """{duration, video, audio} with the parameters a stream copy concat depends on"""
+    info = run_ffprobe(['-show_entries', 'format=duration:stream=codec_type,codec_name,profile,width,height,pix_fmt,'
+                        'r_frame_rate,sample_aspect_ratio,sample_rate,channels,channel_layout', media_file])
+    streams = info.get('streams', [])
+    video = next((stream for stream in streams if stream.get('codec_type') == 'video'), None)
+    audio = next((stream for stream in streams if stream.get('codec_type') == 'audio'), None)
+    if video is None or audio is None:
+        raise ReelException(f'[{media_file}] needs a video and an audio stream')
+    duration = info.get('format', {}).get('duration')
+    return {
+        'duration': float(duration) if duration not in (None, 'N/A') else None,
+        'video': {'codec': video.get('codec_name'), 'profile': video.get('profile'), 'width': video.get('width'),
+                  'height': video.get('height'), 'pix_fmt': video.get('pix_fmt'), 'frame_rate': video.get('r_frame_rate'),
+                  'sample_aspect_ratio': video.get('sample_aspect_ratio', '1:1')},
+        'audio': {'codec': audio.get('codec_name'), 'sample_rate': int(audio.get('sample_rate', 0)),
+                  'channels': audio.get('channels'), 'channel_layout': audio.get('channel_layout')},
+    }
+
+
+def stream_parameters(media_file):
+    """The cached stream parameters of the media file, probe it again if it changed since"""
+    parameters = load_json_cache(media_file, CACHE_SUFFIX)
+    if parameters is None:
+        stamp = source_stamp(media_file)
+        parameters = build_stream_parameters(media_file)
+        save_json_cache(media_file, CACHE_SUFFIX, parameters, stamp)
+    return parameters
+
+
+def reel_parameters(parameters):
+    """The stream parameters of the reel from the ones of the first match, with the codecs changed to the default
+    ones if they cannot be joined by stream copy through MPEG-TS
+    """
+    video, audio = dict(parameters['video']), dict(parameters['audio'])
+    if video['codec'] not in ENCODERS:
+        video['codec'] = DEFAULT_CODEC
+        # the profiles are named per codec, the encoder picks one
+        video['profile'] = None
+    if audio['codec'] not in AUDIO_ENCODERS:
+        audio['codec'] = DEFAULT_AUDIO_CODEC
+    return dict(parameters, video=video, audio=audio)
+
+
+def parameter_drift(reference, parameters, kinds=('video', 'audio')):
+    """[differences] of the stream parameters from the reference ones, empty if the streams can be joined as they are"""
+    keys = {'video': VIDEO_KEYS, 'audio': AUDIO_KEYS}
+    return [f'{kind} {key} {parameters[kind][key]} instead of {reference[kind][key]}'
+            for kind in kinds for key in keys[kind] if parameters[kind][key] != reference[kind][key]]
+
+
+def video_encode_args(reference, profile=DEFAULT_PROFILE):
+    """Output arguments encoding the video to the stream parameters of the reference, with the quality of the profile"""
+    video = reference['video']
+    if video['codec'] not in ENCODERS:
+        raise ReelException(f'No encoder for the {video["codec"]} videos, the title cards need {list(ENCODERS)}')
+    profile = encoder_profile(profile)
+    preset = profile.preset
+    if video['codec'] == 'h264' and preset == 'ultrafast' and 'baseline' not in (video['profile'] or '').lower():
+        # ultrafast turns off CABAC and the 8x8 transform, the stream would be Constrained Baseline
+        preset = 'superfast'
+    args = ['-c:v', ENCODERS[video['codec']], '-preset', preset, '-crf', str(profile.crf),
+            '-pix_fmt', video['pix_fmt'], '-r', video['frame_rate']]
+    if video['profile']:
+        # ffprobe names them "High", "Main 10", "Constrained Baseline"..., the encoders "high", "main10", "baseline"...
+        args += ['-profile:v', video['profile'].lower().replace('constrained ', '').replace(' ', '')]
+    return args
+
+
+def audio_encode_args(reference, profile=DEFAULT_PROFILE):
+    """Output arguments encoding the audio to the stream parameters of the reference"""
+    audio = reference['audio']
+    if audio['codec'] not in AUDIO_ENCODERS:
+        raise ReelException(f'No encoder for the {audio["codec"]} audio, the reel needs {list(AUDIO_ENCODERS)}')
+    return ['-c:a', AUDIO_ENCODERS[audio['codec']], '-b:a', encoder_profile(profile).audio_bitrate,
+            '-ar', str(audio['sample_rate']), '-ac', str(audio['channels'])]
+
+
+def encode_args(reference, profile=DEFAULT_PROFILE):
+    """Output arguments encoding to the stream parameters of the reference, with the quality of the encoder profile"""
+    return video_encode_args(reference, profile) + audio_encode_args(reference, profile)
+
+
+def title_lines(match, quals, teams):
+    lines = [f'Qualification Match {match}']
+    for alliance in ['Blue', 'Red']:
+        names = [f'#{number} {teams.get(number, "")}'.strip() for number in quals[match][alliance]]
+        lines.append(f'{alliance} Alliance: {" & ".join(names)}')
+    return lines
+
+
+def title_filter(lines, height):
+    fontsize = max(16, height // 20)
+    filters = []
+    for no, line in enumerate(lines):
+        y = f'(h-{len(lines)}*{fontsize * 2})/2+{no * fontsize * 2}'
+        filters.append(f"drawtext=text='{option_value(line)}':expansion=none:fontcolor=white:fontsize={fontsize}:"
+                       f"x=(w-text_w)/2:y={y}")
+    return ','.join(filters)
+
+
+def render_title_card(lines, reference, output, seconds=TITLE_SECONDS, profile=DEFAULT_PROFILE):
+    """Title card of a match, encoded with the stream parameters of the published videos"""
+    video, audio = reference['video'], reference['audio']
+    layout = audio['channel_layout'] or ('stereo' if audio['channels'] == 2 else 'mono')
+    run_ffmpeg(['-f', 'lavfi', '-i', f'color=c=black:s={video["width"]}x{video["height"]}:r={video["frame_rate"]}:d={seconds}',
+                '-f', 'lavfi', '-i', f'anullsrc=r={audio["sample_rate"]}:cl={layout}',
+                '-vf', f'setsar={video["sample_aspect_ratio"].replace(":", "/")},{title_filter(lines, video["height"])}',
+                '-t', str(seconds), '-shortest'] + encode_args(reference, profile) + ['-f', 'mpegts', '-y', output])
+    return output
+
+
+def remux_part(media_file, output):
+    """Stream copy to MPEG-TS, the codec headers are repeated in the stream so they may differ between parts"""
+    run_ffmpeg(['-i', media_file, '-map', '0:v:0', '-map', '0:a:0', '-c', 'copy', '-f', 'mpegts', '-y', output])
+    return output
+
+
+def conform_part(media_file, reference, output, profile=DEFAULT_PROFILE, copy_video=False):
+    """Encode a drifted published video again to the stream parameters of the reference, only its audio if the video
+    can be copied
+    """
+    video = reference['video']
+    if copy_video:
+        args = ['-c:v', 'copy']
+    else:
+        args = ['-vf', f'scale={video["width"]}:{video["height"]},setsar={video["sample_aspect_ratio"].replace(":", "/")}']
+        args += video_encode_args(reference, profile)
+    run_ffmpeg(['-i', media_file, '-map', '0:v:0', '-map', '0:a:0'] + args + audio_encode_args(reference, profile)
+               + ['-f', 'mpegts', '-y', output])
+    return output
+
+
+def concat_list_entry(filename):
+    # the concat demuxer quotes with single quotes, a quote is closed, escaped and opened again
+    return "file '{}'\n".format(os.path.abspath(filename).replace("'", "'\\''"))
+
+
+def join_parts(parts, output, work_folder):
+    list_file = os.path.join(work_folder, 'parts.txt')
+    with open(list_file, 'w') as file:
+        file.writelines(concat_list_entry(part) for part in parts)
+    run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', list_file, '-map', '0', '-c', 'copy',
+                # the AAC of MPEG-TS has ADTS headers, mp4 and matroska keep them in the codec header instead
+                '-bsf:a', 'aac_adtstoasc', '-movflags', '+faststart', '-y', output])
+    return output
+
+
+def reel_matches(root_folder, quals):
+    """[(match, published video)] in the qualification order, the matches not published yet are reported and skipped"""
+    matches = []
+    for match in sorted(quals):
+        published = published_filename(root_folder, match)
+        if os.path.isfile(published):
+            matches.append((match, published))
+        else:
+            print(f'WARNING : match #{match} is not published yet, not in the reel')
+    return matches
+
+
+def build_reel(root_folder, db_file, output, title_seconds=TITLE_SECONDS, profile=DEFAULT_PROFILE, jobs=None):
+    """Join the published matches into the output video, return the number of matches in it"""
+    quals, teams = read_score_keeper(db_file)
+    matches = reel_matches(root_folder, quals)
+    if not matches:
+        raise ReelException(f'No published match in [{os.path.join(root_folder, FOLDER_PUBLISHED)}]')
+    parameters = {match: stream_parameters(published) for match, published in matches}
+    reference = reel_parameters(parameters[matches[0][0]])
+    work_folder = tempfile.mkdtemp(prefix='reel-', dir=os.path.dirname(os.path.abspath(output)))
+    try:
+        # each part is one ffmpeg process, mostly waiting on the disk
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = []
+            for match, published in matches:
+                if title_seconds > 0:
+                    futures.append(executor.submit(render_title_card, title_lines(match, quals, teams), reference,
+                                                   os.path.join(work_folder, f'title{match}.ts'), title_seconds, profile))
+                drift = parameter_drift(reference, parameters[match])
+                part = os.path.join(work_folder, f'match{match}.ts')
+                if drift:
+                    print(f'WARNING : match #{match} is encoded again to join the reel, {", ".join(drift)}')
+                    copy_video = not parameter_drift(reference, parameters[match], ['video'])
+                    futures.append(executor.submit(conform_part, published, reference, part, profile, copy_video))
+                else:
+                    futures.append(executor.submit(remux_part, published, part))
+            # in submission order, so the parts are in the reel order
+            parts = [future.result() for future in futures]
+        join_parts(parts, output, work_folder)
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+    return len(matches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Join the published match videos into one event replay, without encoding them again')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('db', type=str, help='The score keeper database, for the qualification order and the team names')
+    parser.add_argument('output', type=str, help='The event replay video file')
+    parser.add_argument('--title-seconds', type=float, default=TITLE_SECONDS, help=f'Seconds of the title card before each match, 0 for none, default to {TITLE_SECONDS}')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE, help='Encoder profile of the title cards and the drifted videos')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of parts prepared in parallel')
+    args = parser.parse_args()
+    if not os.path.isfile(args.db):
+        print(f'ERROR : score keeper database [{args.db}] not exists')
+        sys.exit(1)
+    try:
+        count = build_reel(args.root, args.db, args.output, args.title_seconds, args.profile, args.jobs)
+    except (ReelException, FFmpegException) as ex:
+        print(f'ERROR : {ex}')
+        sys.exit(1)
+    print(f'Event replay [{args.output}] with {count} matches')
+
+
+if __name__ == '__main__':
+    metrics.run('reel', main)
@@ -0,0 +1,272 @@
+"""
+Live standings of the qualifications, ranked with the FTC ranking points and tie breakers over the reviewed matches
+
+A match counts once the videos of its four teams are reviewed. As the score keeper does :
+
+ - the score of an alliance is the points it scored plus the penalty points committed by the other alliance
+ - a win gives 2 ranking points, a tie 1, a loss none
+ - the teams are ranked by their average ranking points, then the average autonomous points (TBP1), the average
+   end game points (TBP2) and the highest match score
+ - a match played as a surrogate is not counted for the team
+
+The standings are updated incrementally : the catalog tells which manifests changed, and only their matches and
+the teams of these matches are computed again. EventPlanner shows them and keeps "standings.json" and
+"standings.html" (a page which reloads itself, for a browser source of the broadcast) up to date in
+"Match Video Published", so does this tool with --watch.
+
+Usage: python -m GameProducer.standings path/to/event/root path/to/scorekeeper.db [--watch 10]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import json
+import html
+import time
+import sqlite3
+import argparse
+
+from GameProducer.worker import FOLDER_PUBLISHED
+from Manifest import files
+from Manifest.catalog import Catalog, match_of_manifest
+from Manifest.layout import POSITIONS
+from MediaTools import metrics
+
+RESULT_WIN = 'W'
+RESULT_LOSS = 'L'
+RESULT_TIE = 'T'
+RANKING_POINTS = {RESULT_WIN: 2, RESULT_TIE: 1, RESULT_LOSS: 0}
+STANDINGS_JSON = 'standings.json'
+STANDINGS_HTML = 'standings.html'
+HTML_REFRESH_SECONDS = 10
+WATCH_SECONDS = 10
+
+
+class AllianceResult:
+    __slots__ = ('teams', 'score', 'auton', 'end_game')
+
+    def __init__(self, teams, score, auton, end_game):
+        self.teams = teams
+        self.score = score
+        self.auton = auton
+        self.end_game = end_game
+
+
+class TeamStanding:
+    __slots__ = ('number', 'name', 'rank', 'results')
+
+    def __init__(self, number, name):
+        self.number = number
+        self.name = name
+        self.rank = None
+        # match -> (result, alliance score, autonomous points, end game points)
+        self.results = {}
+
+    @property
+    def played(self):
+        return len(self.results)
+
+    def count(self, result):
+        return sum(1 for outcome, _, _, _ in self.results.values() if outcome == result)
+
+    def average(self, index):
+        return sum(result[index] for result in self.results.values()) / self.played if self.results else 0
+
+    @property
+    def ranking_points(self):
+        return sum(RANKING_POINTS[outcome] for outcome, _, _, _ in self.results.values())
+
+    @property
+    def ranking_score(self):
+        return self.ranking_points / self.played if self.results else 0
+
+    @property
+    def highest(self):
+        return max((score for _, score, _, _ in self.results.values()), default=0)
+
+    def sort_key(self):
+        # the teams without a match after the others, then by team number instead of the random draw
+        return (not self.results, -self.ranking_score, -self.average(2), -self.average(3), -self.highest, self.number)
+
+    def to_dict(self):
+        return {'rank': self.rank, 'team': self.number, 'name': self.name, 'played': self.played,
+                'wins': self.count(RESULT_WIN), 'losses': self.count(RESULT_LOSS), 'ties': self.count(RESULT_TIE),
+                'ranking_points': self.ranking_points, 'ranking_score': round(self.ranking_score, 3),
+                'tbp1': round(self.average(2), 2), 'tbp2': round(self.average(3), 2), 'highest': self.highest}
+
+
+def schedule_from_rows(rows):
+    """({match: {alliance: [team numbers]}}, {(match, team number)} of the surrogates) from the rows of "quals"
+
+    The surrogate columns (red1S ...) are optional.
+    """
+    quals = {}
+    surrogates = set()
+    for row in rows:
+        row = dict(row)
+        quals[row['match']] = {'Red': [row['red1'], row['red2']], 'Blue': [row['blue1'], row['blue2']]}
+        surrogates.update((row['match'], row[position]) for position, _ in POSITIONS if row.get(f'{position}S'))
+    return quals, surrogates
+
+
+def read_schedule(db_file):
+    """(quals, surrogates, {team number: team name}) from the score keeper database"""
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    quals, surrogates = schedule_from_rows(conn.execute('SELECT * FROM quals'))
+    teams = {row['number']: row['name'] for row in conn.execute('SELECT * FROM teamInfo')}
+    conn.close()
+    return quals, surrogates, teams
+
+
+class Standings:
+
+    def __init__(self, quals, teams, surrogates=()):
+        self.quals = quals
+        self.surrogates = set(surrogates)
+        self.teams = {number: TeamStanding(number, name) for number, name in teams.items()}
+        # match -> {alliance: AllianceResult} of the matches with the four videos reviewed
+        self.results = {}
+        self.ranking = []
+        # incremented on each change, the views only redraw when it changed
+        self.version = 0
+
+    def team(self, number):
+        if number not in self.teams:
+            self.teams[number] = TeamStanding(number, '')
+        return self.teams[number]
+
+    def match_results(self, match, video_scores):
+        """{alliance: AllianceResult} of the match, None unless the four videos of the schedule are reviewed"""
+        scores = {(alliance, team): (scored, auton, end_game, penalty)
+                  for alliance, team, scored, auton, end_game, penalty in video_scores}
+        teams = self.quals[match]
+        if any((alliance, team) not in scores for alliance in teams for team in teams[alliance]):
+            return None
+        totals = {alliance: [sum(scores[(alliance, team)][index] for team in teams[alliance]) for index in range(4)]
+                  for alliance in teams}
+        return {alliance: AllianceResult(teams[alliance],
+                                         totals[alliance][0] + totals[other][3],
+                                         totals[alliance][1], totals[alliance][2])
+                for alliance, other in [('Red', 'Blue'), ('Blue', 'Red')]}
+
+    def set_match(self, match, results):
+        """Replace the results of a match, return whether the standings changed"""
+        if self.results.get(match) is None and results is None:
+            return False
+        previous = self.results.pop(match, None)
+        if previous is not None:
+            for alliance in previous.values():
+                for team in alliance.teams:
+                    self.team(team).results.pop(match, None)
+        if results is not None:
+            self.results[match] = results
+            for alliance, other in [('Red', 'Blue'), ('Blue', 'Red')]:
+                result = results[alliance]
+                opponent = results[other].score
+                outcome = RESULT_WIN if result.score > opponent else RESULT_LOSS if result.score < opponent else RESULT_TIE
+                for team in result.teams:
+                    if (match, team) not in self.surrogates:
+                        self.team(team).results[match] = (outcome, result.score, result.auton, result.end_game)
+        return True
+
+    @metrics.timed('standings.refresh')
+    def refresh(self, catalog, matches=None):
+        """Compute the matches again from the catalog, all of them if None, return whether the standings changed"""
+        if matches is None:
+            matches = self.quals
+        changed = False
+        for match in matches:
+            if match not in self.quals:
+                continue
+            metrics.count('standings.match')
+            changed |= self.set_match(match, self.match_results(match, catalog.video_scores(match)))
+        if changed or not self.ranking:
+            self.ranking = sorted(self.teams.values(), key=TeamStanding.sort_key)
+            for rank, team in enumerate(self.ranking, 1):
+                team.rank = rank
+            self.version += 1
+        return changed
+
+    def to_dict(self):
+        return {'matches': len(self.results), 'scheduled': len(self.quals),
+                'ranking': [team.to_dict() for team in self.ranking]}
+
+
+def changed_matches(updated_manifests):
+    """Matches of the manifests updated by Catalog.refresh"""
+    return {match for match in (match_of_manifest(manifest) for manifest in updated_manifests) if match is not None}
+
+
+def standings_html(standings):
+    rows = ''.join(f'<tr><td>{team["rank"]}</td><td>{team["team"]}</td><td>{html.escape(team["name"])}</td>'
+                   f'<td>{team["ranking_score"]:.2f}</td><td>{team["tbp1"]:.1f}</td><td>{team["tbp2"]:.1f}</td>'
+                   f'<td>{team["highest"]}</td><td>{team["wins"]}-{team["losses"]}-{team["ties"]}</td>'
+                   f'<td>{team["played"]}</td></tr>\n'
+                   for team in standings['ranking'])
+    return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="{HTML_REFRESH_SECONDS}">\n'
+            '<style>body{background:transparent;color:#fff;font-family:sans-serif}'
+            'table{border-collapse:collapse;background:rgba(0,0,0,0.7)}td,th{padding:4px 12px}'
+            'tr:nth-child(even){background:rgba(255,255,255,0.1)}</style></head><body>\n'
+            f'<h2>Qualification Rankings ({standings["matches"]} of {standings["scheduled"]} matches)</h2>\n'
+            '<table><tr><th>Rank</th><th>Team</th><th></th><th>RS</th><th>TBP1</th><th>TBP2</th><th>High</th>'
+            f'<th>W-L-T</th><th>Played</th></tr>\n{rows}</table></body></html>\n')
+
+
+def write_standings(root_folder, standings):
+    """Write the json and the html page of the standings into the published folder, return the json file"""
+    output_folder = os.path.join(root_folder, FOLDER_PUBLISHED)
+    os.makedirs(output_folder, exist_ok=True)
+    data = standings.to_dict()
+    filename = os.path.join(output_folder, STANDINGS_JSON)
+    with files.atomic_open(filename) as file:
+        json.dump(data, file, indent=2)
+    with files.atomic_open(os.path.join(output_folder, STANDINGS_HTML)) as file:
+        file.write(standings_html(data))
+    return filename
+
+
+def print_standings(standings):
+    print(f'{"Rank":>4} {"Team":>6}  {"Name":<24}{"RS":>6}{"TBP1":>7}{"TBP2":>7}{"High":>6}  {"W-L-T":<9}{"Played":>6}')
+    for team in standings.ranking:
+        if not team.results:
+            continue
+        print(f'{team.rank:>4} {team.number:>6}  {team.name[:23]:<24}{team.ranking_score:>6.2f}{team.average(2):>7.1f}'
+              f'{team.average(3):>7.1f}{team.highest:>6}  {team.count(RESULT_WIN)}-{team.count(RESULT_LOSS)}-{team.count(RESULT_TIE):<5}'
+              f'{team.played:>6}')
+    print(f'{len(standings.results)} of {len(standings.quals)} matches reviewed')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank the teams over the reviewed qualification matches')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('db', type=str, help='The FTC score keeper database')
+    parser.add_argument('--watch', type=float, default=None, nargs='?', const=WATCH_SECONDS,
+                        help=f'Keep the standings files up to date, checking the manifests every few seconds ({WATCH_SECONDS} by default)')
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        print(f'ERROR : Root folder passed in [{args.root}] not exists')
+        sys.exit(1)
+    if not os.path.isfile(args.db):
+        print(f'ERROR : DB file passed in [{args.db}] not exists')
+        sys.exit(1)
+    quals, surrogates, teams = read_schedule(args.db)
+    standings = Standings(quals, teams, surrogates)
+    catalog = Catalog(args.root)
+    catalog.refresh()
+    standings.refresh(catalog)
+    print_standings(standings)
+    print(f'Standings written to [{write_standings(args.root, standings)}]')
+    while args.watch:
+        time.sleep(args.watch)
+        updated = catalog.refresh()
+        if updated and standings.refresh(catalog, changed_matches(updated)):
+            write_standings(args.root, standings)
+            print(f'{time.strftime("%H:%M:%S")} standings updated, {len(standings.results)} matches reviewed')
+    catalog.close()
+
+
+if __name__ == '__main__':
+    metrics.run('standings', main)
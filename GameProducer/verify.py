@@ -0,0 +1,217 @@
+"""
+Post-render verification of the published match videos, a broken render is found before the spectators do
+
+A few cheap samples instead of a full decode pass :
+
+ - the container duration against the game start and the game length, a truncated file after a disk full error
+ - the last seconds decode, a file cut in the middle of a packet
+ - a few frames across the game, grabbed with a fast seek at a low resolution, for a black quadrant (a bad seek, a
+   missing input) or a frozen one (an input shorter than the game)
+ - a couple of seconds of audio at the same times, for a silent or clipping mix
+
+The result is cached beside the video as "<video>.verify.json", EventPlanner shows a Broken status from it. The
+render workers verify a render before publishing it.
+
+Usage: python -m GameProducer.verify path/to/event/root [--match 3] [--json report.json]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from GameProducer.preflight import LEVEL_ERROR, LEVEL_WARNING, MatchReport, find_match_manifests
+from GameProducer.worker import FOLDER_PUBLISHED, published_filename
+from Manifest.loader import ManifestException, load_match_manifest
+from Manifest.timecode import GAME_SECONDS, seconds_to_mmss
+from MediaTools import metrics
+from MediaTools.cache import load_json_cache, save_json_cache, source_stamp
+from MediaTools.ffmpeg import FFmpegException, decode_audio, run_ffmpeg, run_ffprobe
+
+CACHE_SUFFIX = 'verify.json'
+SAMPLES = 5
+# the frames are grabbed at this size, each quadrant is a quarter of it
+FRAME_WIDTH = 128
+FRAME_HEIGHT = 96
+# rows of a quadrant compared, without the team names at the top and the score at the bottom
+QUADRANT_ROWS = (0.2, 0.75)
+# median luma of a black quadrant, black is 16 in the limited range of the videos
+BLACK_LUMA = 24
+# mean luma difference of a quadrant between two samples, under it the quadrant didn't change
+FREEZE_DIFF = 0.5
+TAIL_SECONDS = 3
+AUDIO_SECONDS = 2
+AUDIO_RATE = 8000
+SILENCE_DB = -50
+# share of the audio samples at full scale before the mix is said to clip
+CLIPPING_RATIO = 0.001
+# seconds the duration may miss, the rounding of the seeks
+DURATION_TOLERANCE = 1
+QUADRANTS = ['top left', 'bottom left', 'top right', 'bottom right']
+
+
+def grab_frame(video, seconds):
+    """Gray frame at the time, FRAME_HEIGHT x FRAME_WIDTH, from the keyframe before it"""
+    raw = run_ffmpeg(['-ss', f'{seconds:.3f}', '-i', video, '-frames:v', '1',
+                      '-vf', f'scale={FRAME_WIDTH}:{FRAME_HEIGHT},format=gray', '-f', 'rawvideo', '-'])
+    if len(raw) < FRAME_WIDTH * FRAME_HEIGHT:
+        return None
+    return np.frombuffer(raw[:FRAME_WIDTH * FRAME_HEIGHT], dtype=np.uint8).reshape(FRAME_HEIGHT, FRAME_WIDTH)
+
+
+def quadrants(frame):
+    """The four quadrants in the order of the inputs of GameProducer : Blue, Blue, Red, Red"""
+    half_height, half_width = FRAME_HEIGHT // 2, FRAME_WIDTH // 2
+    top, bottom = int(half_height * QUADRANT_ROWS[0]), int(half_height * QUADRANT_ROWS[1])
+    return [frame[y + top:y + bottom, x:x + half_width].astype(np.float32)
+            for x in (0, half_width) for y in (0, half_height)]
+
+
+def audio_level(video, seconds):
+    """(RMS in dBFS, share of clipped samples) of a few seconds of audio, None without audio there"""
+    samples = np.frombuffer(decode_audio(video, AUDIO_RATE, seconds, AUDIO_SECONDS), dtype=np.int16)
+    if samples.size == 0:
+        return None
+    samples = samples.astype(np.float64) / 32768
+    rms = np.sqrt(np.mean(samples ** 2))
+    return 20 * np.log10(max(rms, 1e-9)), float(np.mean(np.abs(samples) >= 0.999))
+
+
+def sample_times(duration, game_start):
+    """The times sampled, spread across the game"""
+    start = game_start if game_start is not None else 0
+    end = min(duration, start + GAME_SECONDS) if duration is not None else start + GAME_SECONDS
+    step = (end - start) / (SAMPLES + 1)
+    return [start + step * (no + 1) for no in range(SAMPLES)]
+
+
+def check_frames(report, video, times, names):
+    frames = [(seconds, grab_frame(video, seconds)) for seconds in times]
+    frames = [(seconds, frame) for seconds, frame in frames if frame is not None]
+    if not frames:
+        report.error('no frame can be decoded')
+        return
+    for no, name in enumerate(names):
+        black = [seconds for seconds, frame in frames if np.median(quadrants(frame)[no]) < BLACK_LUMA]
+        if len(black) == len(frames):
+            report.error(f'{name} is black')
+        elif black:
+            report.warning(f'{name} is black at {", ".join(seconds_to_mmss(seconds) for seconds in black)}')
+        elif len(frames) > 1 and all(np.mean(np.abs(quadrants(a)[no] - quadrants(b)[no])) < FREEZE_DIFF
+                                     for (_, a), (_, b) in zip(frames, frames[1:])):
+            report.error(f'{name} is frozen from {seconds_to_mmss(frames[0][0])}')
+
+
+def check_audio(report, video, times):
+    levels = [level for level in (audio_level(video, seconds) for seconds in times) if level is not None]
+    if not levels:
+        report.error('no audio can be decoded')
+    elif all(rms < SILENCE_DB for rms, _ in levels):
+        report.error(f'the audio is silent, {max(rms for rms, _ in levels):.0f} dBFS at most')
+    elif any(clipped > CLIPPING_RATIO for _, clipped in levels):
+        report.warning(f'the audio clips, {max(clipped for _, clipped in levels) * 100:.1f}% of the samples at full scale')
+
+
+def verify_video(video, match=None, manifest=None):
+    """MatchReport of the rendered video, the match manifest gives the game start and the team names"""
+    report = MatchReport(match, manifest)
+    game_start = None
+    names = QUADRANTS
+    if manifest is not None:
+        try:
+            game = load_match_manifest(manifest, load_videos=True, check_files=False)
+            game_start = min(team.video.game_start_offset for team in game.teams)
+            names = [f'[#{team.number}, {team.name}]' for team in game.alliance('Blue') + game.alliance('Red')]
+        except (ManifestException, TypeError, ValueError):
+            report.warning('the match manifest cannot be read, the game start is unknown')
+    try:
+        duration = run_ffprobe(['-show_entries', 'format=duration', video]).get('format', {}).get('duration')
+        duration = float(duration) if duration not in (None, 'N/A') else None
+        expected = (game_start or 0) + GAME_SECONDS
+        if duration is None:
+            report.error('the duration is unknown, the file is truncated')
+        elif duration < expected - DURATION_TOLERANCE:
+            report.error(f'lasts {seconds_to_mmss(duration)}, the game ends at {seconds_to_mmss(expected)}')
+        if duration is not None:
+            try:
+                run_ffmpeg(['-xerror', '-ss', f'{max(0, duration - TAIL_SECONDS):.3f}', '-i', video, '-f', 'null', '-'])
+            except FFmpegException as ex:
+                report.error(f'the end cannot be decoded, the file is truncated, {ex}')
+        times = sample_times(duration, game_start)
+        check_frames(report, video, times, names)
+        check_audio(report, video, times)
+    except FFmpegException as ex:
+        report.error(f'cannot read the video, {ex}')
+    return report
+
+
+def cached_issues(video):
+    """[{level, message}] of the cached verification of the video, None if it's not verified since it changed"""
+    return load_json_cache(video, CACHE_SUFFIX)
+
+
+def verify_published(video, match=None, manifest=None):
+    """Verify the published video and cache the result, return the MatchReport"""
+    stamp = source_stamp(video)
+    report = verify_video(video, match, manifest)
+    save_json_cache(video, CACHE_SUFFIX, report.to_dict()['issues'], stamp)
+    return report
+
+
+def verify_event(root_folder, matches=None, jobs=None):
+    """MatchReport of each published video, sorted by match number"""
+    manifests = find_match_manifests(root_folder)
+    published_folder = os.path.join(root_folder, FOLDER_PUBLISHED)
+    published = sorted(match for match in manifests if os.path.isfile(published_filename(root_folder, match)))
+    if matches is not None:
+        published = [match for match in published if match in matches]
+    # the samples wait on ffmpeg processes, threads are enough
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = [executor.submit(verify_published, published_filename(root_folder, match), match, manifests[match])
+                   for match in published]
+        reports = [future.result() for future in futures]
+    if not reports:
+        print(f'WARNING : no published match video in [{published_folder}]')
+    return reports
+
+
+def print_verification(reports):
+    for report in reports:
+        if not report.issues:
+            print(f'Match #{report.match} : OK')
+            continue
+        print(f'Match #{report.match} : {report.count(LEVEL_ERROR)} errors, {report.count(LEVEL_WARNING)} warnings')
+        for issue in report.issues:
+            print(f'  {issue}')
+    broken = [report.match for report in reports if not report.ok]
+    print(f'{len(reports) - len(broken)} of {len(reports)} published videos OK'
+          + (f', render matches {broken} again' if broken else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify the published match videos')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('--match', type=int, action='append', default=None, help='Only verify this match, can be repeated')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of videos verified in parallel, default to the number of CPUs')
+    parser.add_argument('--json', type=str, default=None, help='Also write the report to this json file')
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        print(f'ERROR : Root folder passed in [{args.root}] not exists')
+        sys.exit(1)
+    reports = verify_event(args.root, args.match, args.jobs)
+    print_verification(reports)
+    if args.json is not None:
+        with open(args.json, 'w') as file:
+            json.dump([report.to_dict() for report in reports], file, indent=2)
+    if not all(report.ok for report in reports):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    metrics.run('verify', main)
@@ -0,0 +1,250 @@
+"""
+Render worker, any machine with the shared event folder can run one to render the reviewed matches
+
+A worker scans the "Game Matches" folder for matches with the four video manifests and no published video yet,
+claims one with a lease file (see GameProducer.lease), renders it in a local temporary folder, then publishes it
+atomically into "Match Video Published". The lease is renewed while rendering, the match of a crashed worker is
+reclaimed by another one once its lease expired.
+
+Usage: python -m GameProducer.worker path/to/event/root [--name laptop-1] [--once]
+       python -m GameProducer.worker path/to/event/root --local-workers 3 --fake-render 5   (simulate 3 workers)
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import functools
+import multiprocessing
+
+from GameProducer.lease import Lease, default_owner, lease_filename
+from GameProducer.preflight import find_match_manifests
+from GameProducer.profiles import DEFAULT_PROFILE, PROFILES
+from Manifest import files
+from Manifest.layout import FOLDER_PUBLISHED
+from Manifest.loader import ManifestException, load_match_manifest
+from MediaTools import metrics
+from MediaTools.cache import copy_json_cache
+
+POLL_SECONDS = 10
+
+
+def published_filename(root_folder, match):
+    return os.path.join(root_folder, FOLDER_PUBLISHED, f'match{match}.mp4')
+
+
+def is_match_reviewed(manifest):
+    """All the teams of the match have their video and video manifest, same as the Reviewed status of EventPlanner"""
+    try:
+        game = load_match_manifest(manifest, load_videos=False, check_files=False)
+    except ManifestException:
+        return False
+    return len(game.teams) == 4 and all(
+        os.path.isfile(team.video.location) and os.path.isfile(team.video.manifest_file) for team in game.teams)
+
+
+def match_stamp(manifest):
+    """Size and modification time of the match manifest, the video manifests and the videos of a match
+
+    A failed render is tried again once it changes, such as a referee fixing a review or a team uploading again.
+    """
+    filenames = [manifest]
+    try:
+        game = load_match_manifest(manifest, load_videos=False, check_files=False)
+        filenames += [filename for team in game.teams for filename in (team.video.manifest_file, team.video.location)]
+    except ManifestException:
+        pass
+    stamp = []
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+            stamp.append((stat.st_size, stat.st_mtime_ns))
+        except (OSError, TypeError):
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def ready_matches(root_folder):
+    """[(match, manifest)] of the reviewed matches not published yet, in match order"""
+    return [(match, manifest) for match, manifest in sorted(find_match_manifests(root_folder).items())
+            if os.path.isfile(manifest) and not os.path.exists(published_filename(root_folder, match))
+            and is_match_reviewed(manifest)]
+
+
+def publish(local_output, published):
+    """Copy the rendered video next to the published one first, so it only appears once complete"""
+    fd, temp_filename = files.mkstemp(published)
+    os.close(fd)
+    try:
+        shutil.copyfile(local_output, temp_filename)
+        files.replace(temp_filename, published)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+def render_match(manifest, output, profile=DEFAULT_PROFILE):
+    """Render with GameProducer and the encoder profile calibrated for this machine, return True on success
+
+    A render which fails the verification (see GameProducer.verify) is not published, the verification is cached
+    beside the output for its published copy.
+    """
+    # imported here, so a fake render doesn't need numpy and the media tools
+    from GameProducer.__main__ import produce
+    from GameProducer.verify import verify_published
+    # the subtitles are written in the current folder, keep them in the local work folder
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(output))
+    try:
+        if produce(manifest, output, profile=profile) != 0 or not os.path.isfile(output):
+            return False
+    finally:
+        os.chdir(cwd)
+    report = verify_published(output, manifest=manifest)
+    for issue in report.issues:
+        print(f'{issue.level} : render of [{manifest}] {issue.message}')
+    return report.ok
+
+
+def fake_render(seconds):
+    """Render stand-in for the local simulation, wait then write a placeholder video"""
+    def render(manifest, output):
+        time.sleep(seconds)
+        with open(output, 'w') as file:
+            file.write(f'rendered from {manifest}\n')
+        return True
+    return render
+
+
+def render_and_publish(render, match, manifest, published, lease):
+    """Render the match in a local work folder with the lease renewed meanwhile, then publish it, return True on success"""
+    print(f'[{lease.owner}] rendering match #{match}')
+    metrics.event('worker.claimed', match=match, owner=lease.owner)
+    started = time.time()
+    lease.start_heartbeat()
+    work_folder = tempfile.mkdtemp(prefix=f'match{match}-')
+    try:
+        local_output = os.path.join(work_folder, f'match{match}.mp4')
+        try:
+            with metrics.span('worker.render', match=match):
+                rendered = render(manifest, local_output)
+        except (ManifestException, AssertionError, OSError) as ex:
+            print(f'ERROR : [{lease.owner}] cannot render match #{match}, {ex}')
+            rendered = False
+        if not rendered:
+            print(f'ERROR : [{lease.owner}] render of match #{match} failed')
+            return False
+        lease.stop_heartbeat()
+        if not lease.renew():
+            print(f'WARNING : [{lease.owner}] lost the lease of match #{match}, the render is discarded')
+            return False
+        with metrics.span('worker.publish', match=match):
+            publish(local_output, published)
+        # imported here, GameProducer.verify imports this module
+        from GameProducer.verify import CACHE_SUFFIX as VERIFY_CACHE_SUFFIX
+        try:
+            # the published copy has the verification of the render, EventPlanner doesn't decode it again
+            copy_json_cache(local_output, published, VERIFY_CACHE_SUFFIX)
+        except OSError as ex:
+            print(f'WARNING : [{lease.owner}] cannot cache the verification of match #{match}, {ex}')
+        print(f'[{lease.owner}] published match #{match} in {time.time() - started:.1f}s')
+        return True
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+
+class RenderWorker:
+
+    def __init__(self, root_folder, name=None, render=render_match, lease_seconds=None):
+        # absolute, the render runs in its own work folder
+        self.root_folder = os.path.abspath(root_folder)
+        self.name = name if name is not None else default_owner()
+        self.render = render
+        self.lease_options = {} if lease_seconds is None else {'lease_seconds': lease_seconds}
+        # match -> match_stamp of the matches which failed to render, not tried again by this worker until they change
+        self.failed = {}
+
+    def work_once(self):
+        """Try to render each ready match once, return the published matches"""
+        published = []
+        for match, manifest in ready_matches(self.root_folder):
+            stamp = match_stamp(manifest)
+            if self.failed.get(match) == stamp:
+                continue
+            lease = Lease(lease_filename(manifest), self.name, **self.lease_options)
+            if not lease.acquire():
+                continue
+            try:
+                # another worker may have published it between the scan and the claim
+                if os.path.exists(published_filename(self.root_folder, match)):
+                    continue
+                if render_and_publish(self.render, match, manifest, published_filename(self.root_folder, match), lease):
+                    published.append(match)
+                else:
+                    self.failed[match] = stamp
+            finally:
+                lease.release()
+        return published
+
+    def run(self, once=False, poll_seconds=POLL_SECONDS):
+        while True:
+            published = self.work_once()
+            if once and not published and all(match in self.failed for match, _ in ready_matches(self.root_folder)):
+                return
+            if not published:
+                time.sleep(poll_seconds)
+
+
+def run_worker(root_folder, name, once, poll_seconds, fake_seconds, lease_seconds, profile=DEFAULT_PROFILE):
+    render = fake_render(fake_seconds) if fake_seconds is not None else functools.partial(render_match, profile=profile)
+    try:
+        RenderWorker(root_folder, name, render, lease_seconds).run(once, poll_seconds)
+    finally:
+        # a local worker process exits without the atexit handlers
+        metrics.flush()
+
+
+def run_local_worker(index, *args):
+    metrics.start_process(f'worker{index}')
+    run_worker(*args)
+
+
+def run_local_workers(root_folder, count, once, poll_seconds, fake_seconds, lease_seconds, profile=DEFAULT_PROFILE):
+    """Simulate several workers on this machine, one process each"""
+    processes = [multiprocessing.Process(target=run_local_worker, name=f'worker-{i}', args=(
+        i, root_folder, f'{default_owner()}-worker{i}', once, poll_seconds, fake_seconds, lease_seconds, profile))
+        for i in range(count)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render the reviewed matches of the shared event folder, together with the other workers')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('--name', type=str, default=None, help='Name of this worker in the lease files, default to "<host>-<pid>"')
+    parser.add_argument('--once', action='store_true', help='Exit when there is no match left to render instead of waiting for more')
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help='Seconds between two scans of the match folders')
+    parser.add_argument('--lease', type=float, default=None, help='Seconds a lease lasts without heartbeat')
+    parser.add_argument('--local-workers', type=int, default=None, help='Simulate this number of workers on this machine')
+    parser.add_argument('--fake-render', type=float, default=None, help='Replace the render by a wait of this number of seconds, for simulation')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE, help=f'Encoder profile of the renders, default to {DEFAULT_PROFILE}')
+    args = parser.parse_args()
+    if not os.path.isdir(os.path.join(args.root, FOLDER_PUBLISHED)):
+        print(f'ERROR : Folder [{FOLDER_PUBLISHED}] not exists in root folder [{args.root}]')
+        sys.exit(1)
+    if args.local_workers is not None:
+        run_local_workers(args.root, args.local_workers, args.once, args.poll, args.fake_render, args.lease, args.profile)
+    else:
+        run_worker(args.root, args.name, args.once, args.poll, args.fake_render, args.lease, args.profile)
+
+
+if __name__ == '__main__':
+    metrics.run('worker', main)
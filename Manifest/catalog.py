@@ -0,0 +1,234 @@
+"""
+Event-wide catalog of the match manifests and video manifests, an SQLite side-database beside the event root folder
+
+The catalog is refreshed incrementally : the "Game Matches" folders are scanned, and only the manifest files with
+a new size or modification time are parsed again. Questions like "which matches are reviewed?" or "what is the
+average score of a team?" are then a query instead of parsing every yaml file.
+
+Usage: python -m Manifest.catalog path/to/event/root [--reviewed] [--penalties] [--team 16031]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import argparse
+
+from Manifest.layout import FOLDER_MATCH, PATTERN_MATCH_FOLDER
+from Manifest.loader import ManifestException, load_match_manifest, load_video_manifest
+from Manifest.timecode import seconds_to_mmss
+from MediaTools import metrics
+
+PATTERN_MATCH_MANIFEST = re.compile(r'^match([0-9]+)\.yml$', re.IGNORECASE)
+PATTERN_VIDEO_MANIFEST = re.compile(r'^match([0-9]+)-(red|blue)-team([0-9]+)\.yml$', re.IGNORECASE)
+AUTONOMOUS_SECONDS = 30
+# the last 30 seconds of the teleop, after the 8 seconds between the autonomous and the teleop
+END_GAME_SECONDS = 128
+
+KIND_MATCH = 'match'
+KIND_VIDEO = 'video'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, kind TEXT, size INTEGER, mtime_ns INTEGER);
+CREATE TABLE IF NOT EXISTS matches (match INTEGER PRIMARY KEY, path TEXT, name TEXT);
+CREATE TABLE IF NOT EXISTS match_teams (match INTEGER, team_number INTEGER, team_name TEXT, alliance TEXT,
+    location TEXT, video_manifest TEXT);
+CREATE TABLE IF NOT EXISTS videos (path TEXT PRIMARY KEY, match INTEGER, alliance TEXT, team_number INTEGER,
+    game_start_offset INTEGER, score INTEGER);
+CREATE TABLE IF NOT EXISTS events (video_path TEXT, seq INTEGER, seconds INTEGER, description TEXT, point INTEGER);
+CREATE INDEX IF NOT EXISTS match_teams_match ON match_teams (match);
+CREATE INDEX IF NOT EXISTS videos_match ON videos (match, alliance, team_number);
+CREATE INDEX IF NOT EXISTS videos_team ON videos (team_number);
+CREATE INDEX IF NOT EXISTS events_video ON events (video_path);
+'''
+
+
+def match_of_manifest(manifest):
+    """Match number of a match manifest or video manifest file name, None for other files"""
+    name = os.path.basename(manifest)
+    parts = PATTERN_MATCH_MANIFEST.match(name) or PATTERN_VIDEO_MANIFEST.match(name)
+    return int(parts.group(1)) if parts else None
+
+
+def default_catalog_file(root_folder):
+    return f'{os.path.normpath(os.path.abspath(root_folder))}.catalog.db'
+
+
+class Catalog:
+
+    def __init__(self, root_folder, db_file=None):
+        self.root_folder = root_folder
+        self.db_file = db_file if db_file is not None else default_catalog_file(root_folder)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def scan(self):
+        """{path: (kind, size, mtime_ns)} of all the manifest files in the match folders"""
+        manifests = {}
+        matches_folder = os.path.join(self.root_folder, FOLDER_MATCH)
+        if not os.path.isdir(matches_folder):
+            return manifests
+        with os.scandir(matches_folder) as it:
+            match_folders = [entry.path for entry in it if entry.is_dir() and PATTERN_MATCH_FOLDER.match(entry.name)]
+        for match_folder in match_folders:
+            with os.scandir(match_folder) as it:
+                for entry in it:
+                    if not entry.is_file():
+                        continue
+                    if PATTERN_MATCH_MANIFEST.match(entry.name):
+                        kind = KIND_MATCH
+                    elif PATTERN_VIDEO_MANIFEST.match(entry.name):
+                        kind = KIND_VIDEO
+                    else:
+                        continue
+                    stat = entry.stat()
+                    manifests[os.path.normpath(entry.path)] = (kind, stat.st_size, stat.st_mtime_ns)
+        return manifests
+
+    @metrics.timed('catalog.refresh')
+    def refresh(self):
+        """Bring the catalog up to date with the manifest files, return the paths of the updated manifests"""
+        with metrics.timer('catalog.scan'):
+            manifests = self.scan()
+        known = {row['path']: (row['kind'], row['size'], row['mtime_ns']) for row in self.conn.execute('SELECT * FROM files')}
+        updated = [manifest for manifest, stamp in manifests.items() if known.get(manifest) != stamp]
+        removed = [manifest for manifest in known if manifest not in manifests]
+        if not updated and not removed:
+            return []
+        metrics.count('catalog.indexed', len(updated) + len(removed))
+        with self.conn:
+            for manifest in removed:
+                self.forget(manifest)
+            for manifest in updated:
+                self.forget(manifest)
+                kind, size, mtime_ns = manifests[manifest]
+                try:
+                    if kind == KIND_MATCH:
+                        self.index_match_manifest(manifest)
+                    else:
+                        self.index_video_manifest(manifest)
+                except ManifestException as ex:
+                    # not recorded in files, so it's parsed again on the next refresh
+                    print(f'WARNING : cannot index manifest [{manifest}], {ex}')
+                    continue
+                self.conn.execute('INSERT INTO files VALUES (?, ?, ?, ?)', (manifest, kind, size, mtime_ns))
+        return updated + removed
+
+    def forget(self, manifest):
+        self.conn.execute('DELETE FROM files WHERE path = ?', (manifest,))
+        for row in self.conn.execute('SELECT match FROM matches WHERE path = ?', (manifest,)).fetchall():
+            self.conn.execute('DELETE FROM match_teams WHERE match = ?', (row['match'],))
+        self.conn.execute('DELETE FROM matches WHERE path = ?', (manifest,))
+        self.conn.execute('DELETE FROM videos WHERE path = ?', (manifest,))
+        self.conn.execute('DELETE FROM events WHERE video_path = ?', (manifest,))
+
+    def index_match_manifest(self, manifest):
+        # the videos are indexed on their own and may not be recorded yet
+        game = load_match_manifest(manifest, load_videos=False, check_files=False)
+        match = int(PATTERN_MATCH_MANIFEST.match(os.path.basename(manifest)).group(1))
+        self.conn.execute('INSERT OR REPLACE INTO matches VALUES (?, ?, ?)', (match, manifest, game.name))
+        self.conn.execute('DELETE FROM match_teams WHERE match = ?', (match,))
+        self.conn.executemany('INSERT INTO match_teams VALUES (?, ?, ?, ?, ?, ?)', [
+            (match, team.number, team.name, team.alliance, team.video.location, team.video.manifest_file)
+            for team in game.teams])
+
+    def index_video_manifest(self, manifest):
+        video = load_video_manifest(manifest)
+        parts = PATTERN_VIDEO_MANIFEST.match(os.path.basename(manifest))
+        self.conn.execute('INSERT INTO videos VALUES (?, ?, ?, ?, ?, ?)', (
+            manifest, int(parts.group(1)), parts.group(2).capitalize(), int(parts.group(3)),
+            video.game_start_offset, video.score))
+        self.conn.executemany('INSERT INTO events VALUES (?, ?, ?, ?, ?)', [
+            (manifest, seq, event.time, event.description, event.point) for seq, event in enumerate(video.events)])
+
+    @metrics.timed('catalog.query')
+    def video(self, match, alliance, team_number):
+        """The catalog row of a reviewed video (path, game_start_offset, score ...), None if not reviewed"""
+        return self.conn.execute('SELECT * FROM videos WHERE match = ? AND alliance = ? AND team_number = ?',
+                                 (match, alliance.capitalize(), team_number)).fetchone()
+
+    def game_events(self, match, alliance, team_number):
+        """Game events of a reviewed video, in the same format as the video manifest"""
+        rows = self.conn.execute('SELECT events.* FROM events JOIN videos ON events.video_path = videos.path '
+                                 'WHERE match = ? AND alliance = ? AND team_number = ? ORDER BY seq',
+                                 (match, alliance.capitalize(), team_number))
+        return [{'Time': seconds_to_mmss(row['seconds']), 'Description': row['description'],
+                 'Point': row['point']} for row in rows]
+
+    def video_scores(self, match):
+        """[(alliance, team_number, scored, auton, end_game, penalty)] of the reviewed videos of a match
+
+        scored excludes the penalties, penalty is the positive total of the penalties of the team.
+        """
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT alliance, team_number, "
+            "(SELECT COALESCE(SUM(point), 0) FROM events WHERE video_path = videos.path "
+            "AND description NOT LIKE '%Penalty%') AS scored, "
+            "(SELECT COALESCE(SUM(point), 0) FROM events WHERE video_path = videos.path "
+            "AND description NOT LIKE '%Penalty%' AND seconds - videos.game_start_offset < ?) AS auton, "
+            "(SELECT COALESCE(SUM(point), 0) FROM events WHERE video_path = videos.path "
+            "AND description NOT LIKE '%Penalty%' AND seconds - videos.game_start_offset >= ?) AS end_game, "
+            "(SELECT COALESCE(-SUM(point), 0) FROM events WHERE video_path = videos.path "
+            "AND description LIKE '%Penalty%') AS penalty "
+            "FROM videos WHERE match = ?", (AUTONOMOUS_SECONDS, END_GAME_SECONDS, match))]
+
+    def reviewed_matches(self):
+        """Matches with the videos of all the four teams reviewed"""
+        return [row['match'] for row in self.conn.execute(
+            'SELECT match FROM videos GROUP BY match HAVING COUNT(*) = 4 ORDER BY match')]
+
+    def manifests_stamp(self, match):
+        """Newest modification time (ns) of the match manifest and the video manifests of a match"""
+        return self.conn.execute(
+            'SELECT MAX(mtime_ns) FROM files WHERE path IN (SELECT path FROM matches WHERE match = ?) '
+            'OR path IN (SELECT path FROM videos WHERE match = ?)', (match, match)).fetchone()[0]
+
+    def penalty_matches(self):
+        return [row['match'] for row in self.conn.execute(
+            "SELECT DISTINCT match FROM events JOIN videos ON events.video_path = videos.path "
+            "WHERE description LIKE '%Penalty%' ORDER BY match")]
+
+    def team_scores(self, team_number):
+        """[(match, total score, autonomous score)] of the reviewed videos of a team"""
+        return [(row['match'], row['score'], row['auton']) for row in self.conn.execute(
+            'SELECT match, score, (SELECT COALESCE(SUM(point), 0) FROM events WHERE video_path = videos.path '
+            'AND seconds - videos.game_start_offset < ?) AS auton FROM videos WHERE team_number = ? ORDER BY match',
+            (AUTONOMOUS_SECONDS, team_number))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the event-wide catalog of match and video manifests')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('--db', type=str, default=None, help='The catalog database file, default to "<root>.catalog.db"')
+    parser.add_argument('--reviewed', action='store_true', help='List the matches with all the videos reviewed')
+    parser.add_argument('--penalties', action='store_true', help='List the matches with penalties')
+    parser.add_argument('--team', type=int, default=None, help='Show the scores of a team')
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        print(f'ERROR : Root folder passed in [{args.root}] not exists')
+        sys.exit(1)
+    catalog = Catalog(args.root, args.db)
+    print(f'Catalog {catalog.db_file} : {len(catalog.refresh())} manifests updated')
+    if args.reviewed:
+        print(f'Reviewed matches : {catalog.reviewed_matches()}')
+    if args.penalties:
+        print(f'Matches with penalties : {catalog.penalty_matches()}')
+    if args.team is not None:
+        scores = catalog.team_scores(args.team)
+        for match, score, auton in scores:
+            print(f'Team #{args.team} match #{match} : {score} points, {auton} in autonomous')
+        if scores:
+            print(f'Team #{args.team} average : {sum(s[1] for s in scores) / len(scores):.1f} points, '
+                  f'{sum(s[2] for s in scores) / len(scores):.1f} in autonomous')
+    catalog.close()
+
+
+if __name__ == '__main__':
+    metrics.run('catalog', main)
@@ -0,0 +1,82 @@
+"""
+Atomic write of manifest files
+
+The manifest files are read by the other tools, often from a synced folder, while they are written. They are
+written to a temporary file in the same folder first, then renamed over the previous version, so a reader sees
+either the old manifest or the new one, never a partial file.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import stat
+import time
+import tempfile
+from contextlib import contextmanager
+
+import yaml
+
+# TRICKY : on Windows the rename fails while another process (such as the sync client) has the file open
+REPLACE_RETRIES = 10
+REPLACE_RETRY_DELAY = 0.1
+# read once, os.umask can only be read by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def replace(source, destination):
+    for retry in range(REPLACE_RETRIES):
+        try:
+            os.replace(source, destination)
+            return
+        except PermissionError:
+            if retry == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+
+def file_mode(filename):
+    """Permissions of the file written at the filename : the ones of the file replaced, or of a new file"""
+    try:
+        return stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def mkstemp(filename):
+    """(fd, temp filename) of a new temporary file beside the filename, to be renamed over it
+
+    tempfile.mkstemp creates the file readable by its owner only, and the rename keeps it, the other users and render
+    machines of a shared event folder could not read the file anymore.
+    """
+    folder = os.path.dirname(os.path.abspath(filename))
+    fd, temp_filename = tempfile.mkstemp(dir=folder, prefix=f'.{os.path.basename(filename)}.', suffix='.tmp')
+    try:
+        os.chmod(temp_filename, file_mode(filename))
+    except OSError:
+        os.close(fd)
+        os.remove(temp_filename)
+        raise
+    return fd, temp_filename
+
+
+@contextmanager
+def atomic_open(filename, mode='w'):
+    fd, temp_filename = mkstemp(filename)
+    try:
+        with os.fdopen(fd, mode) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+def safe_dump(data, filename):
+    """yaml.safe_dump the data to the file atomically"""
+    with atomic_open(filename) as file:
+        yaml.safe_dump(data, file)
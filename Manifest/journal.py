@@ -0,0 +1,101 @@
+"""
+Append-only journal of the events added to a video manifest while a referee reviews the video
+
+Every event added or deleted in MatchVideoProcessor is appended to "<video>.journal" as one json line, so a crash
+or an accidental reset doesn't lose the review. The journal is discarded once the manifest is saved.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import json
+
+from Manifest.files import atomic_open
+
+JOURNAL_SUFFIX = 'journal'
+GAME_START = 'Game Start'
+
+OP_ADD = 'add'
+OP_DELETE = 'delete'
+OP_RESET = 'reset'
+
+
+class ManifestJournal:
+
+    def __init__(self, video_filename):
+        self.filename = f'{video_filename}.{JOURNAL_SUFFIX}'
+
+    def append(self, op, **fields):
+        fields['op'] = op
+        with open(self.filename, 'a') as file:
+            file.write(json.dumps(fields) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def add_event(self, seconds, description, point):
+        self.append(OP_ADD, seconds=seconds, description=description, point=point)
+
+    def delete_event(self, seconds, description, point):
+        self.append(OP_DELETE, seconds=seconds, description=description, point=point)
+
+    def reset(self):
+        self.append(OP_RESET)
+
+    def rewrite(self, game_start, events):
+        """Replace the journal with the given state, the saved manifest is ignored when it's replayed"""
+        with atomic_open(self.filename) as file:
+            file.write(json.dumps({'op': OP_RESET}) + '\n')
+            if game_start is not None:
+                file.write(json.dumps({'op': OP_ADD, 'seconds': game_start, 'description': GAME_START, 'point': 0}) + '\n')
+            for seconds, description, point in events:
+                file.write(json.dumps({'op': OP_ADD, 'seconds': seconds, 'description': description, 'point': point}) + '\n')
+
+    def discard(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def entries(self):
+        if not os.path.exists(self.filename):
+            return []
+        with open(self.filename) as file:
+            content = file.read()
+        if not content.endswith('\n'):
+            # the last line is partial if the application crashed while writing it, drop it so the next
+            # event isn't appended to it
+            content = content[:content.rfind('\n') + 1]
+            with open(self.filename, 'w') as file:
+                file.write(content)
+        entries = []
+        for line in content.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                print(f'WARNING : ignore invalid line in journal [{self.filename}] : {line}')
+        return entries
+
+    def replay(self, game_start=None, events=None, undo_last_reset=False):
+        """Apply the journal on top of the saved manifest
+
+        :param game_start: game start offset in seconds from the saved manifest, None if not saved yet
+        :param events: [(seconds, description, point)] from the saved manifest
+        :param undo_last_reset: ignore the last reset, to recover from an accidental reset
+        :return: (game start offset, events) once the journal is applied
+        """
+        events = list(events or [])
+        entries = self.entries()
+        resets = [i for i, entry in enumerate(entries) if entry['op'] == OP_RESET]
+        skipped = resets[-1] if undo_last_reset and resets else None
+        for i, entry in enumerate(entries):
+            if entry['op'] == OP_RESET:
+                if i != skipped:
+                    game_start, events = None, []
+            elif entry['op'] == OP_ADD and entry['description'] == GAME_START:
+                game_start = entry['seconds']
+            elif entry['op'] == OP_ADD:
+                events.append((entry['seconds'], entry['description'], entry['point']))
+            elif entry['op'] == OP_DELETE:
+                event = (entry['seconds'], entry['description'], entry['point'])
+                if event in events:
+                    events.remove(event)
+        return game_start, sorted(events, key=lambda event: event[0])
@@ -0,0 +1,21 @@
+"""
+Folder layout of the event root folder, generated by EventPlanner (see EventPlanner.scaffold) and read by the other tools
+
+ - Team Uploads/<team number>-<team name>/Match #<match> <Red|Blue> Alliance : the game videos uploaded by the teams
+ - Game Matches/Match #<match> : the match manifest, the copied game videos and their video manifests
+ - Match Video Published : the match videos rendered by GameProducer
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import re
+
+FOLDER_TEAM = 'Team Uploads'
+FOLDER_MATCH = 'Game Matches'
+FOLDER_PUBLISHED = 'Match Video Published'
+PATTERN_TEAM_FOLDER = re.compile(r'^([0-9]+)-')
+PATTERN_UPLOAD_MATCH_FOLDER = re.compile(r'^Match #([0-9]+) (Red|Blue) Alliance$')
+PATTERN_MATCH_FOLDER = re.compile(r'^Match #([0-9]+)$')
+# the columns of the "quals" table of the score keeper, and their alliance
+POSITIONS = [('red1', 'Red'), ('red2', 'Red'), ('blue1', 'Blue'), ('blue2', 'Blue')]
@@ -0,0 +1,235 @@
+"""
+Validated loader of the match manifest and video manifest files into the Manifest.model records
+
+The yaml file is composed into nodes (with the libyaml C parser when it's installed) and the records are built
+directly from the nodes in a single pass. Every problem found is collected with its file and line, so a referee
+fixing a manifest sees all the mistakes at once instead of one assert at a time.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+
+import yaml
+
+from Manifest.model import ALLIANCES, GameEvent, GameVideo, Team, VirtualGame
+from Manifest.timecode import MAX_START_OFFSET, mmss_to_seconds, seconds_to_mmss
+from MediaTools import metrics
+
+try:
+    Loader = yaml.CSafeLoader
+except AttributeError:
+    Loader = yaml.SafeLoader
+
+TEAMS_PER_ALLIANCE = 2
+
+
+class ManifestError:
+
+    def __init__(self, filename, line, message):
+        self.filename = filename
+        # 1-based, None when the problem is not at a specific line
+        self.line = line
+        self.message = message
+
+    def __str__(self):
+        if self.line is None:
+            return f'{self.filename}: {self.message}'
+        return f'{self.filename}:{self.line}: {self.message}'
+
+
+class ManifestException(Exception):
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.message = '\n'.join(str(error) for error in errors)
+
+    def __str__(self):
+        return self.message
+
+
+class _Validator:
+    """Build the records from the yaml nodes of one file, collecting the errors instead of raising"""
+
+    def __init__(self, filename, errors):
+        self.filename = filename
+        self.errors = errors
+
+    def error(self, node, message):
+        self.errors.append(ManifestError(self.filename, node.start_mark.line + 1 if node is not None else None, message))
+
+    def compose(self):
+        metrics.count('manifest.parse')
+        try:
+            with open(self.filename, 'rb') as file, metrics.timer('manifest.parse'):
+                return yaml.compose(file, Loader=Loader)
+        except OSError as ex:
+            self.error(None, f'cannot read the manifest, {ex.strerror}')
+        except yaml.MarkedYAMLError as ex:
+            mark = ex.problem_mark or ex.context_mark
+            self.errors.append(ManifestError(self.filename, mark.line + 1 if mark else None, f'invalid yaml, {ex.problem}'))
+        except yaml.YAMLError as ex:
+            self.error(None, f'invalid yaml, {ex}')
+        return None
+
+    def mapping(self, node, where, keys):
+        """{key: value node} of a mapping node, None after an error. Missing keys are reported, extra keys ignored"""
+        if not isinstance(node, yaml.MappingNode):
+            self.error(node, f'{where} must be a mapping')
+            return None
+        values = {key.value: value for key, value in node.value if isinstance(key, yaml.ScalarNode)}
+        missing = [key for key in keys if key not in values]
+        for key in missing:
+            self.error(node, f'{where} is missing {key}')
+        return None if missing else values
+
+    def sequence(self, node, where):
+        if isinstance(node, yaml.ScalarNode) and node.tag == 'tag:yaml.org,2002:null':
+            return []
+        if not isinstance(node, yaml.SequenceNode):
+            self.error(node, f'{where} must be a list')
+            return None
+        return node.value
+
+    def scalar(self, node, where):
+        if not isinstance(node, yaml.ScalarNode) or node.tag == 'tag:yaml.org,2002:null':
+            self.error(node, f'{where} must be a value')
+            return None
+        return node.value
+
+    def integer(self, node, where):
+        value = self.scalar(node, where)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            self.error(node, f'{where} must be an integer, got [{value}]')
+            return None
+
+    def time(self, node, where):
+        # the raw text of the node, so there is no sexagesimal integer to guess about
+        value = self.scalar(node, where)
+        if value is None:
+            return None
+        try:
+            return mmss_to_seconds(value)
+        except ValueError:
+            self.error(node, f'{where} must be in "MM:SS" or "MM:SS.mmm" format, got [{value}]')
+            return None
+
+    def path(self, node, where, check_files):
+        """Absolute path of a file, the same lookup as GameProducer always did
+
+        A relative path is taken from the working directory if the file is there, otherwise from the manifest folder.
+        """
+        value = self.scalar(node, where)
+        if value is None:
+            return None
+        if os.path.isabs(value):
+            pass
+        elif os.path.isfile(value):
+            value = os.path.normpath(os.path.abspath(value))
+        else:
+            value = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(self.filename)), value))
+        if check_files and not os.path.isfile(value):
+            self.error(node, f'{where} [{value}] not exists')
+        return value
+
+    def video_manifest(self, node, video):
+        values = self.mapping(node, 'Video manifest', ['GameStartOffset', 'GameEvents'])
+        if values is None:
+            return video
+        video.game_start_offset = self.time(values['GameStartOffset'], 'GameStartOffset')
+        if video.game_start_offset is not None and video.game_start_offset >= MAX_START_OFFSET:
+            self.error(values['GameStartOffset'], f'GameStartOffset {seconds_to_mmss(video.game_start_offset)} '
+                                                  f'is later than {seconds_to_mmss(MAX_START_OFFSET)}')
+        events = self.sequence(values['GameEvents'], 'GameEvents')
+        previous = None
+        for event_node in events or []:
+            event_values = self.mapping(event_node, 'Game event', ['Time', 'Description', 'Point'])
+            if event_values is None:
+                continue
+            event = GameEvent(self.time(event_values['Time'], 'Time'),
+                              self.scalar(event_values['Description'], 'Description'),
+                              self.integer(event_values['Point'], 'Point'))
+            if event.time is not None:
+                if video.game_start_offset is not None and event.time < video.game_start_offset:
+                    self.error(event_node, f'Game event [{event.description}] is before the game start')
+                if previous is not None and event.time < previous:
+                    self.error(event_node, f'Game event [{event.description}] is out of time order')
+                previous = event.time
+            video.events.append(event)
+        return video
+
+    def match_manifest(self, node, check_files):
+        values = self.mapping(node, 'Match manifest', ['VirtualGame'])
+        if values is None:
+            return None
+        game_values = self.mapping(values['VirtualGame'], 'VirtualGame', ['Name', 'Teams'])
+        if game_values is None:
+            return None
+        game = VirtualGame(self.scalar(game_values['Name'], 'Name'), [], self.filename)
+        team_nodes = self.sequence(game_values['Teams'], 'Teams') or []
+        for team_node in team_nodes:
+            team_values = self.mapping(team_node, 'Team', ['TeamName', 'TeamNumber', 'Alliance', 'GameVideo'])
+            if team_values is None:
+                continue
+            alliance = self.scalar(team_values['Alliance'], 'Alliance')
+            if alliance is not None and alliance not in ALLIANCES:
+                self.error(team_values['Alliance'], f'Alliance must be one of {ALLIANCES}, got [{alliance}]')
+            video = GameVideo()
+            video_values = self.mapping(team_values['GameVideo'], 'GameVideo', ['Location', 'VideoManifest'])
+            if video_values is not None:
+                video.location = self.path(video_values['Location'], 'Location', check_files)
+                video.manifest_file = self.path(video_values['VideoManifest'], 'VideoManifest', check_files)
+            game.teams.append(Team(self.scalar(team_values['TeamName'], 'TeamName'),
+                                   self.integer(team_values['TeamNumber'], 'TeamNumber'), alliance, video))
+        for alliance in ALLIANCES:
+            count = len(game.alliance(alliance))
+            if count != TEAMS_PER_ALLIANCE:
+                self.error(values['VirtualGame'], f'{alliance} alliance must have {TEAMS_PER_ALLIANCE} teams, got {count}')
+        return game
+
+
+def _raise_errors(errors):
+    if errors:
+        raise ManifestException(errors)
+
+
+def load_video_manifest(filename, video=None, errors=None):
+    """GameVideo with the game start offset and the game events of a video manifest file
+
+    Raise ManifestException with all the problems found, unless an errors list is given to collect them into.
+    """
+    collect = errors is not None
+    errors = errors if collect else []
+    video = video if video is not None else GameVideo(manifest_file=filename)
+    validator = _Validator(filename, errors)
+    node = validator.compose()
+    if node is not None:
+        validator.video_manifest(node, video)
+    if not collect:
+        _raise_errors(errors)
+    return video
+
+
+def load_match_manifest(filename, load_videos=True, check_files=True, errors=None):
+    """VirtualGame of a match manifest file, with the video manifests of the teams loaded too by default
+
+    Raise ManifestException with all the problems found in all the files, unless an errors list is given to collect
+    them into.
+    """
+    collect = errors is not None
+    errors = errors if collect else []
+    validator = _Validator(filename, errors)
+    node = validator.compose()
+    game = validator.match_manifest(node, check_files) if node is not None else None
+    if game is not None and load_videos:
+        for team in game.teams:
+            if team.video.manifest_file is not None and os.path.isfile(team.video.manifest_file):
+                load_video_manifest(team.video.manifest_file, team.video, errors)
+    if not collect:
+        _raise_errors(errors)
+    return game
@@ -0,0 +1,91 @@
+"""
+Records of the match manifest and video manifest files
+
+The records use __slots__, an event-wide scan keeps thousands of GameEvent in memory.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+from Manifest.timecode import seconds_to_mmss
+
+ALLIANCES = ['Red', 'Blue']
+
+
+class GameEvent:
+    __slots__ = ('time', 'description', 'point')
+
+    def __init__(self, time, description, point):
+        # seconds in the game video
+        self.time = time
+        self.description = description
+        self.point = point
+
+    def to_dict(self):
+        return {'Time': seconds_to_mmss(self.time, milliseconds=True), 'Description': self.description, 'Point': self.point}
+
+    def __repr__(self):
+        return f'GameEvent({seconds_to_mmss(self.time)}, {self.description!r}, {self.point})'
+
+
+class GameVideo:
+    """The game video of a team, with the content of its video manifest once it's loaded
+
+    play_start_offset, seek_plan, audio_gain, subtitle_file and overlay_file are only used by GameProducer while
+    rendering.
+    """
+    __slots__ = ('location', 'manifest_file', 'game_start_offset', 'events',
+                 'play_start_offset', 'seek_plan', 'audio_gain', 'subtitle_file', 'overlay_file')
+
+    def __init__(self, location=None, manifest_file=None, game_start_offset=None, events=None):
+        self.location = location
+        self.manifest_file = manifest_file
+        # seconds in the game video, refined by GameProducer to a fraction of second
+        self.game_start_offset = game_start_offset
+        self.events = events if events is not None else []
+        self.play_start_offset = None
+        self.seek_plan = None
+        self.audio_gain = None
+        self.subtitle_file = None
+        self.overlay_file = None
+
+    @property
+    def score(self):
+        return sum(event.point for event in self.events)
+
+    def video_manifest_dict(self):
+        """Content of the video manifest file"""
+        return {'GameStartOffset': seconds_to_mmss(self.game_start_offset, milliseconds=True), 'GameEvents': [event.to_dict() for event in self.events]}
+
+
+class Team:
+    __slots__ = ('name', 'number', 'alliance', 'video')
+
+    def __init__(self, name, number, alliance, video):
+        self.name = name
+        self.number = number
+        self.alliance = alliance
+        self.video = video
+
+    def to_dict(self):
+        return {'TeamName': self.name, 'TeamNumber': self.number, 'Alliance': self.alliance,
+                'GameVideo': {'Location': self.video.location, 'VideoManifest': self.video.manifest_file}}
+
+    def __repr__(self):
+        return f'Team(#{self.number}, {self.name!r}, {self.alliance})'
+
+
+class VirtualGame:
+    __slots__ = ('name', 'teams', 'manifest_file')
+
+    def __init__(self, name, teams, manifest_file=None):
+        self.name = name
+        self.teams = teams
+        self.manifest_file = manifest_file
+
+    def alliance(self, alliance):
+        return [team for team in self.teams if team.alliance == alliance]
+
+    def to_dict(self):
+        """Content of the match manifest file"""
+        return {'VirtualGame': {'Name': self.name, 'Teams': [team.to_dict() for team in self.teams]}}
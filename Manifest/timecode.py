@@ -0,0 +1,42 @@
+"""
+"MM:SS" time codes used in the manifest files, "MM:SS.mmm" for the events timed to the millisecond, and the timing
+of a game in the videos
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import re
+
+PATTERN_MMSS = re.compile(r'^([0-9]+):([0-9]+)(\.[0-9]{1,3})?$')
+# 30 seconds autonomous, 8 seconds transition, 2 minutes teleop
+GAME_SECONDS = 158
+# the subtitles of GameProducer are timed up to an hour, a later game start is surely a typo
+MAX_START_OFFSET = 1000
+
+
+def mmss_to_seconds(mmss):
+    """Seconds of a "MM:SS" time code, a float for a "MM:SS.mmm" one
+
+    Manifests loaded by Manifest.loader always give the raw text, but a plain yaml.load turns some "MM:SS" into
+    sexagesimal integers (1:05 becomes 65, 0:59 stays a string), so integers are taken as seconds already.
+    """
+    if isinstance(mmss, int):
+        return mmss
+    parts = PATTERN_MMSS.match(str(mmss).strip())
+    if parts is None:
+        raise ValueError(f'Time must be in "MM:SS" format, got [{mmss}]')
+    seconds = int(parts.group(1)) * 60 + int(parts.group(2))
+    if parts.group(3) is not None:
+        return round(seconds + float(parts.group(3)), 3)
+    return seconds
+
+
+def seconds_to_mmss(seconds, milliseconds=False):
+    """"MM:SS" time code, with the milliseconds if asked and the time is not a whole second"""
+    if milliseconds:
+        seconds, fraction = divmod(round(seconds * 1000), 1000)
+        minutes, seconds = divmod(int(seconds), 60)
+        return f'{minutes:02}:{seconds:02}.{int(fraction):03}' if fraction else f'{minutes:02}:{seconds:02}'
+    minutes, seconds = divmod(int(seconds), 60)
+    return f'{minutes:02}:{seconds:02}'
@@ -9,34 +9,34 @@ Date: 25 Jan 2021
 import platform
 import os
 import sys
-import re
-import yaml
 from os import path
 
 from PySide2 import QtWidgets, QtGui, QtCore
 import vlc
 
+from MediaTools import metrics
+from MediaTools.background import BackgroundJobs
+from MediaTools.cache import read_ahead
+from MediaTools.candidates import STATUS_ACCEPTED, STATUS_PENDING, STATUS_REJECTED, analyse, set_status
+from MediaTools.ffmpeg import FFmpegException
+from MediaTools.filmstrip import Filmstrip, extract_filmstrip, load_filmstrip
+from MediaTools.keyframes import load_keyframe_index
+from MediaTools.proxy import generate_proxy, proxy_for
+from Manifest import files
+from Manifest.journal import ManifestJournal
+from Manifest.loader import ManifestException, load_video_manifest
+from Manifest.model import GameEvent, GameVideo
+from Manifest.timecode import mmss_to_seconds, seconds_to_mmss
+from MatchVideoProcesser.review_queue import ReviewQueue
+from MatchVideoProcesser.phases import GamePhaseMachine, TAB_AUTONOMOUS, TAB_TELEOP, TAB_END_GAME
 
-def ms_to_mmss(ms):
-    return seconds_to_mmss(int(ms/1000))
-
-
-def seconds_to_mmss(time):
-    minutes, seconds = divmod(time, 60)
-    return f'{minutes:02}:{seconds:02}'
 
+# a suggested event is replayed from a little before, to see what happened
+CANDIDATE_PREROLL_SECONDS = 2
 
-offset_pattern = re.compile(r'^([0-9]+):([0-9]+)$')
 
-
-def mmss_to_seconds(mmss):
-    if type(mmss) == str:
-        offset_parts = offset_pattern.match(mmss)
-        assert offset_parts is not None, 'Game event timestamp must be in "MM:SS" format'
-        return int(offset_parts.group(1)) * 60 + int(offset_parts.group(2))
-    else:
-        print(f'ERROR : cannot process mmss [{mmss}]')
-        return mmss
+def ms_to_mmss(ms):
+    return seconds_to_mmss(int(ms/1000))
 
 
 class InvalidEventException(Exception):
@@ -44,9 +44,27 @@ class InvalidEventException(Exception):
         self.message = message
 
 
+class PlayerEvents(QtCore.QObject):
+    """libVLC calls the event callbacks from its own thread, the signals bring them to the Qt thread"""
+    time_changed = QtCore.Signal(int)
+    length_changed = QtCore.Signal(int)
+    state_changed = QtCore.Signal()
+    end_reached = QtCore.Signal()
+
+    def attach(self, mediaplayer):
+        event_manager = mediaplayer.event_manager()
+        event_manager.event_attach(vlc.EventType.MediaPlayerTimeChanged, lambda event: self.time_changed.emit(event.u.new_time))
+        event_manager.event_attach(vlc.EventType.MediaPlayerLengthChanged, lambda event: self.length_changed.emit(event.u.new_length))
+        event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, lambda event: self.end_reached.emit())
+        for event_type in [vlc.EventType.MediaPlayerPlaying, vlc.EventType.MediaPlayerPaused, vlc.EventType.MediaPlayerStopped]:
+            event_manager.event_attach(event_type, lambda event: self.state_changed.emit())
+
+
 class MatchVideoProcessor(QtWidgets.QMainWindow):
 
     game_start_offset = None
+    # the candidate events are detected in background, the signal brings them to the Qt thread
+    candidates_ready = QtCore.Signal(str, object)
 
     def __init__(self, media_file=None, master=None):
         QtWidgets.QMainWindow.__init__(self, master)
@@ -57,11 +75,35 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
         self.instance = vlc.Instance()
 
         self.media = None
+        self.media_filename = None
+        self.playback_filename = None
+        self.keyframe_index = None
+        self.filmstrip = None
+        self.filmstrips = {}
+        self.media_jobs = BackgroundJobs()
+        # reading ahead the next video shouldn't wait for the thumbnails and proxies
+        self.prefetch_jobs = BackgroundJobs('prefetch-jobs')
+        self.review_queue = None
+        self.prefetched = None
+        self.journal = None
 
         # Create an empty vlc media player
         self.mediaplayer = self.instance.media_player_new()
+        self.media_length = 0
+        self.progress_text = None
+
+        # the user interface is driven by the player events, and the phase machine only touches the events tabs
+        # when the game phase changes
+        self.phase_machine = GamePhaseMachine(self.enter_phase)
+        self.player_events = PlayerEvents(self)
+        self.player_events.time_changed.connect(self.update_ui)
+        self.player_events.length_changed.connect(self.set_length)
+        self.player_events.state_changed.connect(self.update_play_button)
+        self.player_events.end_reached.connect(self.update_play_button)
+        self.player_events.attach(self.mediaplayer)
 
         self.create_ui()
+        self.candidates_ready.connect(self.show_candidates)
 
         self.is_paused = False
 
@@ -113,13 +155,25 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
         self.positionslider = QtWidgets.QSlider(QtCore.Qt.Horizontal, self)
         self.positionslider.setToolTip("Position")
         self.positionslider.setMaximum(1000)
-        self.positionslider.sliderMoved.connect(self.set_position)
-        self.positionslider.sliderPressed.connect(self.set_position)
+        self.positionslider.sliderMoved.connect(self.scrub_position)
+        self.positionslider.sliderPressed.connect(self.scrub_position)
+        self.positionslider.sliderReleased.connect(self.set_position)
+        # thumbnail shown above the slider while scrubbing, as a tooltip window so it stays above the video
+        self.scrubpreview = QtWidgets.QLabel(self, QtCore.Qt.ToolTip)
+        self.scrubpreview.hide()
 
         self.hbuttonbox = QtWidgets.QHBoxLayout()
         self.playbutton = QtWidgets.QPushButton("Play")
         self.hbuttonbox.addWidget(self.playbutton)
         self.playbutton.clicked.connect(self.play_pause)
+        self.nextframebutton = QtWidgets.QPushButton("Next Frame")
+        self.hbuttonbox.addWidget(self.nextframebutton)
+        self.nextframebutton.clicked.connect(self.next_frame)
+        self.ratebox = QtWidgets.QComboBox()
+        self.ratebox.addItems(self.PLAYBACK_RATES)
+        self.ratebox.setCurrentText('1x')
+        self.hbuttonbox.addWidget(self.ratebox)
+        self.ratebox.currentTextChanged.connect(self.set_rate)
 
         self.hbuttonbox.addStretch(1)
         self.progress = QtWidgets.QLabel("--:--")
@@ -131,6 +185,8 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
         self.resetbutton = QtWidgets.QPushButton("Reset")
         self.hbuttonbox.addWidget(self.resetbutton)
         self.resetbutton.clicked.connect(self.reset_button_clicked)
+        self.queuelabel = QtWidgets.QLabel()
+        self.hbuttonbox.addWidget(self.queuelabel)
         self.savebutton = QtWidgets.QPushButton("Save Video Manifest")
         self.hbuttonbox.addWidget(self.savebutton)
         self.savebutton.clicked.connect(self.save_manifest)
@@ -244,6 +300,22 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
         header.setSectionResizeMode(2, QtWidgets.QHeaderView.ResizeToContents)
         self.htablebox.addWidget(self.eventstable, stretch=4)
 
+        # events suggested by MediaTools.candidates, accepted with the event selected in the tabs
+        candidatesbox = QtWidgets.QVBoxLayout()
+        candidatesbox.addWidget(QtWidgets.QLabel("Suggested Events"))
+        self.candidateslist = QtWidgets.QListWidget()
+        self.candidateslist.itemClicked.connect(self.preview_candidate)
+        candidatesbox.addWidget(self.candidateslist)
+        candidatesbuttonbox = QtWidgets.QHBoxLayout()
+        self.acceptcandidatebutton = QtWidgets.QPushButton("Accept")
+        self.acceptcandidatebutton.clicked.connect(self.accept_candidate)
+        candidatesbuttonbox.addWidget(self.acceptcandidatebutton)
+        self.rejectcandidatebutton = QtWidgets.QPushButton("Reject")
+        self.rejectcandidatebutton.clicked.connect(self.reject_candidate)
+        candidatesbuttonbox.addWidget(self.rejectcandidatebutton)
+        candidatesbox.addLayout(candidatesbuttonbox)
+        self.htablebox.addLayout(candidatesbox, stretch=2)
+
         self.vboxlayout = QtWidgets.QVBoxLayout()
         self.vboxlayout.addWidget(self.videoframe, stretch=10)
         self.vboxlayout.addWidget(self.positionslider)
@@ -259,17 +331,26 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
 
         # Add actions to file menu
         open_action = QtWidgets.QAction("Load Video", self)
+        queue_action = QtWidgets.QAction("Open Review Queue", self)
+        skip_action = QtWidgets.QAction("Skip to Next Video in Queue", self)
+        undo_reset_action = QtWidgets.QAction("Undo Reset", self)
+        self.proxy_action = QtWidgets.QAction("Play Low Resolution Proxy", self)
+        self.proxy_action.setCheckable(True)
+        self.proxy_action.setChecked(True)
         close_action = QtWidgets.QAction("Close App", self)
         file_menu.addAction(open_action)
+        file_menu.addAction(queue_action)
+        file_menu.addAction(skip_action)
+        file_menu.addAction(undo_reset_action)
+        file_menu.addAction(self.proxy_action)
         file_menu.addAction(close_action)
 
         open_action.triggered.connect(self.open_file)
+        queue_action.triggered.connect(self.open_review_queue)
+        skip_action.triggered.connect(self.next_in_queue)
+        undo_reset_action.triggered.connect(self.undo_reset)
         close_action.triggered.connect(sys.exit)
 
-        self.timer = QtCore.QTimer(self)
-        self.timer.setInterval(100)
-        self.timer.timeout.connect(self.update_ui)
-
         self.reset()
 
     def play_pause(self):
@@ -279,17 +360,24 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
             self.mediaplayer.pause()
             self.playbutton.setText("Play")
             self.is_paused = True
-            self.timer.stop()
         else:
+            if self.mediaplayer.get_state() == vlc.State.Ended:
+                # an ended player has to be stopped before playing again
+                self.mediaplayer.stop()
             if self.mediaplayer.play() == -1:
                 self.open_file()
                 return
 
             self.mediaplayer.play()
             self.playbutton.setText("Pause")
-            self.timer.start()
             self.is_paused = False
 
+    def update_play_button(self):
+        """Follow the state of the player, it might be paused or ended without the play button"""
+        playing = self.mediaplayer.get_state() in [vlc.State.Opening, vlc.State.Buffering, vlc.State.Playing]
+        self.playbutton.setText("Pause" if playing else "Play")
+        self.is_paused = not playing
+
     def reset_button_clicked(self):
         msg_box = QtWidgets.QMessageBox()
         msg_box.setIcon(QtWidgets.QMessageBox.Warning)
@@ -299,14 +387,31 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
         msg_box.setStandardButtons(QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         return_value = msg_box.exec()
         if return_value == QtWidgets.QMessageBox.Yes:
+            if self.journal is not None:
+                # the events stay in the journal, the reset can be undone
+                self.journal.reset()
             self.reset()
 
+    def undo_reset(self):
+        if self.journal is None or self.media_filename is None:
+            return
+        game_start, events = self.read_manifest_file(self.get_manifest_filename_from_video(self.media_filename))
+        game_start, events = self.journal.replay(game_start, events, undo_last_reset=True)
+        self.journal.rewrite(game_start, events)
+        self.show_events(game_start, events)
+
     def reset(self):
         """Reset
         """
         self.mediaplayer.stop()
         self.playbutton.setText("Play")
         self.progress.setText("--:--")
+        self.progress_text = None
+        self.media_length = 0
+        self.candidateslist.clear()
+        self.clear_events()
+
+    def clear_events(self):
         for row_no in range (self.eventstable.rowCount()):
             self.eventstable.removeRow(0)
         self.eventstable.insertRow(0)
@@ -320,15 +425,23 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
         self.eventstabs.setTabEnabled(4, False)
         self.eventstabs.setCurrentIndex(0)
         self.game_start_offset = None
+        self.phase_machine.reset()
         self.savebutton.setEnabled(False)
 
     def get_manifest_filename_from_video(self, video_filename):
         pre, _ = os.path.splitext(video_filename)
         return f'{pre}.yml'
 
+    @metrics.traced('mvp.save_manifest')
     def save_manifest(self):
-        manifest_filename, _ = QtWidgets.QFileDialog.getSaveFileName(caption="Match Manifest File", dir=self.get_manifest_filename_from_video(self.media_filename))
-        manifest = {'GameStartOffset': seconds_to_mmss(self.game_start_offset), 'GameEvents': []}
+        if self.review_queue is not None:
+            # the review queue relies on the default manifest file name
+            manifest_filename = self.get_manifest_filename_from_video(self.media_filename)
+        else:
+            manifest_filename, _ = QtWidgets.QFileDialog.getSaveFileName(caption="Match Manifest File", dir=self.get_manifest_filename_from_video(self.media_filename))
+            if not manifest_filename:
+                return
+        video = GameVideo(self.media_filename, manifest_filename, self.game_start_offset)
         for row_no in range(self.eventstable.rowCount()):
             row_name = self.eventstable.verticalHeaderItem(row_no).text()
             if row_name != 'Total':
@@ -337,14 +450,17 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
                 point = int(self.eventstable.item(row_no, 1).text())
                 if event_description != 'Game Start':
                     # ignore game start row as well
-                    event = {'Time': row_name, 'Description': event_description, 'Point': point}
-                    manifest['GameEvents'].append(event)
-        stream = open(manifest_filename, 'w')
-        yaml.safe_dump(manifest, stream)
+                    video.events.append(GameEvent(mmss_to_seconds(row_name), event_description, point))
+        files.safe_dump(video.video_manifest_dict(), manifest_filename)
+        # the review is safe in the manifest now
+        self.journal.discard()
+        if self.review_queue is not None:
+            self.next_in_queue()
         return
 
     def game_start_event(self, radiobutton, timestamp, associated_widgets):
         self.game_start_offset = timestamp
+        self.phase_machine.reset()
         self.eventstabs.setTabEnabled(0, False)
         self.eventstabs.setTabEnabled(1, True)
         self.eventstabs.setTabEnabled(2, False)
@@ -413,23 +529,30 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
     def add_event(self):
         """ Add the event
         """
+        # to the millisecond, the events of the four videos of a match are compared with each other
+        self.add_event_at(round(self.mediaplayer.get_time() / 1000, 3))
+
+    def add_event_at(self, timestamp):
+        """Add the event selected at the time in seconds, return whether it's added"""
         # check if there is a event selected
         current_tab = self.eventstabs.currentIndex()
         for event in self.events[current_tab]:
             if event['radio_button'].isChecked():
-                timestamp = int(self.mediaplayer.get_time() / 1000)
                 try:
                     event_text, point, seconds = event['handler'](event['radio_button'], timestamp, event['associated_widgets'])
                 except InvalidEventException as ex:
                     msgBox = QtWidgets.QMessageBox()
                     msgBox.setText(ex.message)
                     msgBox.exec_()
-                    return
+                    return False
                 self.update_events_table(seconds, event_text, point)
-                return
+                if self.journal is not None:
+                    self.journal.add_event(seconds, event_text, point)
+                return True
         msgBox = QtWidgets.QMessageBox()
         msgBox.setText("Please select an event to add !")
         msgBox.exec_()
+        return False
 
     def update_events_table(self, seconds, event, point):
         target_row_no = None
@@ -453,7 +576,7 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
             self.eventstable.insertRow(target_row_no)
         # update target row
         self.eventstable.setVerticalHeaderItem(target_row_no,
-                                               QtWidgets.QTableWidgetItem(seconds_to_mmss(seconds)))
+                                               QtWidgets.QTableWidgetItem(seconds_to_mmss(seconds, milliseconds=True)))
         self.eventstable.setItem(target_row_no, 0, QtWidgets.QTableWidgetItem(event))
         self.eventstable.setItem(target_row_no, 1, QtWidgets.QTableWidgetItem(str(point)))
         if event != 'Game Start':
@@ -480,6 +603,10 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
 
     def delete_button_click(self):
         delete_row_no = self.eventstable.indexAt(self.sender().pos()).row()
+        if self.journal is not None:
+            self.journal.delete_event(mmss_to_seconds(self.eventstable.verticalHeaderItem(delete_row_no).text()),
+                                      self.eventstable.item(delete_row_no, 0).text(),
+                                      int(self.eventstable.item(delete_row_no, 1).text()))
         self.eventstable.removeRow(delete_row_no)
         self.calculate_total()
 
@@ -493,23 +620,105 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
             return
 
         # getOpenFileName returns a tuple, so use only the actual file name
+        self.review_queue = None
+        self.queuelabel.setText('')
         self.open_media_file(filename[0])
 
+    def open_review_queue(self):
+        """Review all the match videos without video manifest one after the other"""
+        dialog_txt = "Choose the root folder of game files"
+        folder = QtWidgets.QFileDialog.getExistingDirectory(self, dialog_txt, os.path.curdir)
+        if not folder or not os.path.isdir(folder):
+            return
+        self.start_review_queue(folder)
+
+    def start_review_queue(self, folder):
+        self.review_queue = ReviewQueue(folder)
+        self.next_in_queue()
+
+    def next_in_queue(self):
+        if self.review_queue is None:
+            return
+        filename = self.review_queue.next(self.media_filename)
+        if filename is None:
+            self.queuelabel.setText('Queue: all reviewed')
+            msgBox = QtWidgets.QMessageBox()
+            msgBox.setText("All the match videos in the review queue have been reviewed!")
+            msgBox.exec_()
+            return
+        self.open_media_file(filename)
+        pending = self.review_queue.pending()
+        self.queuelabel.setText(f'Queue: {len(pending)} to review')
+        self.prefetch(self.review_queue.next(filename))
+
+    def playback_filename_for(self, filename):
+        """The low resolution proxy if there is one and it's enabled, otherwise the video itself"""
+        playback_filename = proxy_for(filename) if self.proxy_action.isChecked() else None
+        return playback_filename if playback_filename is not None else filename
+
+    def filmstrip_for(self, filename, urgent):
+        filmstrip = self.filmstrips.get(filename) or load_filmstrip(filename)
+        if filmstrip is None:
+            filmstrip = Filmstrip()
+            self.media_jobs.submit(('filmstrip', filename), extract_filmstrip, filename, filmstrip, urgent=urgent)
+        self.filmstrips[filename] = filmstrip
+        return filmstrip
+
+    def prefetch(self, filename):
+        """Parse and buffer the next video in the queue while the current one is reviewed"""
+        self.prefetched = None
+        # only keep the thumbnails of the current and the next video in memory
+        self.filmstrips = {key: value for key, value in self.filmstrips.items() if key in [self.media_filename, filename]}
+        if filename is None or filename == self.media_filename:
+            return
+        playback_filename = self.playback_filename_for(filename)
+        self.prefetch_jobs.submit(('read_ahead', playback_filename), read_ahead, playback_filename)
+        media = self.instance.media_new(playback_filename)
+        # parse asynchronously, libVLC doesn't block the UI thread
+        media.parse_with_options(vlc.MediaParseFlag.local, 0)
+        self.prefetched = (filename, playback_filename, media)
+        self.filmstrip_for(filename, urgent=False)
+        self.media_jobs.submit(('keyframes', playback_filename), self.load_keyframe_index, playback_filename)
+
+    @metrics.traced('mvp.open_media', 'manifest.parse')
     def open_media_file(self, filename):
 
         self.reset()
 
+        # TRICKY : play the low resolution proxy if there is one, but the manifest and timestamps always refer to
+        # the original video, the proxy has the same timestamps
         self.media_filename = filename
-        self.media = self.instance.media_new(filename)
+        playback_filename = self.playback_filename_for(filename)
+        if playback_filename == filename and self.proxy_action.isChecked():
+            # played the next time, a full transcode so not while the proxies are off
+            self.media_jobs.submit(('proxy', filename), generate_proxy, filename)
+        self.playback_filename = playback_filename
+        prefetched_media = None
+        if self.prefetched is not None and self.prefetched[:2] == (filename, playback_filename):
+            prefetched_media = self.prefetched[2]
+        self.prefetched = None
+        self.media = prefetched_media if prefetched_media is not None else self.instance.media_new(playback_filename)
+
+        # prepare the thumbnails and the keyframes in background for the scrubbing, the thumbnails are
+        # available as soon as they are extracted
+        self.keyframe_index = None
+        self.filmstrip = self.filmstrip_for(filename, urgent=True)
+        self.media_jobs.submit(('keyframes', playback_filename), self.load_keyframe_index, playback_filename, urgent=True)
 
         # Put the media in the media player
         self.mediaplayer.set_media(self.media)
 
-        # Parse the metadata of the file
-        self.media.parse()
+        # Parse the metadata of the file, unless it has been prefetched
+        if prefetched_media is None:
+            self.media.parse()
 
         # Set the title of the track as window title
-        self.setWindowTitle("Match Video Processor - " + self.media.get_meta(0))
+        if playback_filename == filename and self.media.get_meta(0):
+            self.setWindowTitle("Match Video Processor - " + self.media.get_meta(0))
+        elif playback_filename == filename:
+            self.setWindowTitle("Match Video Processor - " + os.path.basename(filename))
+        else:
+            self.setWindowTitle("Match Video Processor - " + os.path.basename(filename) + " (proxy)")
 
         # The media player has to be 'connected' to the QFrame (otherwise the
         # video would be displayed in it's own window). This is platform
@@ -522,23 +731,111 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
         elif platform.system() == "Darwin": # for MacOS
             self.mediaplayer.set_nsobject(int(self.videoframe.winId()))
 
-        # try to load the video manifest with the same name as well
-        video_manifest_filename = self.get_manifest_filename_from_video(self.media_filename)
-        if os.path.exists(video_manifest_filename):
-            self.load_manifest_file(video_manifest_filename)
+        # try to load the video manifest with the same name as well, and recover the unsaved events from the journal
+        game_start, events = self.read_manifest_file(self.get_manifest_filename_from_video(self.media_filename))
+        self.journal = ManifestJournal(self.media_filename)
+        journal_entries = self.journal.entries()
+        if journal_entries:
+            msg_box = QtWidgets.QMessageBox()
+            msg_box.setIcon(QtWidgets.QMessageBox.Warning)
+            msg_box.setText(f'Found {len(journal_entries)} unsaved changes of this video from a previous review, do you want to recover them?')
+            msg_box.setWindowTitle("Recover unsaved review?")
+            msg_box.setStandardButtons(QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+            if msg_box.exec() == QtWidgets.QMessageBox.Yes:
+                game_start, events = self.journal.replay(game_start, events)
+            else:
+                self.journal.discard()
+        self.show_events(game_start, events)
+        self.media_jobs.submit(('candidates', filename), self.detect_candidates, filename, self.game_start_offset)
 
         self.play_pause()
 
-    def load_manifest_file(self, video_manifest_filename):
-        with open(video_manifest_filename) as file:
-            video_manifest = yaml.load(file, Loader=yaml.SafeLoader)
-            event_text, point, seconds = self.game_start_event(self.game_start_radiobutton, mmss_to_seconds(video_manifest['GameStartOffset']), {})
+    def read_manifest_file(self, video_manifest_filename):
+        """Read the game start offset and the [(seconds, description, point)] events of the video manifest"""
+        if not os.path.exists(video_manifest_filename):
+            return None, []
+        try:
+            video = load_video_manifest(video_manifest_filename)
+        except ManifestException as ex:
+            print(f'ERROR : invalid video manifest\n{ex}')
+            QtWidgets.QMessageBox.warning(self, 'Invalid video manifest', f'The video manifest is ignored:\n{ex}')
+            return None, []
+        return video.game_start_offset, [(event.time, event.description, event.point) for event in video.events]
+
+    def show_events(self, game_start, events):
+        self.clear_events()
+        if game_start is None:
+            return
+        event_text, point, seconds = self.game_start_event(self.game_start_radiobutton, game_start, {})
+        self.update_events_table(seconds, event_text, point)
+        for seconds, event_text, point in events:
             self.update_events_table(seconds, event_text, point)
-            for item in video_manifest['GameEvents']:
-                point = item['Point']
-                event_text = item['Description']
-                seconds = mmss_to_seconds(item['Time'])
-                self.update_events_table(seconds, event_text, point)
+
+    def load_keyframe_index(self, filename):
+        try:
+            keyframe_index = load_keyframe_index(filename)
+        except FFmpegException as ex:
+            print(f'WARNING : cannot index the keyframes of [{filename}], {ex}')
+            return
+        # ignore the result if another video has been opened in the meantime
+        if filename == self.playback_filename:
+            self.keyframe_index = keyframe_index
+
+    def detect_candidates(self, filename, game_start):
+        try:
+            candidates = analyse(filename, game_start)
+        except FFmpegException as ex:
+            print(f'WARNING : cannot find the candidate events of [{filename}], {ex}')
+            return
+        self.candidates_ready.emit(filename, candidates)
+
+    def show_candidates(self, filename, candidates):
+        # ignore the result if another video has been opened in the meantime
+        if filename != self.media_filename:
+            return
+        self.candidateslist.clear()
+        for candidate in candidates:
+            if candidate['status'] == STATUS_PENDING:
+                item = QtWidgets.QListWidgetItem(f"{seconds_to_mmss(candidate['seconds'], milliseconds=True)}  "
+                                                 f"{'+'.join(candidate['sources'])}")
+                item.setData(QtCore.Qt.UserRole, candidate['seconds'])
+                self.candidateslist.addItem(item)
+
+    def preview_candidate(self, item):
+        """Play the suggested event from a little before"""
+        seconds = item.data(QtCore.Qt.UserRole)
+        self.mediaplayer.set_time(int(max(0, seconds - CANDIDATE_PREROLL_SECONDS) * 1000))
+        if not self.mediaplayer.is_playing():
+            self.play_pause()
+
+    def accept_candidate(self):
+        """Add the event selected in the tabs at the time of the suggested event"""
+        item = self.candidateslist.currentItem()
+        if item is None:
+            return
+        seconds = item.data(QtCore.Qt.UserRole)
+        if self.add_event_at(seconds):
+            set_status(self.media_filename, seconds, STATUS_ACCEPTED)
+            self.candidateslist.takeItem(self.candidateslist.row(item))
+
+    def reject_candidate(self):
+        """Dismiss the suggested event, it's not suggested again for this video"""
+        item = self.candidateslist.currentItem()
+        if item is None:
+            return
+        set_status(self.media_filename, item.data(QtCore.Qt.UserRole), STATUS_REJECTED)
+        self.candidateslist.takeItem(self.candidateslist.row(item))
+
+    PLAYBACK_RATES = ['0.5x', '1x', '1.5x', '2x']
+
+    def set_rate(self, rate):
+        self.mediaplayer.set_rate(float(rate.rstrip('x')))
+
+    def next_frame(self):
+        """Step exactly one frame, the playback is paused"""
+        if self.mediaplayer.is_playing():
+            self.play_pause()
+        self.mediaplayer.next_frame()
 
     def set_volume(self, volume):
         """Set the volume
@@ -554,54 +851,74 @@ class MatchVideoProcessor(QtWidgets.QMainWindow):
         # more precise are the results (1000 should suffice).
 
         # Set the media position to where the slider was dragged
-        self.timer.stop()
+        self.scrubpreview.hide()
         pos = self.positionslider.value()
         self.mediaplayer.set_position(pos / 1000.0)
-        self.timer.start()
 
-    def update_ui(self):
-        """Updates the user interface"""
+    def scrub_position(self):
+        """Preview the position while the slider is dragged, the exact position is set when it's released.
+
+        The thumbnail from the filmstrip is shown without seeking at all, if it's not extracted yet, seek to the
+        keyframe nearest to the slider so VLC doesn't need to decode up to the exact position.
+        """
+        length = self.media_length
+        if length <= 0:
+            self.set_position()
+            return
+
+        seconds = self.positionslider.value() / 1000.0 * length / 1000.0
+        thumbnail = self.filmstrip.frame_at(seconds) if self.filmstrip is not None else None
+        if thumbnail is not None:
+            self.show_scrub_preview(thumbnail)
+            self.progress_text = None
+            self.progress.setText(f"{seconds_to_mmss(int(seconds))} / {ms_to_mmss(length)}")
+            return
+        if self.keyframe_index is None:
+            self.set_position()
+            return
 
-        # Set the slider's position to its corresponding media position
-        # Note that the setValue function only takes values of type int,
-        # so we must first convert the corresponding media position.
-        media_pos = int(self.mediaplayer.get_position() * 1000)
-        self.positionslider.setValue(media_pos)
-        self.progress.setText(f"{ms_to_mmss(self.mediaplayer.get_time())} / {ms_to_mmss(self.mediaplayer.get_length())}")
+        keyframe = self.keyframe_index.nearest(seconds)
+        if keyframe is None:
+            keyframe = seconds
+        self.mediaplayer.set_time(int(keyframe * 1000))
+
+    def show_scrub_preview(self, thumbnail):
+        pixmap = QtGui.QPixmap()
+        pixmap.loadFromData(thumbnail, 'JPG')
+        self.scrubpreview.setPixmap(pixmap)
+        self.scrubpreview.resize(pixmap.size())
+        # center the thumbnail above the slider handle
+        handle_x = int(self.positionslider.width() * self.positionslider.value() / 1000)
+        position = self.positionslider.mapToGlobal(QtCore.QPoint(handle_x, 0))
+        self.scrubpreview.move(position.x() - pixmap.width() // 2, position.y() - pixmap.height() - 4)
+        self.scrubpreview.show()
+
+    def set_length(self, length):
+        self.media_length = length
+
+    def update_ui(self, time=None):
+        """Updates the user interface when the playback time changes"""
+        if time is None:
+            time = self.mediaplayer.get_time()
+
+        # Set the slider's position to its corresponding media position, unless it's dragged
+        if self.media_length > 0 and not self.positionslider.isSliderDown():
+            self.positionslider.setValue(int(time * 1000 / self.media_length))
+        progress_text = f"{ms_to_mmss(time)} / {ms_to_mmss(self.media_length)}"
+        if progress_text != self.progress_text:
+            self.progress_text = progress_text
+            self.progress.setText(progress_text)
 
         # automatically switch the events tab status based on game start offset
         if self.game_start_offset is not None:
-            seconds_from_game_start = int(self.mediaplayer.get_time()/1000) - self.game_start_offset
-            if 0 <= seconds_from_game_start < 42:
-                # enable the 'autonomous' tab
-                self.eventstabs.setTabEnabled(1, True)
-                # self.eventstabs.setCurrentIndex(1)
-            if 0 <= seconds_from_game_start < 25:
-                # disable the 'teleop' and 'end game' tab
-                self.eventstabs.setTabEnabled(2, False)
-                self.eventstabs.setTabEnabled(3, False)
-            if 25 <= seconds_from_game_start < 130:
-                # enable the 'teleop' tab
-                self.eventstabs.setTabEnabled(2, True)
-                if seconds_from_game_start == 35:
-                    self.eventstabs.setCurrentIndex(2)
-            if 37 <= seconds_from_game_start < 122:
-                # disable the 'autonomous' and 'end game' tab
-                self.eventstabs.setTabEnabled(1, False)
-                self.eventstabs.setTabEnabled(3, False)
-            if 122 <= seconds_from_game_start < 170:
-                # enable the 'end game' tab
-                self.eventstabs.setTabEnabled(3, True)
-                if seconds_from_game_start == 128:
-                    self.eventstabs.setCurrentIndex(3)
-            if 133 <= seconds_from_game_start < 170:
-                # disable the 'autonomous' and 'teleop' tab
-                self.eventstabs.setTabEnabled(1, False)
-                self.eventstabs.setTabEnabled(2, False)
-
-        # No need to call this function if nothing is played
-        if not self.mediaplayer.is_playing():
-            self.timer.stop()
+            self.phase_machine.update(time / 1000 - self.game_start_offset)
+
+    def enter_phase(self, phase):
+        if phase.enabled_tabs is not None:
+            for tab in [TAB_AUTONOMOUS, TAB_TELEOP, TAB_END_GAME]:
+                self.eventstabs.setTabEnabled(tab, tab in phase.enabled_tabs)
+        if phase.current_tab is not None:
+            self.eventstabs.setCurrentIndex(phase.current_tab)
 
 
 def main():
@@ -609,16 +926,22 @@ def main():
     """
     app = QtWidgets.QApplication(sys.argv)
     media_file = None
+    queue_folder = None
     if len(sys.argv) > 1:
         filename = sys.argv[1]
         if path.isfile(filename):
             media_file = filename
+        elif path.isdir(filename):
+            # review queue of the root folder of the event
+            queue_folder = filename
         else:
             print(f'ERROR : Media file passed in [{filename}] not exists')
     player = MatchVideoProcessor(media_file=media_file)
+    if queue_folder is not None:
+        player.start_review_queue(queue_folder)
     player.show()
     player.resize(1024, 768)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    main()
+    metrics.run('match-video-processer', main)
@@ -0,0 +1,64 @@
+"""
+State machine of the game phases, from the seconds since the game start to the events tabs a referee can use
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+from bisect import bisect_right
+
+TAB_AUTONOMOUS = 1
+TAB_TELEOP = 2
+TAB_END_GAME = 3
+
+
+class GamePhase:
+
+    def __init__(self, name, start, enabled_tabs, current_tab=None):
+        self.name = name
+        # seconds from game start
+        self.start = start
+        # None for phases which don't change the tabs, such as before the game starts
+        self.enabled_tabs = enabled_tabs
+        # tab to switch to when entering the phase
+        self.current_tab = current_tab
+
+    def __repr__(self):
+        return f'GamePhase({self.name} from {self.start}s)'
+
+
+# The phases overlap a little, so a referee can still add an event a few seconds after the phase ends.
+PHASES = [
+    GamePhase('Before Game', float('-inf'), None),
+    GamePhase('Autonomous', 0, {TAB_AUTONOMOUS}),
+    GamePhase('Autonomous Scoring', 25, {TAB_AUTONOMOUS, TAB_TELEOP}),
+    GamePhase('Teleop Start', 35, {TAB_AUTONOMOUS, TAB_TELEOP}, TAB_TELEOP),
+    GamePhase('Teleop', 37, {TAB_TELEOP}),
+    GamePhase('End Game Start', 122, {TAB_TELEOP, TAB_END_GAME}),
+    GamePhase('End Game', 128, {TAB_TELEOP, TAB_END_GAME}, TAB_END_GAME),
+    GamePhase('End Game Only', 133, {TAB_END_GAME}),
+    GamePhase('After Game', 170, None),
+]
+PHASE_STARTS = [phase.start for phase in PHASES]
+
+
+def phase_at(seconds_from_game_start):
+    return PHASES[bisect_right(PHASE_STARTS, seconds_from_game_start) - 1]
+
+
+class GamePhaseMachine:
+    """Track the current phase, on_change(phase) is only called when the phase actually changes"""
+
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self.phase = None
+
+    def reset(self):
+        self.phase = None
+
+    def update(self, seconds_from_game_start):
+        phase = phase_at(seconds_from_game_start)
+        if phase is not self.phase:
+            self.phase = phase
+            self.on_change(phase)
+        return phase
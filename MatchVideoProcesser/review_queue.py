@@ -0,0 +1,52 @@
+"""
+Queue of the match videos waiting for a referee review in the "Game Matches" folder
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+
+from Manifest.layout import FOLDER_MATCH, PATTERN_MATCH_FOLDER
+
+
+def video_manifest_filename(video_filename):
+    pre, _ = os.path.splitext(video_filename)
+    return f'{pre}.yml'
+
+
+def queue_key(video_filename):
+    """(match, file name) position of a video in the queue"""
+    match = PATTERN_MATCH_FOLDER.match(os.path.basename(os.path.dirname(video_filename)))
+    return int(match.group(1)) if match is not None else -1, os.path.basename(video_filename)
+
+
+class ReviewQueue:
+
+    def __init__(self, folder):
+        # accept both the root folder of the event and the "Game Matches" folder itself
+        if os.path.isdir(os.path.join(folder, FOLDER_MATCH)):
+            folder = os.path.join(folder, FOLDER_MATCH)
+        self.matches_folder = folder
+
+    def pending(self):
+        """Match videos without a video manifest, in the order of the matches"""
+        videos = []
+        with os.scandir(self.matches_folder) as it:
+            match_folders = [entry for entry in it if entry.is_dir() and PATTERN_MATCH_FOLDER.match(entry.name)]
+        match_folders.sort(key=lambda entry: int(PATTERN_MATCH_FOLDER.match(entry.name).group(1)))
+        for match_folder in match_folders:
+            with os.scandir(match_folder.path) as it:
+                video_files = sorted(entry.path for entry in it if entry.is_file() and entry.name.lower().endswith('.mp4'))
+            videos += [video for video in video_files if not os.path.exists(video_manifest_filename(video))]
+        return videos
+
+    def next(self, current=None):
+        """The next video to review after the current one, the queue wraps around to the skipped videos"""
+        videos = [video for video in self.pending() if video != current]
+        if current is not None:
+            # the current video is not pending anymore once its manifest is saved, its position still counts
+            key = queue_key(current)
+            videos = [video for video in videos if queue_key(video) > key] + \
+                     [video for video in videos if queue_key(video) < key]
+        return videos[0] if videos else None
@@ -0,0 +1,57 @@
+"""
+A single background worker thread to run the slow media jobs (thumbnails, proxies ...) out of the UI thread
+
+Jobs are identified by a key, queuing a job already waiting is ignored, and a job can be moved to the front
+of the queue, such as the video the referee just opened.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import threading
+import traceback
+from collections import OrderedDict
+
+
+class BackgroundJobs:
+
+    def __init__(self, name='media-jobs'):
+        self.name = name
+        self.pending = OrderedDict()
+        self.running = None
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def submit(self, key, function, *args, urgent=False):
+        """Queue function(*args) unless a job with the same key is already waiting or running"""
+        with self.condition:
+            if key == self.running:
+                return
+            if key not in self.pending:
+                self.pending[key] = (function, args)
+            if urgent:
+                self.pending.move_to_end(key, last=False)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def is_pending(self, key):
+        with self.condition:
+            return key == self.running or key in self.pending
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                key, (function, args) = self.pending.popitem(last=False)
+                self.running = key
+            try:
+                function(*args)
+            except Exception:
+                print(f'ERROR : background job [{key}] failed')
+                traceback.print_exc()
+            finally:
+                with self.condition:
+                    self.running = None
@@ -0,0 +1,69 @@
+"""
+Side-car cache files stored beside the media file, such as "match1-red-team16031.mp4.fingerprint.npz"
+
+A cache is only valid as long as the size and modification time of the media file match the recorded ones,
+so a re-uploaded or re-copied video is analysed again automatically.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import json
+
+
+def cache_path(media_file, suffix):
+    return f'{media_file}.{suffix}'
+
+
+def source_stamp(media_file):
+    stat = os.stat(media_file)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def is_stamp_valid(media_file, stamp):
+    try:
+        return stamp == source_stamp(media_file)
+    except OSError:
+        return False
+
+
+def load_json_cache(media_file, suffix):
+    """Return the cached data, or None if there is no cache or it is out of date"""
+    filename = cache_path(media_file, suffix)
+    if not os.path.exists(filename):
+        return None
+    try:
+        with open(filename) as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not is_stamp_valid(media_file, cache.get('source')):
+        return None
+    return cache.get('data')
+
+
+def save_json_cache(media_file, suffix, data, stamp=None):
+    """Save the data, pass the stamp taken before a long analysis so a media file changed meanwhile is not cached"""
+    filename = cache_path(media_file, suffix)
+    if stamp is None:
+        stamp = source_stamp(media_file)
+    with open(filename, 'w') as file:
+        json.dump({'source': stamp, 'data': data}, file)
+    return filename
+
+
+def copy_json_cache(source, destination, suffix):
+    """Cache the data of the source for its copy as well, return whether the source had a valid cache"""
+    data = load_json_cache(source, suffix)
+    if data is None:
+        return False
+    save_json_cache(destination, suffix, data)
+    return True
+
+
+def read_ahead(filename, chunk_size=1 << 20):
+    """Read the whole file once so it's in the OS file cache (or downloaded by the sync client) before it's opened"""
+    with open(filename, 'rb', buffering=0) as file:
+        while file.read(chunk_size):
+            pass
@@ -0,0 +1,256 @@
+"""
+Candidate scoring moments of a game video, found offline so the referee reviews a list instead of the whole match
+
+Two cheap signals, decoded once at a low resolution and analysed with numpy :
+
+ - motion bursts : the video is decoded at 10 frames per second, 64x36 gray, and cut into a grid of cells. A cell
+   changing much more than it usually does (its median change plus a multiple of its median deviation) is a
+   burst, such as rings going through the goal or a wobble goal dropped. A region (the goal) can be given to
+   only look at the cells there.
+ - impact sounds : the audio envelope in 10 ms windows, a window louder than the second before it by a margin is
+   an impact, and gives the time to the 10 ms.
+
+A motion burst with an impact close to it is a stronger candidate, timed by the impact. The strongest candidates are
+cached beside the video as "<video>.candidates.json" with the decision of the referee on each of them (accepted or
+rejected), so a video is analysed once and a rejected candidate isn't suggested again. The strongest ones during the
+game are suggested.
+
+MatchVideoProcessor analyses the video in background when it's opened, or analyse a batch in advance :
+
+Usage: python -m MediaTools.candidates path/to/video.mp4|path/to/event/root [--game-start 0:50] [--region 0.3,0,0.4,0.5]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Manifest.timecode import GAME_SECONDS, mmss_to_seconds, seconds_to_mmss
+from MediaTools import metrics
+from MediaTools.cache import load_json_cache, save_json_cache, source_stamp
+from MediaTools.ffmpeg import FFmpegException, decode_audio, run_ffmpeg
+from MediaTools.proxy import proxy_for
+from MediaTools.store import VIDEO_EXTENSIONS
+
+CACHE_SUFFIX = 'candidates.json'
+FRAME_RATE = 10
+FRAME_WIDTH = 64
+FRAME_HEIGHT = 36
+GRID_COLUMNS = 4
+GRID_ROWS = 4
+# a burst is a cell change over its median by this many median deviations
+MOTION_THRESHOLD = 6
+AUDIO_RATE = 8000
+AUDIO_WINDOW = 0.01
+# an impact is a window louder than the median of the second before it by this many dB
+IMPACT_DB = 12
+BASELINE_SECONDS = 1.0
+# a motion burst and an impact closer than this are the same moment
+MERGE_SECONDS = 0.5
+# two candidates of the same signal are at least this far apart
+MIN_GAP_SECONDS = 1.0
+MAX_CANDIDATES = 40
+
+STATUS_PENDING = 'pending'
+STATUS_ACCEPTED = 'accepted'
+STATUS_REJECTED = 'rejected'
+SOURCE_MOTION = 'motion'
+SOURCE_AUDIO = 'audio'
+
+
+def decode_frames(video):
+    """(frames, FRAME_HEIGHT, FRAME_WIDTH) uint8 gray frames at FRAME_RATE, from the low resolution proxy if there is one"""
+    source = proxy_for(video) or video
+    # skipping the loop filter makes the decoding much cheaper, the artifacts don't matter at this size
+    raw = run_ffmpeg(['-skip_loop_filter', 'all', '-i', source, '-an',
+                      '-vf', f'fps={FRAME_RATE},scale={FRAME_WIDTH}:{FRAME_HEIGHT},format=gray', '-f', 'rawvideo', '-'])
+    frame_size = FRAME_WIDTH * FRAME_HEIGHT
+    return np.frombuffer(raw[:len(raw) // frame_size * frame_size], dtype=np.uint8).reshape(-1, FRAME_HEIGHT, FRAME_WIDTH)
+
+
+def region_cells(region):
+    """Mask of the grid cells overlapping the region (x, y, width, height as fractions of the frame), all if None"""
+    mask = np.ones((GRID_ROWS, GRID_COLUMNS), dtype=bool)
+    if region is None:
+        return mask
+    x, y, width, height = region
+    for row in range(GRID_ROWS):
+        for column in range(GRID_COLUMNS):
+            mask[row, column] = (column + 1) / GRID_COLUMNS > x and column / GRID_COLUMNS < x + width \
+                and (row + 1) / GRID_ROWS > y and row / GRID_ROWS < y + height
+    return mask
+
+
+def motion_strength(frames, region=None):
+    """Strength of the motion burst between each frame and the previous one, in median deviations of the cell"""
+    if len(frames) < 2:
+        return np.zeros(0)
+    change = np.abs(np.diff(frames.astype(np.int16), axis=0)).astype(np.float32)
+    cell_height, cell_width = FRAME_HEIGHT // GRID_ROWS, FRAME_WIDTH // GRID_COLUMNS
+    change = change[:, :cell_height * GRID_ROWS, :cell_width * GRID_COLUMNS]
+    cells = change.reshape(len(change), GRID_ROWS, cell_height, GRID_COLUMNS, cell_width).mean(axis=(2, 4))
+    cells = cells[:, region_cells(region)]
+    median = np.median(cells, axis=0)
+    deviation = np.median(np.abs(cells - median), axis=0) + 0.5
+    return ((cells - median) / deviation).max(axis=1)
+
+
+def audio_strength(video):
+    """dB of each AUDIO_WINDOW over the median of the second before it, empty without audio"""
+    samples = np.frombuffer(decode_audio(video, AUDIO_RATE), dtype=np.int16)
+    window = int(AUDIO_RATE * AUDIO_WINDOW)
+    count = len(samples) // window
+    if count == 0:
+        return np.zeros(0)
+    power = (samples[:count * window].astype(np.float64).reshape(count, window) / 32768) ** 2
+    envelope = 10 * np.log10(power.mean(axis=1) + 1e-10)
+    history = int(BASELINE_SECONDS / AUDIO_WINDOW)
+    padded = np.concatenate([np.full(history, envelope[:history].min()), envelope])
+    baseline = np.median(np.lib.stride_tricks.sliding_window_view(padded[:-1], history), axis=1)
+    return envelope - baseline
+
+
+def peaks(strength, threshold, interval):
+    """[(index, strength)] of the onsets over the threshold, the first index of each, at least MIN_GAP_SECONDS apart
+
+    An onset is timed at its first window over the threshold, its strength is the highest within the gap.
+    """
+    gap = max(1, int(MIN_GAP_SECONDS / interval))
+    found = []
+    above = np.flatnonzero(strength > threshold)
+    last = -gap
+    for index in above:
+        if index - last >= gap:
+            found.append((int(index), float(strength[index:index + gap].max())))
+            last = index
+    return found
+
+
+def detect_candidates(video, region=None):
+    """[{seconds, score, sources, status}] of the candidate moments of the video, in time order"""
+    with metrics.span('candidates.detect', video=video) as fields:
+        # the change between frame i and i + 1 is seen on frame i + 1
+        motion = [((index + 1) / FRAME_RATE, strength / MOTION_THRESHOLD)
+                  for index, strength in peaks(motion_strength(decode_frames(video), region), MOTION_THRESHOLD, 1 / FRAME_RATE)]
+        try:
+            audio = [(index * AUDIO_WINDOW, strength / IMPACT_DB)
+                     for index, strength in peaks(audio_strength(video), IMPACT_DB, AUDIO_WINDOW)]
+        except FFmpegException:
+            # a video without audio track
+            audio = []
+        candidates = []
+        matched = set()
+        for seconds, score in motion:
+            impact = min((impact for impact in audio if abs(impact[0] - seconds) <= MERGE_SECONDS),
+                         key=lambda impact: abs(impact[0] - seconds), default=None)
+            if impact is not None:
+                matched.add(impact)
+                candidates.append((impact[0], score + impact[1], [SOURCE_MOTION, SOURCE_AUDIO]))
+            else:
+                candidates.append((seconds, score, [SOURCE_MOTION]))
+        candidates += [(seconds, score, [SOURCE_AUDIO]) for seconds, score in audio if (seconds, score) not in matched]
+        fields.update(motion=len(motion), audio=len(audio))
+    return [{'seconds': round(seconds, 3), 'score': round(score, 2), 'sources': sources, 'status': STATUS_PENDING}
+            for seconds, score, sources in sorted(candidates)]
+
+
+def load_candidates(video):
+    """The cached candidates of the video, None if it's not analysed since it changed"""
+    return load_json_cache(video, CACHE_SUFFIX)
+
+
+def strongest(candidates, game_start=None):
+    """The MAX_CANDIDATES strongest candidates during the game (all the video if its start is unknown), in time order"""
+    if game_start is not None:
+        candidates = [candidate for candidate in candidates
+                      if game_start <= candidate['seconds'] <= game_start + GAME_SECONDS]
+    return sorted(sorted(candidates, key=lambda candidate: -candidate['score'])[:MAX_CANDIDATES],
+                  key=lambda candidate: candidate['seconds'])
+
+
+def analyse(video, game_start=None, region=None, force=False):
+    """The strongest candidates of the video, detected and cached unless they are cached already
+
+    The region is only used by a new detection, force it to detect the candidates again (the decisions are lost).
+    """
+    candidates = None if force else load_candidates(video)
+    if candidates is None:
+        stamp = source_stamp(video)
+        candidates = detect_candidates(video, region)
+        save_json_cache(video, CACHE_SUFFIX, candidates, stamp)
+    return strongest(candidates, game_start)
+
+
+def set_status(video, seconds, status):
+    """Record the decision of the referee on the candidate at the time"""
+    candidates = load_candidates(video)
+    if candidates is None:
+        return
+    for candidate in candidates:
+        if candidate['seconds'] == seconds:
+            candidate['status'] = status
+    save_json_cache(video, CACHE_SUFFIX, candidates)
+
+
+def find_videos(folder):
+    """The videos of the folder and its sub folders, without the proxies"""
+    videos = []
+    for parent, _, names in os.walk(folder):
+        videos += [os.path.join(parent, name) for name in sorted(names)
+                   if name.lower().endswith(VIDEO_EXTENSIONS) and '.proxy.' not in name and not name.startswith('.')]
+    return videos
+
+
+def parse_region(text):
+    values = [float(value) for value in text.split(',')]
+    if len(values) != 4 or not all(0 <= value <= 1 for value in values):
+        raise argparse.ArgumentTypeError(f'Region must be x,y,width,height as fractions of the frame, got [{text}]')
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find the candidate scoring moments of game videos for the referees')
+    parser.add_argument('path', type=str, help='A game video, or a folder such as "Game Matches" to analyse all its videos')
+    parser.add_argument('--game-start', type=str, default=None, help='Game start of the video as MM:SS, only the candidates during the game are kept')
+    parser.add_argument('--region', type=parse_region, default=None, help='Only look for motion in this region, x,y,width,height as fractions of the frame')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of videos analysed in parallel, default to the number of CPUs')
+    parser.add_argument('--force', action='store_true', help='Analyse the videos again, the decisions of the referees are lost')
+    args = parser.parse_args()
+    if os.path.isdir(args.path):
+        videos = find_videos(args.path)
+    elif os.path.isfile(args.path):
+        videos = [args.path]
+    else:
+        print(f'ERROR : Video or folder passed in [{args.path}] not exists')
+        sys.exit(1)
+    try:
+        game_start = mmss_to_seconds(args.game_start) if args.game_start is not None else None
+    except ValueError as ex:
+        print(f'ERROR : {ex}')
+        sys.exit(1)
+
+    def run(video):
+        try:
+            return video, analyse(video, game_start, args.region, args.force), None
+        except FFmpegException as ex:
+            return video, None, ex
+
+    # the analysis waits on ffmpeg for most of the time, threads are enough
+    with ThreadPoolExecutor(max_workers=args.jobs or os.cpu_count()) as executor:
+        for video, candidates, error in executor.map(run, videos):
+            if error is not None:
+                print(f'WARNING : cannot analyse [{video}], {error}')
+                continue
+            print(f'{video} : {len(candidates)} candidates')
+            for candidate in candidates:
+                print(f'  {seconds_to_mmss(candidate["seconds"], milliseconds=True):<10}{candidate["score"]:5.2f}  '
+                      f'{"+".join(candidate["sources"]):<12} {candidate["status"]}')
+
+
+if __name__ == '__main__':
+    metrics.run('candidates', main)
@@ -0,0 +1,76 @@
+"""
+Thin wrappers around the ffmpeg / ffprobe command line tools shared by all the components
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import json
+import subprocess
+
+from MediaTools import metrics
+
+# allow to point to a specific build of ffmpeg, otherwise use the one from PATH
+FFMPEG = os.environ.get('FFMPEG', 'ffmpeg')
+FFPROBE = os.environ.get('FFPROBE', 'ffprobe')
+
+
+class FFmpegException(Exception):
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+def run_ffmpeg(args):
+    """Run ffmpeg with the arguments, return the raw stdout"""
+    command = [FFMPEG, '-hide_banner', '-nostdin', '-v', 'error'] + args
+    try:
+        with metrics.timer('ffmpeg'):
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as ex:
+        raise FFmpegException(f'Failed to run [{FFMPEG}] : {ex}')
+    if result.returncode != 0:
+        raise FFmpegException(f'ffmpeg failed with code {result.returncode} : {result.stderr.decode(errors="replace").strip()}')
+    return result.stdout
+
+
+def run_ffmpeg_log(args, log_level='info'):
+    """Run ffmpeg with the arguments, return its log, for the filters which report their analysis there"""
+    command = [FFMPEG, '-hide_banner', '-nostdin', '-nostats', '-v', log_level] + args
+    try:
+        with metrics.timer('ffmpeg'):
+            result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except OSError as ex:
+        raise FFmpegException(f'Failed to run [{FFMPEG}] : {ex}')
+    log = result.stderr.decode(errors='replace')
+    if result.returncode != 0:
+        raise FFmpegException(f'ffmpeg failed with code {result.returncode} : {log.strip()[-1000:]}')
+    return log
+
+
+def run_ffprobe(args):
+    """Run ffprobe with the arguments, return the parsed json output"""
+    command = [FFPROBE, '-v', 'error', '-of', 'json'] + args
+    try:
+        with metrics.timer('ffprobe'):
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as ex:
+        raise FFmpegException(f'Failed to run [{FFPROBE}] : {ex}')
+    if result.returncode != 0:
+        raise FFmpegException(f'ffprobe failed with code {result.returncode} : {result.stderr.decode(errors="replace").strip()}')
+    return json.loads(result.stdout)
+
+
+def decode_audio(media_file, sample_rate, start=None, duration=None):
+    """Decode the first audio stream to mono signed 16 bits PCM, return the raw bytes"""
+    args = []
+    if start is not None:
+        args += ['-ss', f'{start:.3f}']
+    args += ['-i', media_file]
+    if duration is not None:
+        args += ['-t', f'{duration:.3f}']
+    args += ['-map', '0:a:0', '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-']
+    return run_ffmpeg(args)
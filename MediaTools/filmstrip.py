@@ -0,0 +1,114 @@
+"""
+Low resolution thumbnail strip of a video, one JPEG frame per second, cached beside the video
+
+The cache is a single file : a magic, the length of a json header, the json header, then the JPEG frames
+back to back. A 3 minutes match video is around 1MB, and any thumbnail can be shown instantly while scrubbing
+or used as a poster frame, without asking VLC to decode the full resolution video.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import json
+import struct
+import subprocess
+
+from MediaTools import cache
+from MediaTools.ffmpeg import FFMPEG, FFmpegException
+
+CACHE_SUFFIX = 'filmstrip'
+MAGIC = b'VGEFSTR1'
+INTERVAL = 1.0
+WIDTH = 160
+JPEG_END = b'\xff\xd9'
+
+
+class Filmstrip:
+
+    def __init__(self, interval=INTERVAL, frames=None, complete=False):
+        self.interval = interval
+        # frames are appended by the extraction thread while the UI reads them, a list append is atomic
+        self.frames = frames if frames is not None else []
+        self.complete = complete
+
+    def frame_at(self, seconds):
+        """The JPEG bytes of the thumbnail closest to the time, None if it's not extracted (yet)"""
+        if not self.frames or seconds < 0:
+            return None
+        i = int(seconds / self.interval + 0.5)
+        if i >= len(self.frames):
+            return self.frames[-1] if self.complete else None
+        return self.frames[i]
+
+
+def load_filmstrip(media_file):
+    """Load the filmstrip from the cache beside the media file, None if there is no valid cache"""
+    filename = cache.cache_path(media_file, CACHE_SUFFIX)
+    if not os.path.exists(filename):
+        return None
+    try:
+        with open(filename, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                return None
+            header_length, = struct.unpack('<I', file.read(4))
+            header = json.loads(file.read(header_length))
+            if not cache.is_stamp_valid(media_file, header['source']):
+                return None
+            frames = [file.read(size) for size in header['sizes']]
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+    return Filmstrip(header['interval'], frames, complete=True)
+
+
+def save_filmstrip(media_file, filmstrip, stamp):
+    header = json.dumps({'source': stamp, 'interval': filmstrip.interval, 'sizes': [len(frame) for frame in filmstrip.frames]}).encode()
+    filename = cache.cache_path(media_file, CACHE_SUFFIX)
+    with open(filename, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack('<I', len(header)))
+        file.write(header)
+        for frame in filmstrip.frames:
+            file.write(frame)
+    return filename
+
+
+def extract_filmstrip(media_file, filmstrip=None):
+    """Extract the thumbnails with ffmpeg and save the cache, frames are available in filmstrip as they come"""
+    if filmstrip is None:
+        filmstrip = Filmstrip()
+    stamp = cache.source_stamp(media_file)
+    # skipping the loop filter makes the decoding much cheaper, artifacts don't matter for a thumbnail
+    command = [FFMPEG, '-hide_banner', '-nostdin', '-v', 'error', '-skip_loop_filter', 'all', '-i', media_file,
+               '-an', '-vf', f'fps={1 / filmstrip.interval},scale={WIDTH}:-2', '-c:v', 'mjpeg', '-q:v', '6',
+               '-f', 'image2pipe', '-']
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError as ex:
+        raise FFmpegException(f'Failed to run [{FFMPEG}] : {ex}')
+    buffer = b''
+    while True:
+        chunk = process.stdout.read(65536)
+        if not chunk:
+            break
+        buffer += chunk
+        # TRICKY : 0xFFD9 can't appear inside the entropy coded data of a JPEG, it's safe to split on it
+        while True:
+            end = buffer.find(JPEG_END)
+            if end < 0:
+                break
+            filmstrip.frames.append(buffer[:end + len(JPEG_END)])
+            buffer = buffer[end + len(JPEG_END):]
+    if process.wait() != 0:
+        raise FFmpegException(f'ffmpeg failed to extract the thumbnails of [{media_file}]')
+    filmstrip.complete = True
+    save_filmstrip(media_file, filmstrip, stamp)
+    return filmstrip
+
+
+def poster_frame(media_file, seconds):
+    """JPEG bytes of a cached thumbnail, None if the filmstrip of the video hasn't been extracted"""
+    filmstrip = load_filmstrip(media_file)
+    if filmstrip is None:
+        return None
+    return filmstrip.frame_at(min(seconds, (len(filmstrip.frames) - 1) * filmstrip.interval))
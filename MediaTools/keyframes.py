@@ -0,0 +1,100 @@
+"""
+Keyframe index of a video, built once with ffprobe and cached beside the video
+
+Phone recordings sometimes have keyframes 5-10 seconds apart, so where the keyframes are decides how fast and
+how accurate a seek can be. The index only reads the packet headers, no frame is decoded.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+from bisect import bisect_left, bisect_right
+
+from MediaTools import cache
+from MediaTools.ffmpeg import run_ffprobe
+
+CACHE_SUFFIX = 'keyframes.json'
+
+SEEK_COPY = 'copy'
+SEEK_FAST = 'fast'
+SEEK_ACCURATE = 'accurate'
+
+
+class KeyframeIndex:
+
+    def __init__(self, keyframes, duration):
+        self.keyframes = sorted(keyframes)
+        self.duration = duration
+
+    def previous(self, seconds):
+        """The last keyframe at or before the time, None if there isn't one"""
+        i = bisect_right(self.keyframes, seconds)
+        return self.keyframes[i - 1] if i > 0 else None
+
+    def next(self, seconds):
+        """The first keyframe at or after the time, None if there isn't one"""
+        i = bisect_left(self.keyframes, seconds)
+        return self.keyframes[i] if i < len(self.keyframes) else None
+
+    def nearest(self, seconds):
+        candidates = [keyframe for keyframe in (self.previous(seconds), self.next(seconds)) if keyframe is not None]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda keyframe: abs(keyframe - seconds))
+
+    def max_gap(self):
+        gaps = [b - a for a, b in zip(self.keyframes, self.keyframes[1:])]
+        return max(gaps) if gaps else self.duration
+
+
+class SeekPlan:
+    """How to seek into one input
+
+    - copy : the cut starts on a keyframe and no filter is needed, the packets can be copied as they are
+    - fast : a keyframe is close enough to the target, seek straight to it without decoding anything
+    - accurate : decode from the previous keyframe up to the target, 'decode_seconds' is the wasted decoding
+    """
+
+    def __init__(self, method, seek, decode_seconds=0.0):
+        self.method = method
+        self.seek = seek
+        self.decode_seconds = decode_seconds
+
+    def input_args(self):
+        """The ffmpeg arguments to put before the '-i' of the input"""
+        if self.method == SEEK_ACCURATE:
+            return f'-ss {self.seek:.3f}'
+        return f'-noaccurate_seek -ss {self.seek:.3f}'
+
+    def __repr__(self):
+        return f'{self.method} seek to {self.seek:.3f}s (decode {self.decode_seconds:.3f}s)'
+
+
+def plan_seek(index, seconds, tolerance=0.02, allow_copy=False):
+    """Choose between stream copy, fast input seeking or accurate seeking to start reading at the time"""
+    if index is None:
+        return SeekPlan(SEEK_ACCURATE, seconds)
+    nearest = index.nearest(seconds)
+    if nearest is not None and abs(nearest - seconds) <= tolerance:
+        return SeekPlan(SEEK_COPY if allow_copy else SEEK_FAST, nearest)
+    previous = index.previous(seconds)
+    decode_seconds = seconds - previous if previous is not None else seconds
+    return SeekPlan(SEEK_ACCURATE, seconds, decode_seconds)
+
+
+def build_keyframe_index(media_file):
+    result = run_ffprobe(['-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags:format=duration', media_file])
+    keyframes = [float(packet['pts_time']) for packet in result.get('packets', [])
+                 if 'K' in packet.get('flags', '') and packet.get('pts_time', 'N/A') != 'N/A']
+    duration = float(result.get('format', {}).get('duration', 0) or 0)
+    return {'keyframes': keyframes, 'duration': duration}
+
+
+def load_keyframe_index(media_file):
+    """Load the keyframe index from the cache beside the media file, build and save it if needed"""
+    data = cache.load_json_cache(media_file, CACHE_SUFFIX)
+    if data is None:
+        stamp = cache.source_stamp(media_file)
+        data = build_keyframe_index(media_file)
+        cache.save_json_cache(media_file, CACHE_SUFFIX, data, stamp)
+    return KeyframeIndex(data['keyframes'], data['duration'])
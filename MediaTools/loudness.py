@@ -0,0 +1,85 @@
+"""
+EBU R128 loudness of the audio of a match video, measured once and cached beside it as "<video>.loudness.json"
+
+The measurement is the first pass of the loudnorm filter over the whole video, run when the video is copied to the
+match folder (or with the command line below). The render then only applies a linear gain computed from the
+cached values, so the four phones of a match sound alike without a second analysis pass at render time.
+
+Usage: python -m MediaTools.loudness video.mp4|folder ...
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+
+from MediaTools import metrics
+from MediaTools.cache import load_json_cache, save_json_cache, source_stamp
+from MediaTools.ffmpeg import FFmpegException, run_ffmpeg_log
+
+CACHE_SUFFIX = 'loudness.json'
+# EBU R128 program loudness of the mix, and the highest true peak of a single track
+TARGET_LOUDNESS = -23.0
+TARGET_TRUE_PEAK = -2.0
+PATTERN_JSON = re.compile(r'\{[^{}]*\}')
+
+
+def measure_loudness(media_file):
+    """{input_i, input_tp, input_lra, input_thresh, target_offset} of the first audio stream, as loudnorm reports"""
+    log = run_ffmpeg_log(['-i', media_file, '-map', '0:a:0', '-vn',
+                          '-af', f'loudnorm=I={TARGET_LOUDNESS}:TP={TARGET_TRUE_PEAK}:print_format=json', '-f', 'null', '-'])
+    reports = PATTERN_JSON.findall(log)
+    if not reports:
+        raise FFmpegException(f'No loudness report for [{media_file}]')
+    report = json.loads(reports[-1])
+    return {key: float(report[key]) for key in ['input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset']}
+
+
+def load_loudness(media_file):
+    """The cached loudness of the media file, measured again if it changed since"""
+    loudness = load_json_cache(media_file, CACHE_SUFFIX)
+    if loudness is None:
+        stamp = source_stamp(media_file)
+        loudness = measure_loudness(media_file)
+        save_json_cache(media_file, CACHE_SUFFIX, loudness, stamp)
+    return loudness
+
+
+def linear_gain(loudness, target=TARGET_LOUDNESS, true_peak=TARGET_TRUE_PEAK):
+    """Gain in dB to bring the track to the target loudness, limited so its true peak stays below true_peak"""
+    if loudness['input_i'] == float('-inf') or loudness['input_i'] < -70:
+        # silent track, nothing to bring up
+        return 0.0
+    return min(target - loudness['input_i'], true_peak - loudness['input_tp'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the loudness of match videos, cached beside each video')
+    parser.add_argument('paths', nargs='+', help='Video files, or folders to search for mp4 files')
+    args = parser.parse_args()
+    media_files = []
+    for media_path in args.paths:
+        if os.path.isdir(media_path):
+            for folder, _, files in os.walk(media_path):
+                media_files += [os.path.join(folder, name) for name in sorted(files) if name.lower().endswith('.mp4')]
+        else:
+            media_files.append(media_path)
+    failed = 0
+    for media_file in media_files:
+        try:
+            loudness = load_loudness(media_file)
+        except FFmpegException as ex:
+            print(f'ERROR : cannot measure the loudness of [{media_file}], {ex}')
+            failed += 1
+            continue
+        print(f'[{media_file}] {loudness["input_i"]:.1f} LUFS, true peak {loudness["input_tp"]:.1f} dBTP, '
+              f'range {loudness["input_lra"]:.1f} LU, gain {linear_gain(loudness):+.1f} dB')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    metrics.run('loudness', main)
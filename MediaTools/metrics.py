@@ -0,0 +1,286 @@
+"""
+Lightweight metrics of the tools : counters, timers and spans, with an opt-in profiler for any entry point
+
+The counters and timers are always kept in memory, a dict update per call. With the environment variable
+VGE_METRICS set to a folder, each tool also writes there :
+
+ - "<tool>-<pid>.jsonl" : one json line per span (name, start, duration, parent span, fields) and per event
+ - "<tool>.prom" : the counters and timers in the Prometheus text format, rewritten every few seconds and at exit,
+   for a local scraper (such as the textfile collector of node_exporter). A child process of a tool (the local
+   render workers) writes its own "<tool>-<name>.prom", labelled with its name
+
+With VGE_PROFILE=cprofile the whole run is profiled with cProfile ("<tool>-<pid>.prof", top functions printed at
+exit), with VGE_PROFILE=sample a thread samples the stacks of all the threads every few milliseconds into
+"<tool>-<pid>.folded", the collapsed stacks of flamegraph.pl / speedscope. The profiles are written in the
+VGE_METRICS folder, or the current folder.
+
+Usage: VGE_METRICS=metrics VGE_PROFILE=sample pipenv run python event-planner.py
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+ENV_METRICS = 'VGE_METRICS'
+ENV_PROFILE = 'VGE_PROFILE'
+FLUSH_SECONDS = 10
+SAMPLE_SECONDS = 0.005
+PROFILE_TOP = 25
+
+
+class Metrics:
+
+    def __init__(self):
+        self.tool = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+        # name of a child process of the tool, None in the tool itself
+        self.process = None
+        self.folder = None
+        self.lock = threading.Lock()
+        self.counters = {}
+        # name -> [count, total seconds, max seconds]
+        self.timers = {}
+        self.log_file = None
+        self.local = threading.local()
+        self.flusher = None
+
+    def configure(self, tool, folder=None):
+        """Name the tool, and write the logs and the metrics file into the folder if given"""
+        self.tool = tool
+        if folder is None or self.folder is not None:
+            return
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.log_file = open(os.path.join(folder, f'{tool}-{os.getpid()}.jsonl'), 'a', buffering=1)
+        self.flusher = threading.Thread(target=self.flush_loop, daemon=True, name='metrics-flush')
+        self.flusher.start()
+        atexit.register(self.flush)
+
+    def start_process(self, name):
+        """Keep the metrics of a child process (multiprocessing) apart from the ones of the tool, call it first thing
+
+        A forked child inherits the counters, the log file and the lock of its parent but not the flusher thread, and
+        it exits without running the atexit handlers, flush() at its end. A spawned child has no metrics configured.
+        """
+        self.process = name
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.timers = {}
+        self.local = threading.local()
+        folder = self.folder if self.folder is not None else os.environ.get(ENV_METRICS)
+        self.folder = None
+        self.log_file = None
+        self.configure(self.tool, folder)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Time the block, without a log line, for the hot paths"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    @contextmanager
+    def span(self, name, **fields):
+        """Time the block, and log it with the fields and its parent span, fields can be added within the block"""
+        stack = getattr(self.local, 'spans', None)
+        if stack is None:
+            stack = self.local.spans = []
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        started_at = time.time()
+        started = time.perf_counter()
+        error = None
+        try:
+            yield fields
+        except Exception as ex:
+            error = type(ex).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            stack.pop()
+            self.observe(name, duration)
+            if self.log_file is not None:
+                record = {'span': name, 'start': round(started_at, 6), 'seconds': round(duration, 6),
+                          'parent': parent, 'thread': threading.current_thread().name}
+                if error is not None:
+                    record['error'] = error
+                record.update(fields)
+                self.write(record)
+
+    def counter(self, name):
+        with self.lock:
+            return self.counters.get(name, 0)
+
+    def event(self, name, **fields):
+        self.count(name)
+        if self.log_file is not None:
+            self.write(dict({'event': name, 'time': round(time.time(), 6), 'thread': threading.current_thread().name}, **fields))
+
+    def write(self, record):
+        line = json.dumps(record, default=str)
+        with self.lock:
+            self.log_file.write(line + '\n')
+
+    def text(self):
+        """The metrics in the Prometheus text format"""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            timers = sorted((name, list(timer)) for name, timer in self.timers.items())
+        tool = self.tool.replace('"', '')
+        labels = f'tool="{tool}"'
+        if self.process is not None:
+            # the scraper merges the files, the series of each process must differ
+            process = self.process.replace('"', '')
+            labels += f',process="{process}"'
+        lines = ['# TYPE vge_count counter']
+        lines += [f'vge_count{{{labels},name="{name}"}} {value}' for name, value in counters]
+        lines += ['# TYPE vge_seconds summary']
+        for name, (count, total, longest) in timers:
+            lines += [f'vge_seconds_count{{{labels},name="{name}"}} {count}',
+                      f'vge_seconds_sum{{{labels},name="{name}"}} {total:.6f}',
+                      f'vge_seconds_max{{{labels},name="{name}"}} {longest:.6f}']
+        return '\n'.join(lines) + '\n'
+
+    def flush(self):
+        if self.folder is None:
+            return
+        name = self.tool if self.process is None else f'{self.tool}-{self.process}'
+        filename = os.path.join(self.folder, f'{name}.prom')
+        # written aside then renamed, a scraper never reads a partial file
+        temp_filename = f'{filename}.{os.getpid()}.tmp'
+        with open(temp_filename, 'w') as file:
+            file.write(self.text())
+        os.replace(temp_filename, filename)
+
+    def flush_loop(self):
+        while True:
+            time.sleep(FLUSH_SECONDS)
+            try:
+                self.flush()
+            except OSError as ex:
+                print(f'WARNING : cannot write the metrics, {ex}')
+
+
+metrics = Metrics()
+count = metrics.count
+timer = metrics.timer
+span = metrics.span
+event = metrics.event
+flush = metrics.flush
+start_process = metrics.start_process
+
+
+def timed(name):
+    """Decorator timing each call of the function"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced(name, *counters):
+    """Decorator logging each call of the function as a span, with how much the counters grew during the call"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            before = [metrics.counter(counter) for counter in counters]
+            with metrics.span(name) as fields:
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    for counter, value in zip(counters, before):
+                        fields[counter] = metrics.counter(counter) - value
+        return wrapper
+    return decorator
+
+
+class StackSampler:
+    """Sample the stacks of all the threads, counted by collapsed stack "thread;outer;...;inner" """
+
+    def __init__(self, interval=SAMPLE_SECONDS):
+        self.interval = interval
+        self.stacks = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True, name='stack-sampler')
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                calls = []
+                while frame is not None:
+                    code = frame.f_code
+                    calls.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                stack = ';'.join([names.get(ident, str(ident))] + calls[::-1])
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def stop(self, filename):
+        self.stop_event.set()
+        self.thread.join()
+        with open(filename, 'w') as file:
+            for stack, samples in sorted(self.stacks.items()):
+                file.write(f'{stack} {samples}\n')
+        print(f'Wrote {sum(self.stacks.values())} stack samples to {filename}')
+
+
+def run(tool, main):
+    """Run the entry point of a tool with the metrics and the profiler asked by the environment"""
+    folder = os.environ.get(ENV_METRICS)
+    metrics.configure(tool, folder)
+    profiler = os.environ.get(ENV_PROFILE)
+    prefix = os.path.join(folder or os.curdir, f'{tool}-{os.getpid()}')
+    if profiler == 'cprofile':
+        import cProfile
+        import pstats
+        profile = cProfile.Profile()
+        try:
+            with metrics.span(f'{tool}.main'):
+                return profile.runcall(main)
+        finally:
+            profile.dump_stats(f'{prefix}.prof')
+            pstats.Stats(profile, stream=sys.stderr).sort_stats('cumulative').print_stats(PROFILE_TOP)
+    if profiler == 'sample':
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            with metrics.span(f'{tool}.main'):
+                return main()
+        finally:
+            sampler.stop(f'{prefix}.folded')
+    if profiler:
+        print(f'WARNING : unknown profiler [{profiler}], use cprofile or sample')
+    with metrics.span(f'{tool}.main'):
+        return main()
@@ -0,0 +1,47 @@
+"""
+Media sanity probe of a video : duration, streams, and whether the first seconds actually decode
+
+The result is cached beside the video as "<video>.probe.json", so a preflight run on an unchanged event is instant.
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+from MediaTools.cache import load_json_cache, save_json_cache, source_stamp
+from MediaTools.ffmpeg import FFmpegException, run_ffmpeg, run_ffprobe
+
+CACHE_SUFFIX = 'probe.json'
+# seconds decoded to make sure the video is not only a valid container
+DECODE_SECONDS = 2
+
+
+def build_probe(media_file):
+    """{duration, video, audio, decode_error} of the media file, video and audio are None without such stream"""
+    info = run_ffprobe(['-show_entries', 'format=duration:stream=codec_type,codec_name,width,height,sample_rate,channels',
+                        media_file])
+    streams = info.get('streams', [])
+    video = next((stream for stream in streams if stream.get('codec_type') == 'video'), None)
+    audio = next((stream for stream in streams if stream.get('codec_type') == 'audio'), None)
+    duration = info.get('format', {}).get('duration')
+    probe = {
+        'duration': float(duration) if duration not in (None, 'N/A') else None,
+        'video': {'codec': video.get('codec_name'), 'width': video.get('width'), 'height': video.get('height')} if video else None,
+        'audio': {'codec': audio.get('codec_name'), 'sample_rate': int(audio.get('sample_rate', 0)),
+                  'channels': audio.get('channels')} if audio else None,
+        'decode_error': None,
+    }
+    try:
+        run_ffmpeg(['-xerror', '-i', media_file, '-t', str(DECODE_SECONDS), '-f', 'null', '-'])
+    except FFmpegException as ex:
+        probe['decode_error'] = str(ex)
+    return probe
+
+
+def probe_media(media_file):
+    """The cached probe of the media file, probe it again if it changed since"""
+    probe = load_json_cache(media_file, CACHE_SUFFIX)
+    if probe is None:
+        stamp = source_stamp(media_file)
+        probe = build_probe(media_file)
+        save_json_cache(media_file, CACHE_SUFFIX, probe, stamp)
+    return probe
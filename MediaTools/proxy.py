@@ -0,0 +1,79 @@
+"""
+Low resolution proxy of a match video for smooth review on modest laptops
+
+The proxy is 360p with a keyframe every 10 frames, so seeking and frame stepping never decode much, and it keeps
+the frame rate and timestamps of the original, so the time shown while reviewing the proxy is the time in the
+original video. It's saved beside the video as "<video>.proxy.mkv", not ending with ".mp4" on purpose so it's
+never taken for a team upload.
+
+Usage: python -m MediaTools.proxy video.mp4|folder ...
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import sys
+import argparse
+
+from MediaTools import cache, metrics
+from MediaTools.ffmpeg import FFmpegException, run_ffmpeg
+
+PROXY_SUFFIX = 'proxy.mkv'
+CACHE_SUFFIX = 'proxy.json'
+PROXY_HEIGHT = 360
+PROXY_GOP = 10
+
+
+def proxy_for(media_file):
+    """The proxy file of the video if it exists and is up to date, otherwise None"""
+    data = cache.load_json_cache(media_file, CACHE_SUFFIX)
+    if data is None:
+        return None
+    proxy_file = cache.cache_path(media_file, PROXY_SUFFIX)
+    if not os.path.exists(proxy_file):
+        return None
+    return proxy_file
+
+
+def generate_proxy(media_file):
+    """Transcode the proxy, it's written to a temporary file first so a partial proxy is never opened"""
+    stamp = cache.source_stamp(media_file)
+    proxy_file = cache.cache_path(media_file, PROXY_SUFFIX)
+    partial_file = cache.cache_path(media_file, f'partial.{PROXY_SUFFIX}')
+    run_ffmpeg(['-y', '-i', media_file, '-map', '0:v:0', '-map', '0:a:0?',
+                '-vf', f'scale=-2:{PROXY_HEIGHT}', '-vsync', 'passthrough',
+                '-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'fastdecode', '-crf', '28',
+                '-g', str(PROXY_GOP), '-keyint_min', str(PROXY_GOP), '-sc_threshold', '0',
+                '-c:a', 'aac', '-b:a', '96k', partial_file])
+    os.replace(partial_file, proxy_file)
+    cache.save_json_cache(media_file, CACHE_SUFFIX, {'height': PROXY_HEIGHT, 'gop': PROXY_GOP}, stamp)
+    return proxy_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate low resolution proxies of match videos for review')
+    parser.add_argument('paths', nargs='+', help='Video files, or folders to search for mp4 files')
+    args = parser.parse_args()
+    media_files = []
+    for media_path in args.paths:
+        if os.path.isdir(media_path):
+            for folder, _, files in os.walk(media_path):
+                media_files += [os.path.join(folder, name) for name in sorted(files) if name.lower().endswith('.mp4')]
+        else:
+            media_files.append(media_path)
+    failed = 0
+    for media_file in media_files:
+        if proxy_for(media_file) is not None:
+            print(f'Proxy of [{media_file}] is up to date')
+            continue
+        try:
+            print(f'Generated proxy [{generate_proxy(media_file)}]')
+        except FFmpegException as ex:
+            print(f'ERROR : cannot generate proxy of [{media_file}], {ex}')
+            failed += 1
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    metrics.run('proxy', main)
@@ -0,0 +1,377 @@
+"""
+Content-hash store of the videos of the event tree, to keep a single copy of each video on the shared drive
+
+A video is stored three times or more : the team upload, its copy in "Game Matches", sometimes a second upload of
+the same file, or the same file uploaded in the wrong match folder. The store hashes the videos of the event tree
+(SHA-256, cached by size and modification time in "<root>.store.db" beside the event root, the same as the
+catalog) and replaces the identical files by hard links to a single object in "<root>/.store", so they take the
+space of one.
+
+ - report : size of the videos per match and per team, what is actually used on disk, and the duplicates
+ - dedup : link the identical videos of the published matches, and warn about the same video uploaded in several
+   match folders
+ - archive : move the team uploads of the published matches to a zip file per match in a cold storage folder
+
+TRICKY : the linked files are the same file, a tool writing into one in place changes all of them. The tools of
+this repository only write new files and rename them over the previous ones, which breaks the link instead, but a
+team (or its sync client) may write into its upload in place. So the videos are only linked once their match is
+published : a reviewed video which is not rendered yet must not change under the referee.
+
+Usage: python -m MediaTools.store path/to/event/root report|dedup|archive [--cold path/to/cold/storage] [--dry-run]
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import os
+import re
+import sys
+import shutil
+import sqlite3
+import hashlib
+import zipfile
+import argparse
+
+from Manifest import files
+from Manifest.catalog import PATTERN_VIDEO_MANIFEST
+from Manifest.layout import FOLDER_MATCH, FOLDER_PUBLISHED, FOLDER_TEAM, PATTERN_MATCH_FOLDER, PATTERN_TEAM_FOLDER, \
+    PATTERN_UPLOAD_MATCH_FOLDER
+from MediaTools import metrics
+
+FOLDER_STORE = '.store'
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.mkv', '.avi', '.m4v')
+PATTERN_PUBLISHED = re.compile(r'^match([0-9]+)\.mp4$', re.IGNORECASE)
+HASH_CHUNK = 1 << 20
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS hashes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT);
+'''
+
+
+class VideoFile:
+    __slots__ = ('path', 'match', 'team', 'kind', 'stat')
+
+    def __init__(self, path, match, team, kind, stat):
+        self.path = path
+        # None when the file is not in a match or team folder
+        self.match = match
+        self.team = team
+        # FOLDER_TEAM, FOLDER_MATCH or FOLDER_PUBLISHED
+        self.kind = kind
+        self.stat = stat
+
+    @property
+    def inode(self):
+        return self.stat.st_dev, self.stat.st_ino
+
+
+def default_store_file(root_folder):
+    return f'{os.path.normpath(os.path.abspath(root_folder))}.store.db'
+
+
+def is_video(name):
+    return name.lower().endswith(VIDEO_EXTENSIONS) and not name.startswith('.')
+
+
+def scan_videos(root_folder):
+    """[VideoFile] of the team uploads, the match videos and the published videos"""
+    videos = []
+    upload_folder = os.path.join(root_folder, FOLDER_TEAM)
+    if os.path.isdir(upload_folder):
+        for team_entry in os.scandir(upload_folder):
+            team_parts = PATTERN_TEAM_FOLDER.match(team_entry.name)
+            if not team_entry.is_dir() or team_parts is None:
+                continue
+            for folder, _, names in os.walk(team_entry.path):
+                match_parts = PATTERN_UPLOAD_MATCH_FOLDER.match(os.path.basename(folder))
+                match = int(match_parts.group(1)) if match_parts else None
+                for name in filter(is_video, names):
+                    path = os.path.join(folder, name)
+                    videos.append(VideoFile(path, match, int(team_parts.group(1)), FOLDER_TEAM, os.stat(path)))
+    matches_folder = os.path.join(root_folder, FOLDER_MATCH)
+    if os.path.isdir(matches_folder):
+        for match_entry in os.scandir(matches_folder):
+            match_parts = PATTERN_MATCH_FOLDER.match(match_entry.name)
+            if not match_entry.is_dir() or match_parts is None:
+                continue
+            for entry in os.scandir(match_entry.path):
+                if entry.is_file() and is_video(entry.name):
+                    # the video has the name of its manifest, match1-red-team16031.mp4
+                    team_parts = PATTERN_VIDEO_MANIFEST.match(f'{os.path.splitext(entry.name)[0]}.yml')
+                    team = int(team_parts.group(3)) if team_parts else None
+                    videos.append(VideoFile(entry.path, int(match_parts.group(1)), team, FOLDER_MATCH, entry.stat()))
+    published_folder = os.path.join(root_folder, FOLDER_PUBLISHED)
+    if os.path.isdir(published_folder):
+        for entry in os.scandir(published_folder):
+            parts = PATTERN_PUBLISHED.match(entry.name)
+            if entry.is_file() and parts:
+                videos.append(VideoFile(entry.path, int(parts.group(1)), None, FOLDER_PUBLISHED, entry.stat()))
+    return videos
+
+
+def file_hash(filename):
+    digest = hashlib.sha256()
+    with open(filename, 'rb', buffering=0) as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(source, destination):
+    """Hard link the destination to the source, copy it where the drive doesn't support hard links"""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def replace_with_link(source, destination):
+    """Replace the destination by a hard link to the source, atomically"""
+    temp_filename = os.path.join(os.path.dirname(destination), f'.{os.path.basename(destination)}.link.tmp')
+    os.link(source, temp_filename)
+    try:
+        files.replace(temp_filename, destination)
+    except BaseException:
+        os.remove(temp_filename)
+        raise
+
+
+class ContentStore:
+
+    def __init__(self, root_folder, db_file=None):
+        self.root_folder = os.path.abspath(root_folder)
+        self.store_folder = os.path.join(self.root_folder, FOLDER_STORE)
+        self.db_file = db_file if db_file is not None else default_store_file(root_folder)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def hash(self, video):
+        """The content hash of the video, only read again when its size or modification time changed"""
+        path = os.path.normpath(video.path)
+        row = self.conn.execute('SELECT * FROM hashes WHERE path = ?', (path,)).fetchone()
+        if row is not None and (row['size'], row['mtime_ns']) == (video.stat.st_size, video.stat.st_mtime_ns):
+            return row['hash']
+        digest = file_hash(path)
+        self.remember(path, video.stat, digest)
+        return digest
+
+    def remember(self, path, stat, digest):
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?)',
+                              (os.path.normpath(path), stat.st_size, stat.st_mtime_ns, digest))
+
+    def object_path(self, digest, extension):
+        return os.path.join(self.store_folder, digest[:2], f'{digest}{extension.lower()}')
+
+    def hash_videos(self, videos):
+        """{hash: [VideoFile]} of the videos, the hashes of the videos not there anymore are forgotten"""
+        by_hash = {}
+        for video in videos:
+            by_hash.setdefault(self.hash(video), []).append(video)
+        paths = {os.path.normpath(video.path) for video in videos}
+        with self.conn:
+            self.conn.executemany('DELETE FROM hashes WHERE path = ?', [
+                (row['path'],) for row in self.conn.execute('SELECT path FROM hashes') if row['path'] not in paths])
+        return by_hash
+
+    def dedup(self, dry_run=False):
+        """Link the identical videos of the published matches to one object of the store, return the bytes freed"""
+        freed = 0
+        all_videos = scan_videos(self.root_folder)
+        published = {video.match for video in all_videos if video.kind == FOLDER_PUBLISHED}
+        for digest, videos in self.hash_videos(all_videos).items():
+            report_misplaced(videos)
+            linked = [video for video in videos if video.kind == FOLDER_PUBLISHED or video.match in published]
+            if len(linked) < len(videos) and len({video.inode for video in videos}) > 1:
+                print(f'Not linking {len(videos) - len(linked)} copies of [{videos[0].path}] before their match is published')
+            extension = os.path.splitext(videos[0].path)[1]
+            target = self.object_path(digest, extension)
+            if not linked or len(linked) == 1 and not os.path.exists(target):
+                continue
+            if not os.path.exists(target):
+                if dry_run:
+                    target = linked[0].path
+                else:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    try:
+                        os.link(linked[0].path, target)
+                    except OSError as ex:
+                        print(f'WARNING : cannot link [{linked[0].path}] into the store, {ex}')
+                        continue
+            target_inode = (os.stat(target).st_dev, os.stat(target).st_ino)
+            for video in linked:
+                if video.inode == target_inode:
+                    continue
+                if not dry_run:
+                    try:
+                        replace_with_link(target, video.path)
+                    except OSError as ex:
+                        print(f'WARNING : cannot link [{video.path}], {ex}')
+                        continue
+                    # a link has the modification time of the object, not hashed again on the next run
+                    self.remember(video.path, os.stat(video.path), digest)
+                # the space of the file is only freed with its last link
+                if video.stat.st_nlink == 1:
+                    freed += video.stat.st_size
+                print(f'{"Would link" if dry_run else "Linked"} [{video.path}] to its identical copy')
+        if not dry_run:
+            freed += self.collect_garbage()
+        return freed
+
+    def collect_garbage(self):
+        """Remove the objects only the store still links to, return the bytes freed"""
+        freed = 0
+        if not os.path.isdir(self.store_folder):
+            return freed
+        for folder, _, names in os.walk(self.store_folder):
+            for name in names:
+                path = os.path.join(folder, name)
+                stat = os.stat(path)
+                if stat.st_nlink == 1:
+                    os.remove(path)
+                    freed += stat.st_size
+        return freed
+
+
+def report_misplaced(videos):
+    """Warn about the same video uploaded twice, or uploaded for several matches"""
+    uploads = [video for video in videos if video.kind == FOLDER_TEAM]
+    if len(uploads) > 1:
+        matches = sorted({video.match for video in uploads if video.match is not None})
+        reason = f'uploaded for matches {matches}, one is in the wrong match folder' if len(matches) > 1 else 'uploaded twice'
+        print(f'WARNING : the same video is {reason} :\n' + '\n'.join(f'    {video.path}' for video in uploads))
+
+
+def duplicate_bytes(by_hash):
+    """Bytes dedup would free, the identical videos not linked together yet"""
+    duplicates = 0
+    for videos in by_hash.values():
+        inodes = {video.inode: video.stat.st_size for video in videos}
+        duplicates += sum(inodes.values()) - videos[0].stat.st_size
+    return duplicates
+
+
+def storage_report(videos):
+    """({match: (bytes, bytes on disk)}, {team: (bytes, bytes on disk)}, (bytes, bytes on disk)) of the videos
+
+    The bytes on disk count each file linked several times once, for the whole event, a match or a team.
+    """
+    def usage(group):
+        inodes = {}
+        for video in group:
+            inodes[video.inode] = video.stat.st_size
+        return sum(video.stat.st_size for video in group), sum(inodes.values())
+
+    by_match, by_team = {}, {}
+    for video in videos:
+        if video.match is not None:
+            by_match.setdefault(video.match, []).append(video)
+        if video.team is not None:
+            by_team.setdefault(video.team, []).append(video)
+    return ({match: usage(group) for match, group in by_match.items()},
+            {team: usage(group) for team, group in by_team.items()},
+            usage(videos))
+
+
+def size_text(size):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}TB'
+
+
+def print_storage_report(videos):
+    by_match, by_team, total = storage_report(videos)
+    print(f'{"Match":>8} {"Videos":>10} {"On disk":>10}')
+    for match, (size, on_disk) in sorted(by_match.items()):
+        print(f'{match:>8} {size_text(size):>10} {size_text(on_disk):>10}')
+    print(f'{"Team":>8} {"Videos":>10} {"On disk":>10}')
+    for team, (size, on_disk) in sorted(by_team.items()):
+        print(f'{team:>8} {size_text(size):>10} {size_text(on_disk):>10}')
+    print(f'Total : {len(videos)} videos, {size_text(total[0])}, {size_text(total[1])} on disk')
+
+
+def archive_uploads(root_folder, cold_folder, dry_run=False):
+    """Move the team uploads of the published matches to "<cold>/match<N>-uploads.zip", return the archived matches
+
+    The videos are already compressed, they are stored in the zip file as they are, compressing them again would
+    cost a lot of time for almost no space. The uploads are removed once the zip file is read back and verified.
+    """
+    uploads = {}
+    for video in scan_videos(root_folder):
+        if video.kind == FOLDER_TEAM and video.match is not None:
+            uploads.setdefault(video.match, []).append(video)
+    archived = []
+    for match, videos in sorted(uploads.items()):
+        if not os.path.isfile(os.path.join(root_folder, FOLDER_PUBLISHED, f'match{match}.mp4')):
+            continue
+        archive = os.path.join(cold_folder, f'match{match}-uploads.zip')
+        print(f'{"Would archive" if dry_run else "Archiving"} {len(videos)} uploads of match #{match} to [{archive}]')
+        if dry_run:
+            archived.append(match)
+            continue
+        with files.atomic_open(archive, 'wb') as file:
+            with zipfile.ZipFile(file, 'w') as zip_file:
+                for video in videos:
+                    name = os.path.relpath(video.path, os.path.join(root_folder, FOLDER_TEAM))
+                    zip_file.write(video.path, name, compress_type=zipfile.ZIP_STORED)
+        with zipfile.ZipFile(archive) as zip_file:
+            broken = zip_file.testzip()
+        if broken is not None:
+            print(f'ERROR : [{archive}] is corrupted at [{broken}], the uploads of match #{match} are kept')
+            continue
+        for video in videos:
+            os.remove(video.path)
+        archived.append(match)
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate the videos of the event tree, report and archive them')
+    parser.add_argument('root', type=str, help='The root folder of the event')
+    parser.add_argument('action', choices=['report', 'dedup', 'archive'], help='What to do')
+    parser.add_argument('--cold', type=str, default=None, help='The cold storage folder of archive')
+    parser.add_argument('--dry-run', action='store_true', help='Only tell what would be done')
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        print(f'ERROR : root folder [{args.root}] not exists')
+        sys.exit(1)
+    if args.action == 'report':
+        store = ContentStore(args.root)
+        try:
+            by_hash = store.hash_videos(scan_videos(args.root))
+        finally:
+            store.close()
+        for videos in by_hash.values():
+            report_misplaced(videos)
+        print(f'Identical videos not linked yet : {size_text(duplicate_bytes(by_hash))}, run dedup to free it')
+    elif args.action == 'dedup':
+        store = ContentStore(args.root)
+        try:
+            freed = store.dedup(args.dry_run)
+        finally:
+            store.close()
+        print(f'{"Would free" if args.dry_run else "Freed"} {size_text(freed)}')
+    elif args.action == 'archive':
+        if args.cold is None or not os.path.isdir(args.cold):
+            print(f'ERROR : cold storage folder [{args.cold}] not exists')
+            sys.exit(1)
+        archived = archive_uploads(args.root, args.cold, args.dry_run)
+        if not args.dry_run:
+            # the objects of the archived uploads, when nothing else links to them anymore
+            store = ContentStore(args.root)
+            try:
+                freed = store.collect_garbage()
+            finally:
+                store.close()
+            print(f'Archived the uploads of {len(archived)} matches, freed {size_text(freed)} from the store')
+    print_storage_report(scan_videos(args.root))
+
+
+if __name__ == '__main__':
+    metrics.run('store', main)
@@ -1 +1,5 @@
-import GameProducer.__main__
+from GameProducer.__main__ import main
+from MediaTools import metrics
+
+if __name__ == '__main__':
+    metrics.run('game-producer', main)
@@ -1,4 +1,5 @@
 from MatchVideoProcesser.__main__ import main
+from MediaTools import metrics
 
 if __name__ == '__main__':
-    main()
+    metrics.run('match-video-processer', main)
@@ -0,0 +1,26 @@
+"""
+Shared fixtures of the tests, a small synthetic event from EventPlanner.fixtures
+
+Author: FTC team #16031 Parabellum
+Date: 19 Oct 2026
+"""
+
+import pytest
+
+from EventPlanner import fixtures
+
+MATCH_COUNT = 40
+TEAM_COUNT = 16
+
+
+@pytest.fixture(scope='session')
+def event(tmp_path_factory):
+    """(db file, root folder, counts) of an event with its matches in every state of the review, not to be changed"""
+    return fixtures.create_fixture(str(tmp_path_factory.mktemp('fixture')), MATCH_COUNT, TEAM_COUNT, seed=1)
+
+
+@pytest.fixture
+def event_copy(tmp_path):
+    """(db file, root folder) of a new event each test, to be changed"""
+    db_file, root_folder, _ = fixtures.create_fixture(str(tmp_path), MATCH_COUNT, TEAM_COUNT, seed=1)
+    return db_file, root_folder
@@ -0,0 +1,28 @@
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from GameProducer.__main__ import MIX_PEAK_LIMIT, audio_mix_filter
+
+
+def test_audio_mix_filter():
+    graph = audio_mix_filter([None, 1.5, -3, None])
+    assert '[1:a]aformat=channel_layouts=mono,volume=1.50dB,' in graph
+    assert '[3:a]aformat=channel_layouts=mono,pan=' in graph
+    # the auto level of alimiter scales the output up by 1 / limit
+    assert graph.endswith(f'alimiter=limit={MIX_PEAK_LIMIT}:level=disabled[a]')
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg not found')
+def test_audio_mix_peak(tmp_path):
+    hot = str(tmp_path / 'hot.wav')
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=f=440:d=2', '-af', 'volume=12dB',
+                    '-ac', '1', '-y', hot], check=True)
+    graph = audio_mix_filter([None] * 4)[:-len('[a]')] + ',volumedetect'
+    result = subprocess.run(['ffmpeg', '-hide_banner'] + ['-i', hot] * 4 + ['-filter_complex', graph, '-f', 'null', '-'],
+                            capture_output=True, text=True, check=True)
+    peak = float(re.search(r'max_volume: (-?[0-9.]+) dB', result.stderr).group(1))
+    # -1 dBFS ceiling
+    assert -1.5 <= peak <= -0.9
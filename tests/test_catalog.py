@@ -0,0 +1,36 @@
+import os
+
+import yaml
+
+from Manifest import files
+from Manifest.catalog import Catalog
+from Manifest.loader import load_video_manifest
+
+
+def test_incremental_refresh(event_copy, tmp_path):
+    _, root_folder = event_copy
+    catalog = Catalog(root_folder, str(tmp_path / 'catalog.db'))
+    try:
+        assert catalog.refresh()
+        # nothing changed, nothing parsed again
+        assert catalog.refresh() == []
+        match = catalog.reviewed_matches()[0]
+        video_manifest = catalog.conn.execute('SELECT path FROM videos WHERE match = ? ORDER BY path', (match,)).fetchone()[0]
+        row = catalog.conn.execute('SELECT * FROM videos WHERE path = ?', (video_manifest,)).fetchone()
+        assert row['score'] == load_video_manifest(video_manifest).score
+        assert len(catalog.game_events(match, row['alliance'], row['team_number'])) == \
+            len(load_video_manifest(video_manifest).events)
+
+        with open(video_manifest) as file:
+            content = yaml.safe_load(file)
+        content['GameEvents'][0]['Point'] += 1000
+        files.safe_dump(content, video_manifest)
+        assert catalog.refresh() == [video_manifest]
+        assert catalog.video(match, row['alliance'], row['team_number'])['score'] == row['score'] + 1000
+
+        os.remove(video_manifest)
+        assert catalog.refresh() == [video_manifest]
+        assert catalog.video(match, row['alliance'], row['team_number']) is None
+        assert match not in catalog.reviewed_matches()
+    finally:
+        catalog.close()
@@ -0,0 +1,53 @@
+import os
+import stat
+import sys
+
+import pytest
+import yaml
+
+from Manifest import files
+from Manifest.journal import ManifestJournal
+
+
+def mode(filename):
+    return stat.S_IMODE(os.stat(filename).st_mode)
+
+
+def test_safe_dump(tmp_path):
+    filename = str(tmp_path / 'match1.yml')
+    files.safe_dump({'Match': 1}, filename)
+    with open(filename) as file:
+        assert yaml.safe_load(file) == {'Match': 1}
+    assert os.listdir(tmp_path) == ['match1.yml']
+
+
+def test_failed_write_keeps_the_manifest(tmp_path):
+    filename = str(tmp_path / 'match1.yml')
+    files.safe_dump({'Match': 1}, filename)
+    with pytest.raises(RuntimeError):
+        with files.atomic_open(filename) as file:
+            file.write('partial')
+            raise RuntimeError()
+    with open(filename) as file:
+        assert yaml.safe_load(file) == {'Match': 1}
+    assert os.listdir(tmp_path) == ['match1.yml']
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_file_mode(tmp_path):
+    # the same mode as a plain open('w'), not the owner only mode of tempfile.mkstemp
+    plain = str(tmp_path / 'plain.yml')
+    with open(plain, 'w') as file:
+        file.write('{}')
+    new = str(tmp_path / 'new.yml')
+    files.safe_dump({}, new)
+    assert mode(new) == mode(plain)
+
+    # the mode of the replaced file is kept
+    os.chmod(new, 0o640)
+    files.safe_dump({'Match': 1}, new)
+    assert mode(new) == 0o640
+
+    journal = ManifestJournal(str(tmp_path / 'match1-red-team1.mp4'))
+    journal.rewrite(None, [(10, 'Parking', 5)])
+    assert mode(journal.filename) == mode(plain)
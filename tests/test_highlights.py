@@ -0,0 +1,52 @@
+from GameProducer.highlights import collect_highlights, match_highlights, rank_highlights
+from GameProducer.preflight import find_match_manifests
+from GameProducer.worker import published_filename
+from Manifest.loader import load_match_manifest
+from Manifest.model import GameEvent
+
+
+def partly_reviewed_matches(root_folder):
+    """{match: manifest} of the matches with some video manifests but not all"""
+    matches = {}
+    for match, manifest in find_match_manifests(root_folder).items():
+        game = load_match_manifest(manifest, load_videos=True, check_files=False)
+        reviewed = [team for team in game.teams if team.video.game_start_offset is not None]
+        if 0 < len(reviewed) < len(game.teams):
+            matches[match] = manifest
+    return matches
+
+
+def test_partly_reviewed_match(event):
+    _, root_folder, _ = event
+    partly = partly_reviewed_matches(root_folder)
+    assert partly
+    for match, manifest in partly.items():
+        highlights = match_highlights(root_folder, match, manifest)
+        # only the reviewed teams have events, from their own video
+        assert all(highlight.team.video.game_start_offset is not None for highlight in highlights)
+        assert all(highlight.source == highlight.team.video.location for highlight in highlights)
+
+
+def test_collect_highlights(event):
+    _, root_folder, _ = event
+    highlights = collect_highlights(root_folder)
+    assert highlights
+    # the published matches are cut from their composite video
+    assert any(highlight.source == published_filename(root_folder, highlight.match) for highlight in highlights)
+
+
+class Item:
+    def __init__(self, description, point):
+        self.event = GameEvent(0, description, point)
+
+
+def test_rank_highlights():
+    items = [Item('Robot Parked', 5), Item('Minor Penalty, late', -10), Item('Power Shot Target Knocked(auton)', 15),
+             Item('Wobble Goal Delivered to Drop Zone', 20), Item('Power Shot Target Knocked(endgame)', 15)]
+    ranked = rank_highlights(items, top=3)
+    assert [item.event.point for item in ranked] == [20, 15, 15]
+    # the same points stay in order
+    assert ranked[1] is items[2]
+    assert all(item.event.point > 0 for item in rank_highlights(items))
+    assert [item.event.point for item in rank_highlights(items, ['penalty', 'parked'])] == [-10, 5]
+    assert [item.event.description for item in rank_highlights(items, ['power shot'], top=1)] == ['Power Shot Target Knocked(auton)']
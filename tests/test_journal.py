@@ -0,0 +1,31 @@
+from Manifest.journal import ManifestJournal
+
+
+def test_replay(tmp_path):
+    journal = ManifestJournal(str(tmp_path / 'match1-red-team1.mp4'))
+    assert journal.replay(12, [(20, 'Parking', 5)]) == (12, [(20, 'Parking', 5)])
+    journal.add_event(30, 'Ring', 3)
+    journal.add_event(25, 'Ring', 3)
+    journal.delete_event(20, 'Parking', 5)
+    assert journal.replay(12, [(20, 'Parking', 5)]) == (12, [(25, 'Ring', 3), (30, 'Ring', 3)])
+
+    # an accidental reset can be undone
+    journal.reset()
+    assert journal.replay(12, [(20, 'Parking', 5)]) == (None, [])
+    assert journal.replay(12, [(20, 'Parking', 5)], undo_last_reset=True) == (12, [(25, 'Ring', 3), (30, 'Ring', 3)])
+
+    journal.rewrite(14, [(40, 'Parking', 5)])
+    assert journal.replay(12, [(20, 'Parking', 5)]) == (14, [(40, 'Parking', 5)])
+    journal.discard()
+    assert journal.entries() == []
+
+
+def test_partial_line_of_a_crash(tmp_path):
+    journal = ManifestJournal(str(tmp_path / 'match1-red-team1.mp4'))
+    journal.add_event(30, 'Ring', 3)
+    with open(journal.filename, 'a') as file:
+        file.write('{"op": "add", "sec')
+    assert journal.replay() == (None, [(30, 'Ring', 3)])
+    # the next event isn't appended to the partial line
+    journal.add_event(31, 'Ring', 3)
+    assert journal.replay() == (None, [(30, 'Ring', 3), (31, 'Ring', 3)])
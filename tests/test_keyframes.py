@@ -0,0 +1,25 @@
+from MediaTools.keyframes import SEEK_ACCURATE, SEEK_COPY, SEEK_FAST, KeyframeIndex, plan_seek
+
+
+def test_plan_seek():
+    index = KeyframeIndex([4.0, 0.0, 2.0], 6.0)
+    assert plan_seek(index, 2.01).method == SEEK_FAST
+    assert plan_seek(index, 2.01).seek == 2.0
+    assert plan_seek(index, 2.0, allow_copy=True).method == SEEK_COPY
+    plan = plan_seek(index, 3.5)
+    # decoded from the previous keyframe
+    assert (plan.method, plan.seek) == (SEEK_ACCURATE, 3.5)
+    assert abs(plan.decode_seconds - 1.5) < 1e-9
+    assert plan.input_args() == '-ss 3.500'
+    assert plan_seek(index, 4.0).input_args() == '-noaccurate_seek -ss 4.000'
+    # no index, no keyframe to rely on
+    assert plan_seek(None, 3.5).method == SEEK_ACCURATE
+
+
+def test_keyframe_index():
+    index = KeyframeIndex([0.0, 2.0, 4.0], 6.0)
+    assert index.previous(3.9) == 2.0 and index.next(2.1) == 4.0
+    assert index.nearest(3.2) == 4.0
+    assert index.next(4.5) is None
+    assert index.max_gap() == 2.0
+    assert KeyframeIndex([], 6.0).nearest(1.0) is None
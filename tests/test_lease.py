@@ -0,0 +1,62 @@
+import os
+import stat
+import sys
+import threading
+
+import pytest
+
+from GameProducer.lease import Lease
+from Manifest import files
+
+
+def test_acquire(tmp_path):
+    filename = str(tmp_path / 'match1.lease')
+    lease = Lease(filename, 'worker1', settle_seconds=0)
+    assert lease.acquire()
+    assert not Lease(filename, 'worker2', settle_seconds=0).acquire()
+    lease.release()
+    assert not os.path.exists(filename)
+
+
+def test_acquire_without_hard_links(tmp_path, monkeypatch):
+    def link(source, destination):
+        raise PermissionError(1, 'Operation not permitted')
+
+    monkeypatch.setattr(os, 'link', link)
+    filename = str(tmp_path / 'match1.lease')
+    lease = Lease(filename, 'worker1', settle_seconds=0)
+    assert lease.acquire()
+    assert lease.read()['owner'] == 'worker1'
+    assert not Lease(filename, 'worker2', settle_seconds=0).acquire()
+    # no temporary file left behind
+    assert os.listdir(tmp_path) == ['match1.lease']
+
+
+def test_concurrent_acquire(tmp_path):
+    filename = str(tmp_path / 'match1.lease')
+    barrier = threading.Barrier(8)
+    won = []
+
+    def acquire(owner):
+        lease = Lease(filename, owner, settle_seconds=0.05)
+        barrier.wait()
+        if lease.acquire():
+            won.append(owner)
+
+    threads = [threading.Thread(target=acquire, args=(f'worker{no}',)) for no in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(won) == 1
+    assert Lease(filename, 'reader').read()['owner'] == won[0]
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_lease_readable_by_the_other_machines(tmp_path):
+    filename = str(tmp_path / 'match1.lease')
+    lease = Lease(filename, 'worker1', settle_seconds=0)
+    assert lease.acquire()
+    assert stat.S_IMODE(os.stat(filename).st_mode) == files.file_mode(str(tmp_path / 'new'))
+    assert lease.renew()
+    assert stat.S_IMODE(os.stat(filename).st_mode) == files.file_mode(str(tmp_path / 'new'))
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from Manifest.loader import ManifestException, load_match_manifest, load_video_manifest
+
+MATCH_MANIFEST = '''VirtualGame:
+  Name: 'Match #1'
+  Teams:
+  - TeamName: Parabellum
+    TeamNumber: 16031
+    Alliance: Red
+    GameVideo:
+      Location: videos/game.mp4
+      VideoManifest: videos/game.yml
+'''
+
+
+def write(filename, content=''):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'w') as file:
+        file.write(content)
+
+
+def test_paths_from_the_working_directory_first(tmp_path, monkeypatch):
+    # the errors of the single team match are collected, only the paths are checked
+    manifest = str(tmp_path / 'event' / 'match1.yml')
+    write(manifest, MATCH_MANIFEST)
+    write(str(tmp_path / 'event' / 'videos' / 'game.mp4'))
+    write(str(tmp_path / 'event' / 'videos' / 'game.yml'))
+    monkeypatch.chdir(tmp_path)
+    video = load_match_manifest(manifest, load_videos=False, errors=[]).teams[0].video
+    assert video.location == str(tmp_path / 'event' / 'videos' / 'game.mp4')
+    # a file there shadows the one beside the manifest, as GameProducer always did
+    write(str(tmp_path / 'videos' / 'game.mp4'))
+    video = load_match_manifest(manifest, load_videos=False, errors=[]).teams[0].video
+    assert video.location == str(tmp_path / 'videos' / 'game.mp4')
+    assert video.manifest_file == str(tmp_path / 'event' / 'videos' / 'game.yml')
+
+
+def test_late_game_start_is_a_manifest_error(tmp_path):
+    video_manifest = str(tmp_path / 'game.yml')
+    write(video_manifest, "GameStartOffset: '16:40'\nGameEvents:\n- Time: '16:50'\n  Description: Parking\n  Point: 5\n")
+    with pytest.raises(ManifestException) as info:
+        load_video_manifest(video_manifest)
+    assert info.value.errors[0].line == 1
+    assert 'later than 16:40' in info.value.message
+    write(video_manifest, "GameStartOffset: '16:39.500'\nGameEvents: []\n")
+    assert load_video_manifest(video_manifest).game_start_offset == 999.5
@@ -0,0 +1,37 @@
+import json
+import os
+
+from MediaTools.metrics import Metrics
+
+
+def test_counters_and_spans(tmp_path):
+    metrics = Metrics()
+    metrics.configure('tool', str(tmp_path))
+    metrics.count('catalog.indexed', 3)
+    with metrics.span('outer', match=1) as fields:
+        with metrics.timer('inner'):
+            pass
+        fields['rendered'] = True
+    metrics.flush()
+    text = (tmp_path / 'tool.prom').read_text()
+    assert 'vge_count{tool="tool",name="catalog.indexed"} 3' in text
+    assert 'vge_seconds_count{tool="tool",name="inner"} 1' in text
+    log_file = next(name for name in os.listdir(tmp_path) if name.endswith('.jsonl'))
+    metrics.log_file.close()
+    with open(tmp_path / log_file) as file:
+        record = json.loads(file.readline())
+    assert (record['span'], record['parent'], record['match'], record['rendered']) == ('outer', None, 1, True)
+
+
+def test_child_process(tmp_path):
+    metrics = Metrics()
+    metrics.configure('worker', str(tmp_path))
+    metrics.count('worker.render')
+    metrics.start_process('worker0')
+    # the counters of the parent are not counted again by its children
+    assert metrics.counter('worker.render') == 0
+    metrics.count('worker.render', 2)
+    metrics.flush()
+    text = (tmp_path / 'worker-worker0.prom').read_text()
+    assert 'vge_count{tool="worker",process="worker0",name="worker.render"} 2' in text
+    assert not (tmp_path / 'worker.prom').exists()
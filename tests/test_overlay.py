@@ -0,0 +1,29 @@
+from GameProducer.overlay import EVENT_SECONDS, overlay_timeline
+
+
+def test_empty_timeline():
+    assert overlay_timeline([]) == [(0, '', 'Score: 0')]
+
+
+def test_close_events_shown_together():
+    timeline = overlay_timeline([(5, 'Parking', 5), (8, 'Ring', 3)])
+    assert timeline == [(0, '', 'Score: 0'),
+                        (5, 'Parking: 5 points', 'Score: 5'),
+                        (8, 'Parking: 5 points / Ring: 3 points', 'Score: 8'),
+                        (8 + EVENT_SECONDS, '', 'Score: 8')]
+
+
+def test_far_events_cleared():
+    timeline = overlay_timeline([(5, 'Parking', 5), (5 + EVENT_SECONDS + 1, 'Minor Penalty', -10)])
+    assert timeline == [(0, '', 'Score: 0'),
+                        (5, 'Parking: 5 points', 'Score: 5'),
+                        (5 + EVENT_SECONDS, '', 'Score: 5'),
+                        (5 + EVENT_SECONDS + 1, 'Minor Penalty: -10 points', 'Score: -5'),
+                        (5 + 2 * EVENT_SECONDS + 1, '', 'Score: -5')]
+
+
+def test_event_without_points():
+    timeline = overlay_timeline([(1.5, 'Game start', None), (3, 'Ring', 3)])
+    assert timeline[1] == (1.5, 'Game start', 'Score: 0')
+    # only shown until the next event
+    assert timeline[2] == (3, 'Ring: 3 points', 'Score: 3')
@@ -0,0 +1,22 @@
+from MatchVideoProcesser.phases import TAB_AUTONOMOUS, TAB_END_GAME, TAB_TELEOP, GamePhaseMachine, phase_at
+
+
+def test_phase_at():
+    assert phase_at(-5).enabled_tabs is None
+    assert phase_at(0).enabled_tabs == {TAB_AUTONOMOUS}
+    # a referee can still add an autonomous event a little after the autonomous ends
+    assert phase_at(33).enabled_tabs == {TAB_AUTONOMOUS, TAB_TELEOP}
+    assert phase_at(35).current_tab == TAB_TELEOP
+    assert phase_at(130).current_tab == TAB_END_GAME
+    assert phase_at(200).enabled_tabs is None
+
+
+def test_machine_only_reports_changes():
+    changes = []
+    machine = GamePhaseMachine(changes.append)
+    for seconds in [-1, 0, 0.1, 10, 36, 36.5, 37]:
+        machine.update(seconds)
+    assert [phase.name for phase in changes] == ['Before Game', 'Autonomous', 'Teleop Start', 'Teleop']
+    machine.reset()
+    machine.update(37.1)
+    assert changes[-1].name == 'Teleop' and len(changes) == 5
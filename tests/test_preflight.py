@@ -0,0 +1,23 @@
+import yaml
+
+from GameProducer.preflight import LEVEL_ERROR, check_match, find_match_manifests
+from Manifest import files
+from Manifest.loader import load_match_manifest
+
+
+def test_late_game_start(event_copy):
+    _, root_folder = event_copy
+    match, manifest = next((match, manifest) for match, manifest in sorted(find_match_manifests(root_folder).items())
+                           if all(team.video.game_start_offset is not None
+                                  for team in load_match_manifest(manifest, errors=[]).teams))
+    video_manifest = load_match_manifest(manifest).teams[0].video.manifest_file
+    with open(video_manifest) as file:
+        content = yaml.safe_load(file)
+    content['GameStartOffset'] = '20:00'
+    content['GameEvents'] = []
+    files.safe_dump(content, video_manifest)
+
+    report = check_match(match, manifest)
+    assert not report.ok
+    assert any(issue.level == LEVEL_ERROR and video_manifest in issue.message and 'later than 16:40' in issue.message
+               for issue in report.issues)
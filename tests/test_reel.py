@@ -0,0 +1,31 @@
+from GameProducer.reel import encode_args, parameter_drift, reel_parameters
+
+# the parameters of a video published with the matroska defaults
+PARAMETERS = {
+    'duration': 1.0,
+    'video': {'codec': 'h264', 'profile': 'High', 'width': 320, 'height': 240, 'pix_fmt': 'yuv420p',
+              'frame_rate': '30/1', 'sample_aspect_ratio': '1:1'},
+    'audio': {'codec': 'vorbis', 'sample_rate': 48000, 'channels': 2, 'channel_layout': 'stereo'},
+}
+
+
+def test_reel_parameters():
+    reference = reel_parameters(PARAMETERS)
+    assert reference['video'] == PARAMETERS['video']
+    assert reference['audio']['codec'] == 'aac'
+    # the published video drifted from the reel, its video only can be copied
+    assert parameter_drift(reference, PARAMETERS) == ['audio codec vorbis instead of aac']
+    assert not parameter_drift(reference, PARAMETERS, ['video'])
+
+    vp9 = dict(PARAMETERS, video=dict(PARAMETERS['video'], codec='vp9', profile='Profile 0'))
+    assert reel_parameters(vp9)['video']['codec'] == 'h264'
+    assert reel_parameters(vp9)['video']['profile'] is None
+    assert reel_parameters(reel_parameters(PARAMETERS)) == reel_parameters(PARAMETERS)
+
+
+def test_encode_args():
+    args = encode_args(reel_parameters(PARAMETERS))
+    # never the experimental native vorbis encoder
+    assert args[args.index('-c:a') + 1] == 'aac'
+    assert args[args.index('-c:v') + 1] == 'libx264'
+    assert args[args.index('-profile:v') + 1] == 'high'
@@ -0,0 +1,39 @@
+import os
+
+from MatchVideoProcesser.review_queue import FOLDER_MATCH, ReviewQueue, video_manifest_filename
+
+
+def create_videos(root_folder, matches):
+    videos = []
+    for match in matches:
+        match_folder = os.path.join(root_folder, FOLDER_MATCH, f'Match #{match}')
+        os.makedirs(match_folder)
+        for name in [f'match{match}-blue-team2.mp4', f'match{match}-red-team1.mp4']:
+            videos.append(os.path.join(match_folder, name))
+            open(videos[-1], 'w').close()
+    return videos
+
+
+def test_queue_order(tmp_path):
+    # match 10 after match 2, not in the order of the names
+    videos = create_videos(str(tmp_path), [1, 2, 10])
+    queue = ReviewQueue(str(tmp_path))
+    assert queue.pending() == videos
+    assert queue.next() == videos[0]
+    assert queue.next(videos[3]) == videos[4]
+    # wraps around to the skipped videos
+    assert queue.next(videos[5]) == videos[0]
+
+
+def test_next_after_saved_video(tmp_path):
+    videos = create_videos(str(tmp_path), [1, 2, 3])
+    queue = ReviewQueue(str(tmp_path))
+    # the first video skipped, the second one saved
+    open(video_manifest_filename(videos[1]), 'w').close()
+    assert queue.next(videos[1]) == videos[2]
+    # the last one saved, back to the skipped one
+    open(video_manifest_filename(videos[5]), 'w').close()
+    assert queue.next(videos[5]) == videos[0]
+    for video in videos:
+        open(video_manifest_filename(video), 'w').close()
+    assert queue.next(videos[0]) is None
@@ -0,0 +1,122 @@
+import os
+import sqlite3
+
+from EventPlanner import scaffold
+from Manifest import layout
+
+
+def read_schedule(db_file):
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    quals = [dict(row) for row in conn.execute('SELECT * FROM quals')]
+    teams = {row['number']: row['name'] for row in conn.execute('SELECT * FROM teamInfo')}
+    conn.close()
+    return quals, teams
+
+
+def reviewed_position(root_folder, quals):
+    """(row, position) of a team with its video copied and reviewed"""
+    for match in quals:
+        match_folder = os.path.join(root_folder, layout.FOLDER_MATCH, f'Match #{match["match"]}')
+        for position, alliance in layout.POSITIONS:
+            prefix = scaffold.match_video_file_prefix(alliance, match[position], match['match'])
+            if os.path.isfile(os.path.join(match_folder, f'{prefix}.yml')):
+                return match, position
+    return None
+
+
+def test_alliance_swap(event_copy):
+    db_file, root_folder = event_copy
+    quals, teams = read_schedule(db_file)
+    match, position = reviewed_position(root_folder, quals)
+    number = match['match']
+    swapped = 'blue1' if position.startswith('red') else 'red1'
+    team, other_team = match[position], match[swapped]
+    match[position], match[swapped] = other_team, team
+    match_folder = os.path.join(layout.FOLDER_MATCH, f'Match #{number}')
+    old_files = sorted(name for name in os.listdir(os.path.join(root_folder, match_folder))
+                       if name.lower().startswith(f'match{number}-') and f'-team{team}.' in name)
+
+    diff = scaffold.diff_tree(root_folder, scaffold.plan_tree(quals, teams))
+    old_alliance, new_alliance = ('Red', 'Blue') if position.startswith('red') else ('Blue', 'Red')
+    # the copied video and the video manifest follow the team to its new alliance
+    renames = [(old, new) for old, new in diff.renames if os.path.dirname(old) == match_folder]
+    assert sorted(os.path.basename(old) for old, _ in renames if f'-team{team}.' in old) == old_files
+    for old, new in renames:
+        # the other team moved the other way
+        moved_from, moved_to = (old_alliance, new_alliance) if f'-team{team}.' in old else (new_alliance, old_alliance)
+        assert os.path.basename(new) == os.path.basename(old).replace(
+            f'-{moved_from.lower()}-', f'-{moved_to.lower()}-')
+    assert not diff.conflicts
+    assert 'rename' in diff.summary()
+
+    scaffold.apply_diff(root_folder, diff)
+    assert not diff.errors
+    game = scaffold.plan_tree(quals, teams).manifests[os.path.join(match_folder, f'match{number}.yml')]
+    video_manifest = next(entry['GameVideo']['VideoManifest'] for entry in game['VirtualGame']['Teams']
+                          if entry['TeamNumber'] == team)
+    assert os.path.isfile(os.path.join(root_folder, match_folder, video_manifest))
+    # the placeholder of the old alliance is removed from the renamed upload folder
+    _, upload_folder = scaffold.match_upload_folder(os.path.join(root_folder, layout.FOLDER_TEAM), team, teams[team],
+                                                    number, new_alliance)
+    assert sorted(name for name in os.listdir(upload_folder) if name.startswith('Please')) == \
+        [scaffold.upload_note(number, new_alliance)]
+    assert scaffold.diff_tree(root_folder, scaffold.plan_tree(quals, teams)).empty
+
+
+def test_unchanged_schedule(event):
+    db_file, root_folder, _ = event
+    quals, teams = read_schedule(db_file)
+    diff = scaffold.diff_tree(root_folder, scaffold.plan_tree(quals, teams))
+    assert diff.empty
+    assert not diff.orphans
+
+
+def test_team_rename(event_copy):
+    db_file, root_folder = event_copy
+    quals, teams = read_schedule(db_file)
+    team = quals[0]['red1']
+    old_folder = os.path.join(layout.FOLDER_TEAM, f'{team}-{teams[team]}')
+    teams[team] = 'Renamed Team'
+
+    diff = scaffold.diff_tree(root_folder, scaffold.plan_tree(quals, teams))
+    new_folder = os.path.join(layout.FOLDER_TEAM, f'{team}-Renamed Team')
+    # the uploads move with the folder, nothing is created again beneath it
+    assert diff.renames == [(old_folder, new_folder)]
+    assert not [folder for folder in diff.folders if folder.startswith(new_folder)]
+    assert not diff.orphans
+
+    scaffold.apply_diff(root_folder, diff)
+    assert not diff.errors
+    assert os.path.isdir(os.path.join(root_folder, new_folder))
+    assert not os.path.exists(os.path.join(root_folder, old_folder))
+    assert scaffold.diff_tree(root_folder, scaffold.plan_tree(quals, teams)).empty
+
+
+def test_orphan_match(event_copy):
+    db_file, root_folder = event_copy
+    quals, teams = read_schedule(db_file)
+    removed = quals.pop()
+    diff = scaffold.diff_tree(root_folder, scaffold.plan_tree(quals, teams))
+    assert os.path.join(layout.FOLDER_MATCH, f'Match #{removed["match"]}') in diff.orphans
+    assert not diff.renames
+    # orphans are reported, never removed
+    assert diff.empty
+
+
+def test_copies_of_older_versions_renamed(event_copy):
+    db_file, root_folder = event_copy
+    quals, teams = read_schedule(db_file)
+    match, position = reviewed_position(root_folder, quals)
+    alliance = dict(layout.POSITIONS)[position]
+    match_folder = os.path.join(layout.FOLDER_MATCH, f'Match #{match["match"]}')
+    prefix = scaffold.match_video_file_prefix(alliance, match[position], match['match'])
+    # the older versions copied the videos as "Red" / "Blue"
+    old_prefix = prefix.replace(f'-{alliance.lower()}-', f'-{alliance}-')
+    os.rename(os.path.join(root_folder, match_folder, f'{prefix}.mp4'), os.path.join(root_folder, match_folder, f'{old_prefix}.mp4'))
+
+    diff = scaffold.diff_tree(root_folder, scaffold.plan_tree(quals, teams))
+    assert diff.renames == [(os.path.join(match_folder, f'{old_prefix}.mp4'), os.path.join(match_folder, f'{prefix}.mp4'))]
+    scaffold.apply_diff(root_folder, diff)
+    assert not diff.errors
+    assert os.path.isfile(os.path.join(root_folder, match_folder, f'{prefix}.mp4'))
@@ -0,0 +1,73 @@
+import os
+
+from GameProducer.standings import (RESULT_LOSS, RESULT_TIE, RESULT_WIN, Standings, changed_matches,
+                                    read_schedule)
+from Manifest import layout
+from Manifest.catalog import Catalog
+
+QUALS = {1: {'Red': [1, 2], 'Blue': [3, 4]}, 2: {'Red': [1, 3], 'Blue': [2, 4]}}
+TEAMS = {number: f'Team {number}' for number in range(1, 5)}
+
+
+def video_scores(red, blue, red_penalty=0, blue_penalty=0, match=1):
+    """Scores of the four videos of a match, the alliance points split over its first team"""
+    (red1, red2), (blue1, blue2) = QUALS[match]['Red'], QUALS[match]['Blue']
+    return [('Red', red1, red, red // 2, 0, red_penalty), ('Red', red2, 0, 0, 0, 0),
+            ('Blue', blue1, blue, 0, blue // 2, blue_penalty), ('Blue', blue2, 0, 0, 0, 0)]
+
+
+def test_match_results():
+    standings = Standings(QUALS, TEAMS)
+    assert standings.match_results(1, video_scores(10, 20)[:3]) is None
+    results = standings.match_results(1, video_scores(10, 20, red_penalty=15))
+    # the penalties committed by an alliance are scored by the other one
+    assert (results['Red'].score, results['Red'].auton, results['Red'].end_game) == (10, 5, 0)
+    assert (results['Blue'].score, results['Blue'].auton, results['Blue'].end_game) == (35, 0, 10)
+    assert results['Red'].teams == [1, 2]
+
+
+def test_set_match():
+    standings = Standings(QUALS, TEAMS, surrogates={(2, 4)})
+    assert not standings.set_match(1, None)
+    assert standings.set_match(1, standings.match_results(1, video_scores(30, 20)))
+    assert standings.team(1).results[1] == (RESULT_WIN, 30, 15, 0)
+    assert standings.team(3).results[1] == (RESULT_LOSS, 20, 0, 10)
+    assert standings.team(1).ranking_points == 2 and standings.team(3).ranking_points == 0
+
+    # a match reviewed again replaces its results
+    assert standings.set_match(1, standings.match_results(1, video_scores(20, 20)))
+    assert [standings.team(number).results[1][0] for number in range(1, 5)] == [RESULT_TIE] * 4
+
+    # a surrogate match is not counted for the team
+    standings.set_match(2, standings.match_results(2, video_scores(10, 20, match=2)))
+    assert standings.team(2).results[2][0] == RESULT_WIN
+    assert 2 not in standings.team(4).results
+    assert standings.team(4).played == 1
+
+    assert standings.set_match(2, None)
+    assert all(2 not in standings.team(number).results for number in range(1, 5))
+
+
+def test_incremental_refresh(event_copy, tmp_path):
+    db_file, root_folder = event_copy
+    quals, surrogates, teams = read_schedule(db_file)
+    catalog = Catalog(root_folder, str(tmp_path / 'catalog.db'))
+    catalog.refresh()
+    standings = Standings(quals, teams, surrogates)
+    standings.refresh(catalog)
+    assert sorted(standings.results) == catalog.reviewed_matches()
+
+    # a review removed takes its match out of the standings
+    match = catalog.reviewed_matches()[0]
+    match_folder = os.path.join(root_folder, layout.FOLDER_MATCH, f'Match #{match}')
+    os.remove(os.path.join(match_folder, next(name for name in sorted(os.listdir(match_folder))
+                                              if name.endswith('.yml') and name != f'match{match}.yml')))
+    updated = changed_matches(catalog.refresh())
+    assert updated == {match}
+    assert standings.refresh(catalog, updated)
+    assert match not in standings.results
+
+    full = Standings(quals, teams, surrogates)
+    full.refresh(catalog)
+    assert standings.to_dict() == full.to_dict()
+    catalog.close()
@@ -0,0 +1,27 @@
+import os
+
+from MediaTools.store import ContentStore, scan_videos
+from Manifest import layout
+
+
+def test_dedup_published_matches_only(event_copy, tmp_path):
+    _, root_folder = event_copy
+    videos = scan_videos(root_folder)
+    published = {video.match for video in videos if video.kind == layout.FOLDER_PUBLISHED}
+    copies = [video for video in videos if video.kind == layout.FOLDER_MATCH]
+    assert {video.match in published for video in copies} == {True, False}
+
+    content_store = ContentStore(root_folder, str(tmp_path / 'store.db'))
+    try:
+        assert content_store.dedup() > 0
+        # a second run has nothing left to link
+        assert content_store.dedup() == 0
+    finally:
+        content_store.close()
+    inodes = {}
+    for video in scan_videos(root_folder):
+        inodes.setdefault(video.inode, []).append(video)
+    for video in copies:
+        linked = inodes[(os.stat(video.path).st_dev, os.stat(video.path).st_ino)]
+        # a team may still write into its upload, the reviewed copy must not change with it
+        assert (len(linked) > 1) == (video.match in published)
@@ -0,0 +1,31 @@
+import pytest
+
+from Manifest.timecode import mmss_to_seconds, seconds_to_mmss
+
+
+def test_mmss_to_seconds():
+    assert mmss_to_seconds('00:00') == 0
+    assert mmss_to_seconds('02:30') == 150
+    assert mmss_to_seconds('1:09.480') == 69.48
+    assert mmss_to_seconds('01:05.4') == 65.4
+    # sexagesimal integer of a plain yaml.load
+    assert mmss_to_seconds(65) == 65
+    for invalid in ('', '65', '01:05.4801', 'aa:bb', '-1:00'):
+        with pytest.raises(ValueError):
+            mmss_to_seconds(invalid)
+
+
+def test_seconds_to_mmss():
+    assert seconds_to_mmss(65) == '01:05'
+    assert seconds_to_mmss(65.48) == '01:05'
+    assert seconds_to_mmss(65.48, milliseconds=True) == '01:05.480'
+    assert seconds_to_mmss(0.004, milliseconds=True) == '00:00.004'
+    # rounded to the millisecond, a whole second has no fraction
+    assert seconds_to_mmss(64.9996, milliseconds=True) == '01:05'
+    assert seconds_to_mmss(59.9999, milliseconds=True) == '01:00'
+
+
+def test_round_trip():
+    for milliseconds in range(0, 200000, 997):
+        seconds = milliseconds / 1000
+        assert mmss_to_seconds(seconds_to_mmss(seconds, milliseconds=True)) == seconds
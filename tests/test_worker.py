@@ -0,0 +1,65 @@
+import os
+import stat
+
+from GameProducer.lease import Lease, lease_filename
+from GameProducer.preflight import find_match_manifests
+from GameProducer.verify import CACHE_SUFFIX as VERIFY_CACHE_SUFFIX
+from GameProducer.worker import RenderWorker, published_filename, ready_matches, render_and_publish
+from Manifest import files
+from Manifest.loader import load_match_manifest
+from MediaTools.cache import load_json_cache, save_json_cache
+
+
+def test_failed_render_retried_when_a_review_changes(event_copy):
+    _, root_folder = event_copy
+    # a published match to render again
+    match = 1
+    os.remove(published_filename(root_folder, match))
+    manifest = find_match_manifests(root_folder)[match]
+    game = load_match_manifest(manifest, load_videos=False, check_files=False)
+    assert (match, manifest) in ready_matches(root_folder)
+    renders = []
+
+    def render(manifest, output):
+        renders.append(manifest)
+        if len(renders) == 1:
+            return False
+        with open(output, 'w') as file:
+            file.write('rendered\n')
+        return True
+
+    worker = RenderWorker(root_folder, 'worker1', render, lease_seconds=30)
+    worker.lease_options['settle_seconds'] = 0
+    assert worker.work_once() == []
+    assert match in worker.failed
+    # not tried again while nothing changed
+    assert worker.work_once() == []
+    assert len(renders) == 1
+    # the match manifest stays the same when a referee saves a video manifest again
+    video_manifest = game.teams[0].video.manifest_file
+    video_stat = os.stat(video_manifest)
+    os.utime(video_manifest, ns=(video_stat.st_atime_ns, video_stat.st_mtime_ns + 1_000_000_000))
+    assert worker.work_once() == [match]
+    assert os.path.isfile(published_filename(root_folder, match))
+
+
+def test_published_video_keeps_the_verification(tmp_path):
+    manifest = str(tmp_path / 'match1.yml')
+    published = str(tmp_path / 'match1.mp4')
+    issues = [{'level': 'WARNING', 'message': 'quiet audio'}]
+
+    def render(manifest, output):
+        with open(output, 'w') as file:
+            file.write('rendered\n')
+        save_json_cache(output, VERIFY_CACHE_SUFFIX, issues)
+        return True
+
+    lease = Lease(lease_filename(manifest), 'worker1', settle_seconds=0)
+    assert lease.acquire()
+    try:
+        assert render_and_publish(render, 1, manifest, published, lease)
+    finally:
+        lease.release()
+    assert load_json_cache(published, VERIFY_CACHE_SUFFIX) == issues
+    # readable by the other machines as a plain copy
+    assert stat.S_IMODE(os.stat(published).st_mode) == files.file_mode(str(tmp_path / 'new'))